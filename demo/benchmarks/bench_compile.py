@@ -0,0 +1,212 @@
+"""Compile time and generated JS size of the custom components on synthetic pages.
+
+Each case builds a page of N components × M columns × K formatters and times the Python
+compile phases (custom code, imports, render, the whole compile_page) cold, from the on-disk
+code cache (a new process on an unchanged app) and warm.
+With --web-dir the pages are also written into a pre-populated .web and `next build` (from its
+local node_modules, no network) gives the per-route first load JS.
+
+    cd demo && python -m benchmarks.bench_compile [--tables 1 10] [--columns 5 20] [--formatters 0 5]
+    cd demo && python -m benchmarks.bench_compile --web-dir .web --out compile.json
+"""
+import argparse
+import gzip
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import reflex as rx
+from reflex import Var
+from reflex.compiler import compiler
+
+from demo.antd_demo import antd
+from demo.antd_demo.antd import ex_code_cache
+from demo.components.code_cache import CACHE_DIR_ENV
+from demo.components.grid_layout import grid_layout, grid_layout_item, responsive_grid_layout
+from demo.datatable.components import DataTableEx, formatter_cache
+
+
+class BenchState(rx.State):
+    rows: list[dict[str, Any]] = []
+    data: list[list[Any]] = []
+    columns: list[str] = []
+    patch: dict[str, Any] = {}
+
+    def click(self, row: str, column: str):
+        pass
+
+
+def make_formatter(i: int) -> Callable:
+    # a distinct closure value per formatter, so each one is generated on its own
+    return lambda cell, row, column, state: rx.link(cell, title=f'f{i}', on_click=lambda: state.click(row, column))
+
+
+def make_render(i: int) -> Callable:
+    return lambda text=None: rx.code(Var.create_safe('{text}'), title=f'r{i}')
+
+
+def grid_page(n: int, m: int, k: int, responsive=False) -> rx.Component:
+    layout = responsive_grid_layout if responsive else grid_layout
+    return rx.fragment(*[
+        layout(*[
+            grid_layout_item(rx.text(f'{t}.{c}'), key=f'{t}.{c}', data_grid=dict(x=c % 12, y=c // 12, w=1, h=1))
+            for c in range(m)
+        ])
+        for t in range(n)
+    ])
+
+
+def datatable_page(n: int, m: int, k: int) -> rx.Component:
+    names = [f'c{c}' for c in range(m)]
+    return rx.fragment(*[
+        DataTableEx(
+            id=f'bench{t}', data=BenchState.data, columns=names,
+            formatters={names[c]: make_formatter(c) for c in range(min(k, m))},
+            state=BenchState, data_patch=BenchState.patch,
+        )
+        for t in range(n)
+    ])
+
+
+def antd_columns(m: int, k: int) -> list[dict[str, Any]]:
+    return [
+        dict(title=f'c{c}', dataIndex=f'c{c}', key=f'c{c}', **(dict(render=make_render(c)) if c < k else {}))
+        for c in range(m)
+    ]
+
+
+def antd_page(n: int, m: int, k: int) -> rx.Component:
+    columns = Var.create_safe(antd_columns(m, 0))
+    return antd.page_root(*[
+        antd.Table(id=f'bench{t}', data_source=BenchState.rows, columns=columns)
+        for t in range(n)
+    ])
+
+
+def antd_ex_page(n: int, m: int, k: int) -> rx.Component:
+    return antd.page_root(*[
+        antd.Table(
+            id=f'benchEx{t}', data_source=BenchState.rows, columns=antd_columns(m, k),
+            data_patch=BenchState.patch, change_debounce=200,
+        )
+        for t in range(n)
+    ])
+
+
+CASES: dict[str, Callable[[int, int, int], rx.Component]] = {
+    'grid_layout': grid_page,
+    'responsive_grid_layout': lambda n, m, k: grid_page(n, m, k, responsive=True),
+    'datatable_ex': datatable_page,
+    'antd_table': antd_page,
+    'antd_table_ex': antd_ex_page,
+}
+
+
+def clear_caches(disk: bool):
+    ex_code_cache.clear(disk)
+    formatter_cache.clear(disk)
+
+
+def timed(fn: Callable, *args) -> tuple[float, Any]:
+    start = time.perf_counter()
+    rs = fn(*args)
+    return (time.perf_counter() - start) * 1000, rs
+
+
+def measure(build: Callable[[], rx.Component], route: str, repeat: int, cache: str) -> dict[str, Any]:
+    best: dict[str, float] = {}
+    js = ''
+    for _ in range(repeat):
+        if cache != 'warm':
+            clear_caches(cache == 'cold')
+        phases = {}
+        phases['build_ms'], page = timed(build)
+        phases['custom_code_ms'], _ = timed(page.get_custom_code)
+        phases['imports_ms'], _ = timed(page.get_imports)
+        phases['render_ms'], _ = timed(page.render)
+        if cache != 'warm':
+            clear_caches(cache == 'cold')
+        phases['compile_ms'], (_, js) = timed(compiler.compile_page, route, build(), BenchState)
+        best = {k: min(v, best.get(k, float('inf'))) for k, v in phases.items()}
+    return dict(
+        **{k: round(v, 2) for k, v in best.items()},
+        js_bytes=len(js.encode()), js_gzip_bytes=len(gzip.compress(js.encode())),
+    )
+
+
+def next_build(web_dir: Path, pages: dict[str, str]) -> dict[str, dict[str, int]]:
+    """Write the pages into web_dir/pages, `next build` offline and sum each route's first load chunks."""
+    written = []
+    try:
+        for route, js in pages.items():
+            path = web_dir / 'pages' / f'{route}.js'
+            path.write_text(js)
+            written.append(path)
+        env = {**os.environ, 'NEXT_TELEMETRY_DISABLED': '1'}
+        subprocess.run([str(web_dir / 'node_modules' / '.bin' / 'next'), 'build'], cwd=web_dir, env=env,
+                       check=True, stdout=subprocess.DEVNULL)
+        manifest = json.loads((web_dir / '.next' / 'build-manifest.json').read_text())
+        sizes = {}
+        for route in pages:
+            files = [*manifest['pages'].get('/_app', []), *manifest['pages'].get(f'/{route}', [])]
+            data = [(web_dir / '.next' / f).read_bytes() for f in dict.fromkeys(files) if f.endswith('.js')]
+            sizes[route] = dict(bundle_bytes=sum(map(len, data)),
+                                bundle_gzip_bytes=sum(len(gzip.compress(d)) for d in data))
+        return sizes
+    finally:
+        for path in written:
+            path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--tables', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--columns', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--formatters', type=int, nargs='+', default=[0, 5])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--web-dir', type=Path, help='pre-populated .web to measure per route bundles in')
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    parser.add_argument('--out', type=Path, help='also write the json results to this file')
+    args = parser.parse_args()
+
+    results, pages = [], {}
+    # a scratch disk cache, not the app's
+    os.environ[CACHE_DIR_ENV] = cache_dir = tempfile.mkdtemp(prefix='bench_code_cache')
+    try:
+        for case, n, m, k in itertools.product(args.cases, args.tables, args.columns, args.formatters):
+            route = f'bench_{case}_{n}x{m}x{k}'
+            build = lambda: CASES[case](n, m, k)
+            for cache in ('cold', 'disk', 'warm'):
+                results.append(dict(case=case, tables=n, columns=m, formatters=k, cache=cache,
+                                    route=route, **measure(build, route, args.repeat, cache)))
+            pages[route] = compiler.compile_page(route, build(), BenchState)[1]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    if args.web_dir:
+        sizes = next_build(args.web_dir, pages)
+        for r in results:
+            r.update(sizes.get(r['route'], {}))
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<23} {'NxMxK':>9} {'cache':>5} {'code ms':>8} {'imports ms':>10} {'render ms':>9}"
+          f" {'compile ms':>10} {'js KB':>7} {'gzip KB':>7} {'bundle KB':>9}")
+    for r in results:
+        bundle = f"{r['bundle_gzip_bytes'] / 1024:.1f}" if 'bundle_gzip_bytes' in r else '-'
+        print(f"{r['case']:<23} {r['tables']:>3}x{r['columns']}x{r['formatters']:<3} {r['cache']:>5}"
+              f" {r['custom_code_ms']:>8} {r['imports_ms']:>10} {r['render_ms']:>9} {r['compile_ms']:>10}"
+              f" {r['js_bytes'] / 1024:>7.1f} {r['js_gzip_bytes'] / 1024:>7.1f} {bundle:>9}")
+
+
+if __name__ == '__main__':
+    main()
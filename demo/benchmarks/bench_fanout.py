@@ -0,0 +1,95 @@
+"""Cost of pushing a row refresh to every session: one fetch per session vs ViewFanout (one per distinct view).
+
+S sessions are spread over V distinct (filters, sorter, page) views of an N row IndexedProvider;
+after replace_rows() (timed on its own, the same for both) every session needs its page again.
+The per session fetches are timed with the provider's shared view cache and without it;
+the speedup is fanout over the cached per session fetches.
+
+    cd demo && python -m benchmarks.bench_fanout [--rows 100000] [--sessions 100 1000 10000] [--views 10 100]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from demo.table_data import IndexedProvider, IndexedTable, ViewFanout
+from .fixtures import make_rows, table_change_payload
+
+COLUMNS = [
+    dict(dataIndex='key', sorter='true'),
+    dict(dataIndex='name', sorter='true'),
+    dict(dataIndex='gender', filters=[]),
+]
+
+
+def make_views(rnd: random.Random, n: int, total: int) -> list[dict]:
+    views = {}
+    while len(views) < n:
+        p = table_change_payload(rnd, total)
+        views[json.dumps(p, sort_keys=True)] = p
+    return list(views.values())
+
+
+async def per_session(provider: IndexedProvider, rows: list, sessions: list[dict]) -> float:
+    provider.replace_rows(rows)
+    start = time.perf_counter()
+    for p in sessions:
+        await provider.fetch(p['pagination'], p['filters'], p['sorter'])
+    return (time.perf_counter() - start) * 1000
+
+
+async def fanout(provider: IndexedProvider, rows: list, sessions: list[dict]) -> tuple[float, int]:
+    table_fanout = ViewFanout(provider)
+    for i, p in enumerate(sessions):
+        table_fanout.subscribe(str(i), p['pagination'], p['filters'], p['sorter'])
+    provider.replace_rows(rows)
+    start = time.perf_counter()
+    await table_fanout.publish()
+    return (time.perf_counter() - start) * 1000, table_fanout.views_computed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--views', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    rows = make_rows(args.rows, args.seed)
+    provider = IndexedProvider(IndexedTable.from_columns(rows, COLUMNS), max_views=max(args.views))
+    # max_views=0: every fetch filters and sorts again, like a session recomputing its own view
+    uncached = IndexedProvider(provider.table, max_views=0)
+    start = time.perf_counter()
+    provider.replace_rows(rows)
+    replace_ms = (time.perf_counter() - start) * 1000
+    results = []
+    for v in args.views:
+        views = make_views(rnd, v, args.rows)
+        for s in args.sessions:
+            sessions = [views[i % v] for i in range(s)]
+            fanout_ms, computed = asyncio.run(fanout(provider, rows, sessions))
+            results.append(dict(
+                rows=args.rows, sessions=s, views=v, views_computed=computed, replace_ms=round(replace_ms, 2),
+                uncached_ms=round(asyncio.run(per_session(uncached, rows, sessions)), 2),
+                per_session_ms=round(asyncio.run(per_session(provider, rows, sessions)), 2),
+                fanout_ms=round(fanout_ms, 2),
+            ))
+            results[-1]['speedup'] = round(results[-1]['per_session_ms'] / max(fanout_ms, 1e-6), 1)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"replace_rows: {replace_ms:.2f} ms")
+    print(f"{'rows':>9} {'sessions':>8} {'views':>6} {'computed':>8} {'uncached ms':>12} {'per session ms':>15}"
+          f" {'fanout ms':>10} {'speedup':>8}")
+    for r in results:
+        print(f"{r['rows']:>9} {r['sessions']:>8} {r['views']:>6} {r['views_computed']:>8} {r['uncached_ms']:>12}"
+              f" {r['per_session_ms']:>15} {r['fanout_ms']:>10}"
+              f" {r['speedup']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Backend worker import time: the app module alone (pages lazily registered) vs with every page loaded.
+
+Each mode runs in a fresh interpreter under `-X importtime`. The report has the wall time, the
+self time summed per top level package, the demo modules' cumulative times and the slowest modules.
+
+    cd demo && python -m benchmarks.bench_import [--modes lazy eager] [--repeat 3] [--top 15]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+MODES = {
+    'reflex': 'import reflex',
+    'lazy': 'import demo.demo',
+    'eager': 'import demo.demo as d\nfor p in d.routes.pages.values(): p.load()',
+}
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_times(code: str) -> tuple[float, list[tuple[str, int, int, int]]]:
+    """(wall ms, [(module, self us, cumulative us, depth)]) of running `code` in a new interpreter."""
+    env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env, cwd=Path(__file__).parent.parent,
+                         capture_output=True, text=True, check=True)
+    wall = (time.perf_counter() - start) * 1000
+    modules = []
+    for line in out.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            modules.append((m[4], int(m[1]), int(m[2]), len(m[3]) // 2))
+    return wall, modules
+
+
+def measure(code: str, repeat: int, top: int) -> dict[str, Any]:
+    best = None
+    for _ in range(repeat):
+        wall, modules = import_times(code)
+        if best is None or wall < best[0]:
+            best = wall, modules
+    wall, modules = best
+    packages: dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        packages[name.partition('.')[0]] += self_us
+    return dict(
+        wall_ms=round(wall, 1),
+        import_ms=round(sum(s for _, s, _, _ in modules) / 1000, 1),
+        modules=len(modules),
+        packages_ms={k: round(v / 1000, 1) for k, v in sorted(packages.items(), key=lambda i: -i[1])[:top]},
+        demo_ms={name: round(cum / 1000, 1) for name, _, cum, _ in modules if name.startswith('demo')},
+        slowest_ms={name: round(s / 1000, 1) for name, s, _, _ in sorted(modules, key=lambda m: -m[1])[:top]},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--repeat', type=int, default=3, help='runs per mode, the fastest is kept')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    parser.add_argument('--out', type=Path, help='also write the json results to this file')
+    args = parser.parse_args()
+
+    results = {mode: measure(MODES[mode], args.repeat, args.top) for mode in args.modes}
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<8} {'wall ms':>8} {'import ms':>9} {'modules':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['wall_ms']:>8} {r['import_ms']:>9} {r['modules']:>7}")
+    for mode, r in results.items():
+        print(f'\n{mode}: demo modules (cumulative ms)')
+        for name, ms in r['demo_ms'].items():
+            print(f'  {name:<40} {ms:>8}')
+        print(f'{mode}: packages (self ms)')
+        for name, ms in r['packages_ms'].items():
+            print(f'  {name:<40} {ms:>8}')
+
+
+if __name__ == '__main__':
+    main()
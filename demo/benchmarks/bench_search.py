@@ -0,0 +1,92 @@
+"""Search box queries: a scan of every row vs SearchIndex, and its incremental update vs a rebuild.
+
+`scan ms` runs row_matches over the rows, `cold ms` is a SearchIndex query with an empty term cache,
+`warm ms` the same query again, `view ms` the whole provider view (search + gender filter + sort).
+
+    cd demo && python -m benchmarks.bench_search [--rows 1000000] [--changes 100 10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from demo.table_data import SEARCH_FILTER, IndexedProvider, IndexedTable, SearchIndex, row_matches
+from .fixtures import make_rows
+
+FIELDS = ('name', 'age', 'gender', 'address')
+COLUMNS = [
+    dict(dataIndex='key', sorter='true'),
+    dict(dataIndex='name', sorter='true'),
+    dict(dataIndex='gender', filters=[]),
+]
+QUERIES = ['black', 'ack', 'bl', 'down', '12 down', '123 street', 'fe', 'ohn 4', 'xyz']
+
+
+def timed(fn, *args, repeat: int = 1) -> tuple[float, object]:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def scan(rows, text):
+    return [i for i, r in enumerate(rows) if row_matches(r, text, FIELDS)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--changes', type=int, nargs='+', default=[100, 10_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-scan', action='store_true', help='skip the row by row baseline')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    rows = make_rows(args.rows, args.seed)
+    build_ms, index = timed(SearchIndex, rows, FIELDS)
+    provider = IndexedProvider(IndexedTable.from_columns(rows, COLUMNS), search_fields=FIELDS)
+    queries = []
+    for text in QUERIES:
+        index._terms.clear()
+        cold_ms, _ = timed(index.search, text)
+        warm_ms, bitmap = timed(index.search, text, repeat=args.repeat)
+        filters = {'gender': ['female'], SEARCH_FILTER: [text]}
+        sorter = dict(field='name', column='name', order='ascend')
+        view_ms, view = timed(lambda: provider._select(filters, sorter))
+        result = dict(query=text, matches=bin(bitmap).count('1'), view_rows=len(view),
+                      cold_ms=round(cold_ms, 3), warm_ms=round(warm_ms, 4), view_ms=round(view_ms, 2))
+        if not args.no_scan:
+            scan_ms, expected = timed(scan, rows, text)
+            result.update(scan_ms=round(scan_ms, 1), same=list(index.ids(text)) == expected)
+        queries.append(result)
+
+    updates = []
+    for n in args.changes:
+        changed = list(rows)
+        for i in rnd.sample(range(len(rows)), min(n, len(rows))):
+            changed[i] = dict(changed[i], name=rnd.choice(['Zed', 'Ann Lee', 'Black']), age=rnd.randint(18, 80))
+        update_ms, _ = timed(index.replace_rows, changed)
+        index.replace_rows(rows)
+        updates.append(dict(changes=n, update_ms=round(update_ms, 1), rebuild_ms=round(build_ms, 1)))
+
+    results = dict(rows=args.rows, build_ms=round(build_ms, 1), index=index.info(), queries=queries, updates=updates)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"rows {args.rows}, index built in {build_ms:.0f} ms: {results['index']}")
+    print(f"{'query':<12} {'matches':>8} {'scan ms':>9} {'cold ms':>9} {'warm ms':>9} {'view ms':>9} {'view rows':>9}"
+          f" {'same':>5}")
+    for q in queries:
+        print(f"{q['query']:<12} {q['matches']:>8} {q.get('scan_ms', '-'):>9} {q['cold_ms']:>9} {q['warm_ms']:>9}"
+              f" {q['view_ms']:>9} {q['view_rows']:>9} {str(q.get('same', '-')):>5}")
+    for u in updates:
+        print(f"{u['changes']} changed rows: update {u['update_ms']} ms, rebuild {u['rebuild_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Per-session memory: per-session row copies (previous AntdState) vs a shared IndexedTable + TableView.
+
+    cd demo && python -m benchmarks.bench_session_memory [--rows 10000] [--sessions 10 100 1000]
+"""
+import argparse
+import copy
+import json
+import tracemalloc
+
+from demo.table_data import IndexedTable, normalize_pagination, page_slice
+from .fixtures import make_rows
+
+COLUMNS = [
+    dict(dataIndex='key', sorter='true'),
+    dict(dataIndex='name', sorter='true'),
+    dict(dataIndex='gender', filters=[]),
+]
+FILTERS = {'gender': ['female']}
+SORTER = dict(column={}, field='name', order='ascend')
+
+
+def copied_session(data):
+    # state default deep-copied per session, then a filtered + sorted list of that copy
+    rows = copy.deepcopy(data)
+    view = [d for d in rows if d['gender'] in FILTERS['gender']]
+    return dict(data_source=sorted(view, key=lambda d: d[SORTER['field']]))
+
+
+def view_session(table):
+    view = table.view(FILTERS, SORTER)
+    pagination = normalize_pagination(None, len(view))
+    return dict(view=view, pagination=pagination,
+                data_source=table.materialize(page_slice(view, pagination)))
+
+
+def measure(make, n) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [make() for _ in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    args = parser.parse_args()
+
+    data = make_rows(args.rows)
+    tracemalloc.start()
+    table = IndexedTable.from_columns(data, COLUMNS)
+    shared = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    results = []
+    for n in args.sessions:
+        copied = measure(lambda: copied_session(data), n)
+        viewed = measure(lambda: view_session(table), n)
+        results.append(dict(
+            rows=args.rows, sessions=n, shared_index_bytes=shared,
+            copied_bytes=copied, view_bytes=viewed,
+            copied_per_session=copied // n, view_per_session=viewed // n,
+        ))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'rows':>8} {'sessions':>8} {'copied MB':>10} {'views MB':>9} {'per session copied':>19}"
+          f" {'per session view':>17} {'shared index MB':>16}")
+    for r in results:
+        print(f"{r['rows']:>8} {r['sessions']:>8} {r['copied_bytes'] / 2**20:>10.1f} {r['view_bytes'] / 2**20:>9.2f}"
+              f" {r['copied_per_session']:>19} {r['view_per_session']:>17} {r['shared_index_bytes'] / 2**20:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
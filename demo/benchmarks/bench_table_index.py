@@ -0,0 +1,102 @@
+"""Compare on_table_change's list-comprehension + sorted() with IndexedTable.
+
+indexed_ms builds every id of the view (query), page_ms is what a table change costs: the view and
+its first page, read off the filter bitmap without building the other ids.
+
+    cd demo && python -m benchmarks.bench_table_index [--sizes 10000 100000 1000000]
+"""
+import argparse
+import json
+import time
+
+from demo.table_data import IndexedTable
+from .fixtures import make_rows
+
+COLUMNS = [
+    dict(dataIndex='key', sorter='true'),
+    dict(dataIndex='name', sorter='true'),
+    dict(dataIndex='gender', filters=[]),
+]
+PAGE_SIZE = 10
+CASES = [
+    ('sort', None, dict(field='name', order='ascend')),
+    ('filter', {'gender': ['female']}, None),
+    ('filter+sort', {'gender': ['female']}, dict(field='name', order='descend')),
+]
+
+
+def baseline(data, filters, sorter):
+    view = data
+    if filters and filters.get('gender') is not None:
+        view = [d for d in data if d['gender'] in filters['gender']]
+    if sorter:
+        view = sorted(view, key=lambda d: d[sorter['field']], reverse=bool(sorter['order'] == 'descend'))
+    return view
+
+
+def indexed(table, filters, sorter):
+    if sorter:
+        return table.query(filters, sorter['field'], sorter['order'])
+    return table.query(filters)
+
+
+def indexed_page(table, filters, sorter):
+    sorter = sorter and dict(sorter, column={})
+    view = table.view(filters, sorter)
+    return view[:PAGE_SIZE]
+
+
+def same_view(data, ids, expected, sorter) -> bool:
+    # ties may come out in a different order when sorting, compare the sort keys only
+    got = [data[i] for i in ids]
+    if sorter:
+        field = sorter['field']
+        return [d[field] for d in got] == [d[field] for d in expected]
+    return got == expected
+
+
+def timeit(fn, *args, repeat=5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        data = make_rows(n)
+        start = time.perf_counter()
+        table = IndexedTable.from_columns(data, COLUMNS)
+        build_ms = (time.perf_counter() - start) * 1000
+        for name, filters, sorter in CASES:
+            expected = baseline(data, filters, sorter)
+            assert same_view(data, indexed(table, filters, sorter), expected, sorter)
+            assert same_view(data, indexed_page(table, filters, sorter), expected[:PAGE_SIZE], sorter)
+            results.append(dict(
+                rows=n, case=name, build_ms=round(build_ms, 2),
+                baseline_ms=round(timeit(baseline, data, filters, sorter, repeat=args.repeat), 2),
+                indexed_ms=round(timeit(indexed, table, filters, sorter, repeat=args.repeat), 2),
+                page_ms=round(timeit(indexed_page, table, filters, sorter, repeat=args.repeat), 3),
+            ))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'rows':>9} {'case':<12} {'build ms':>9} {'baseline ms':>12} {'indexed ms':>11} {'speedup':>8}"
+          f" {'page ms':>8} {'speedup':>8}")
+    for r in results:
+        print(f"{r['rows']:>9} {r['case']:<12} {r['build_ms']:>9} {r['baseline_ms']:>12} {r['indexed_ms']:>11}"
+              f" {r['baseline_ms'] / max(r['indexed_ms'], 1e-6):>7.1f}x {r['page_ms']:>8}"
+              f" {r['baseline_ms'] / max(r['page_ms'], 1e-6):>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
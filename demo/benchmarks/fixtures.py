@@ -0,0 +1,67 @@
+"""`_data`-shaped rows and antd/gridjs event payloads for the benchmarks.
+
+    cd demo && python -m benchmarks.fixtures [--sizes 1000 10000 100000 1000000] [--out fixtures]
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+NAMES = ['Fike', 'John', 'Aim', 'Expandable', 'Black', 'Messi', 'Ronaldo', 'Neymar', 'Kane', 'Salah']
+GENDERS = ['male', 'female']
+
+
+def make_rows(n: int, seed: int = 0) -> list[dict[str, Any]]:
+    """`_data`-shaped rows (key/name/age/gender/address) for benchmarks."""
+    rnd = random.Random(seed)
+    return [
+        dict(
+            key=str(i + 1),
+            name=rnd.choice(NAMES),
+            age=rnd.randint(18, 80),
+            gender=rnd.choice(GENDERS),
+            address=f'{rnd.randint(1, 999)} Downing Street',
+        )
+        for i in range(n)
+    ]
+
+
+COLUMNS = ['key', 'name', 'age', 'gender', 'address']
+SORTABLE = ['key', 'name']
+
+
+def table_change_payload(rnd: random.Random, total: int, page_size: int = 10) -> dict[str, Any]:
+    """An antd Table onChange (pagination, filters, sorter) like the browser sends them."""
+    field = rnd.choice([None, *SORTABLE])
+    sorter = {'field': field, 'columnKey': field}
+    if field is not None:
+        sorter.update(column=dict(title=field.title(), dataIndex=field, key=field, sorter='true'),
+                      order=rnd.choice(['ascend', 'descend']))
+    return dict(
+        pagination=dict(current=rnd.randint(1, max(total // page_size, 1)), pageSize=page_size, total=total),
+        filters={'gender': rnd.choice([None, ['male'], ['female'], ['male', 'female']])},
+        sorter=sorter,
+    )
+
+
+def click_payload(rnd: random.Random, row_ids: list[str], columns: list[str]) -> dict[str, Any]:
+    """A DataTableEx formatter click: only the row id and the column."""
+    return dict(row=rnd.choice(row_ids), column=rnd.choice(columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='write `_data`-shaped row fixtures as json')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=Path, default=Path('fixtures'))
+    args = parser.parse_args()
+    args.out.mkdir(parents=True, exist_ok=True)
+    for n in args.sizes:
+        path = args.out / f'rows_{n}.json'
+        path.write_text(json.dumps(make_rows(n, args.seed)))
+        print(path, path.stat().st_size)
+
+
+if __name__ == '__main__':
+    main()
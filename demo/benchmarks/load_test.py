@@ -0,0 +1,164 @@
+"""Simulated concurrent table users against a locally running app (`reflex run` / `reflex run --env prod`).
+
+Every session connects to the websocket like the browser does, hydrates /antd_demo and then replays
+antd Table onChange and DataTableEx click events at --rate events/s, one at a time like the
+frontend event queue. An event's latency is measured until its result arrives: the first update
+with a delta for background handlers (on_table_change answers later), the final update otherwise.
+Needs the asyncio socket.io client: pip install -r benchmarks/requirements.txt.
+
+    cd demo && python -m benchmarks.load_test --sessions 10 100 --duration 30 [--server-pid PID]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+import socketio
+
+from demo.metrics import Histogram
+from .fixtures import click_payload, table_change_payload
+
+NAMESPACE = '/_event'
+PAGE = '/antd_demo'
+# name, payload maker, wait for the first delta instead of the final update
+EVENTS = {
+    'table_change': ('state.antd_state.on_table_change', lambda rnd, a: table_change_payload(rnd, a.rows), True),
+    'click': ('state.state.click', lambda rnd, a: click_payload(rnd, a.row_ids, ['First Name', 'Url']), False),
+}
+
+
+def rss_kb(pid: Optional[int]) -> Optional[int]:
+    if pid is None:
+        return None
+    for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1])
+    return None
+
+
+class Session:
+    """One browser tab: a socket, a token and the frontend's one-event-at-a-time queue."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.token = str(uuid.uuid4())
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._updates: asyncio.Queue = asyncio.Queue()
+        self.sio.on('event', self._updates.put_nowait, namespace=NAMESPACE)
+
+    async def connect(self):
+        await self.sio.connect(self.url, socketio_path=NAMESPACE, namespaces=[NAMESPACE], transports=['websocket'])
+        await self.send('state.hydrate', {})
+
+    async def send(self, name: str, payload: dict[str, Any], until_delta: bool = False) -> float:
+        """Emit an event, run the events it chains like the frontend does, return its latency in s."""
+        while not self._updates.empty():
+            self._updates.get_nowait()
+        start = time.perf_counter()
+        await self.sio.emit('event', json.dumps(dict(
+            name=name, payload=payload, token=self.token,
+            router_data=dict(pathname=PAGE, query={}, asPath=PAGE),
+        )), namespace=NAMESPACE)
+        chained = []
+        while True:
+            update = json.loads(await self._updates.get())
+            chained.extend(update.get('events') or [])
+            if any((update.get('delta') or {}).values()) if until_delta else update.get('final'):
+                break
+        latency = time.perf_counter() - start
+        for event in chained:
+            await self.send(event['name'], event.get('payload') or {})
+        return latency
+
+    async def close(self):
+        await self.sio.disconnect()
+
+
+async def run_session(session: Session, args, rnd: random.Random, stop_at: float,
+                      histograms: dict[str, Histogram], errors: list):
+    kinds, weights = zip(*args.mix.items())
+    while time.perf_counter() < stop_at:
+        kind = rnd.choices(kinds, weights)[0]
+        name, make, until_delta = EVENTS[kind]
+        tick = time.perf_counter()
+        try:
+            latency = await asyncio.wait_for(session.send(name, make(rnd, args), until_delta), args.timeout)
+        except (asyncio.TimeoutError, socketio.exceptions.SocketIOError) as e:
+            errors.append(f'{kind}: {type(e).__name__}')
+            continue
+        histograms[kind].record(latency * 1e6)
+        histograms['all'].record(latency * 1e6)
+        await asyncio.sleep(max(1 / args.rate - (time.perf_counter() - tick), 0))
+
+
+async def run(args, n: int) -> dict[str, Any]:
+    rnd = random.Random(args.seed)
+    rss_before = rss_kb(args.server_pid)
+    sessions = [Session(args.url) for _ in range(n)]
+    for i in range(0, n, args.connect_batch):
+        await asyncio.gather(*(s.connect() for s in sessions[i:i + args.connect_batch]))
+    rss_connected = rss_kb(args.server_pid)
+
+    histograms = {kind: Histogram() for kind in [*EVENTS, 'all']}
+    errors: list[str] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(s, args, random.Random(rnd.random()), start + args.duration, histograms, errors)
+        for s in sessions
+    ))
+    elapsed = time.perf_counter() - start
+    rss_after = rss_kb(args.server_pid)
+    await asyncio.gather(*(s.close() for s in sessions))
+
+    result = dict(
+        sessions=n, duration_s=round(elapsed, 2), events=histograms['all'].count, errors=len(errors),
+        throughput_eps=round(histograms['all'].count / elapsed, 1),
+        latency_ms={
+            kind: {k: v for k, v in h.summary(1000).items() if k in ('count', 'mean', 'p50', 'p95', 'p99', 'max')}
+            for kind, h in histograms.items() if h.count
+        },
+    )
+    if rss_before is not None:
+        result.update(rss_before_kb=rss_before, rss_after_kb=rss_after,
+                      rss_per_session_kb=round((max(rss_connected, rss_after) - rss_before) / n, 1))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:8000', help='backend url')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--duration', type=float, default=30, help='seconds per run')
+    parser.add_argument('--rate', type=float, default=2, help='events per second per session')
+    parser.add_argument('--mix', type=json.loads, default={'table_change': 0.8, 'click': 0.2},
+                        help='json weights of the replayed events')
+    parser.add_argument('--rows', type=int, default=5, help='rows of the served table, for the page numbers')
+    parser.add_argument('--row-ids', nargs='+', default=['PSG', 'Al-Nasir'], help='row keys to click')
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--connect-batch', type=int, default=50)
+    parser.add_argument('--server-pid', type=int, help='backend pid, to report its memory per session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine readable results')
+    parser.add_argument('--out', type=Path, help='also write the json results to this file')
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(args, n)) for n in args.sessions]
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'sessions':>8} {'events':>7} {'errors':>6} {'ev/s':>8} {'event':<13} {'p50 ms':>8} {'p95 ms':>8}"
+          f" {'p99 ms':>8} {'KB/session':>10}")
+    for r in results:
+        for kind, lat in r['latency_ms'].items():
+            print(f"{r['sessions']:>8} {r['events']:>7} {r['errors']:>6} {r['throughput_eps']:>8} {kind:<13}"
+                  f" {lat['p50']:>8} {lat['p95']:>8} {lat['p99']:>8} {r.get('rss_per_session_kb', '-'):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1 @@
-from .index import index
\ No newline at end of file
+from .state import AntdState, VirtualState
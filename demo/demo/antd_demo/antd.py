@@ -1,6 +1,5 @@
 from typing import List, Any, Union, Dict, Optional
 from types import LambdaType
-from functools import lru_cache
 import json
 import inspect
 
@@ -10,7 +9,16 @@ import reflex as rx
 from reflex.constants import EventTriggers
 from reflex import Component, Var
 from reflex.components.tags import Tag
-from reflex.utils import imports
+from reflex.utils import format, imports
+
+from ..components.code_cache import CodeCache
+from ..components.lazy_expand import lazy_expand_code, lazy_expand_imports
+from ..components.export_links import export_links_code
+from ..components.local_sort import local_sort_code, local_view_code, local_view_imports
+from ..components.table_summary import table_summary_code
+from ..components.rate_limit import rate_limit_code, rate_limit_imports
+from ..components.row_blocks import row_blocks_code, row_blocks_imports
+from ..components.row_patch import row_patch_code, row_patch_imports
 
 """
 . import type support: 
@@ -22,17 +30,42 @@ from reflex.utils import imports
 # rx.chakra.select
 
 
+def _deep_imports(component: Component, path: str) -> imports.ImportDict:
+    """`import Tag from '<path>'` instead of the package barrel, the package itself is still installed."""
+    return {
+        component.library: [imports.ImportVar(tag=None, render=False)],
+        path: [imports.ImportVar(tag=component.tag, alias=component.alias, is_default=True, install=False)],
+    }
+
+
 class AntdComponent(Component):
-    """A component that wraps a Chakra component."""
+    """A component that wraps a Chakra component.
+
+    Imported from antd/es/<component> and not wrapped around the app: pages using antd
+    components put them under page_root(), the other pages don't load antd at all.
+    """
 
     library = "antd"
 
-    @staticmethod
-    @lru_cache(maxsize=None)
-    def _get_app_wrap_components() -> dict[tuple[int, str], Component]:
-        return {
-            (160, "AntdProvider"): antd_provider,
-        }
+    # next/dynamic import of the component module, split out of the page chunk
+    _dynamic: bool = PrivateAttr(default=False)
+
+    def _get_module_path(self) -> str:
+        return f'antd/es/{format.to_kebab_case(self.tag)}'
+
+    def _get_imports(self) -> imports.ImportDict:
+        _imports = super()._get_imports()
+        _imports.pop(self.library, None)
+        deep = _deep_imports(self, self._get_module_path())
+        if self._dynamic:
+            deep[self._get_module_path()] = [imports.ImportVar(tag=None, render=False, install=False)]
+            deep["next/dynamic"] = [imports.ImportVar(tag="dynamic", is_default=True)]
+        return imports.merge_imports(_imports, deep)
+
+    def _get_dynamic_imports(self) -> str | None:
+        if not self._dynamic:
+            return None
+        return f"const {self.alias or self.tag} = dynamic(() => import('{self._get_module_path()}'), {{ ssr: false }});"
 
     # @classmethod
     # @lru_cache(maxsize=None)
@@ -60,32 +93,24 @@ class AntdProvider(AntdComponent):
     theme: Var[str]
 
     @classmethod
-    def create(cls) -> Component:
+    def create(cls, *children, **props) -> Component:
         """Create a new AntdProvider component.
 
         Returns:
             A new AntdProvider component.
         """
         return super().create(
+            *children,
             theme=Var.create("theme", _var_is_local=False),
+            **props,
         )
 
     def _get_imports(self) -> imports.ImportDict:
         _imports = super()._get_imports()
-        _imports.setdefault("/utils/theme.js", []).append(
-            imports.ImportVar(tag="theme", is_default=True),
+        return imports.merge_imports(
+            _imports,
+            {"/utils/theme.js": [imports.ImportVar(tag="theme", is_default=True)]},
         )
-        return _imports
-
-    @staticmethod
-    @lru_cache(maxsize=None)
-    def _get_app_wrap_components() -> dict[tuple[int, str], Component]:
-        return {
-            (170, "AntdRegistryProvider"): antd_registry_provider,
-        }
-
-
-antd_provider = AntdProvider.create()
 
 
 class AntdRegistryProvider(Component):
@@ -93,7 +118,9 @@ class AntdRegistryProvider(Component):
     tag = "AntdRegistry"
 
 
-antd_registry_provider = AntdRegistryProvider.create()
+def page_root(*children, **props) -> Component:
+    """The antd providers around the content of a page that uses antd components."""
+    return AntdRegistryProvider.create(AntdProvider.create(*children, **props))
 
 # class ChakraColorModeProvider(Component):
 #     """Next-themes integration for chakra colorModeProvider."""
@@ -109,6 +136,12 @@ antd_registry_provider = AntdRegistryProvider.create()
 class IconComponent(Component):
     library = "@ant-design/icons"
 
+    def _get_imports(self) -> imports.ImportDict:
+        # one module per icon, the barrel pulls in the whole icon set
+        _imports = super()._get_imports()
+        _imports.pop(self.library, None)
+        return imports.merge_imports(_imports, _deep_imports(self, f'{self.library}/es/icons/{self.tag}'))
+
 
 class CustomerServiceOutlinedIcon(IconComponent):
     tag = 'CustomerServiceOutlined'
@@ -140,7 +173,33 @@ class Table(AntdComponent):
     columns: Optional[rx.Var[list[dict[str, Any]]]]
     _columns: Optional[list[dict[str, Any]]] = PrivateAttr()
     filters: Optional[rx.Var[dict[str, Any]]]
+    # server side paging: dict(current=, pageSize=, total=), data_source only holds the current page
+    pagination: Optional[rx.Var[Union[bool, dict[str, Any]]]]
+    # keyed row ops (demo.table_data.diff) applied on top of data_source by the client
+    data_patch: Optional[rx.Var[dict[str, Any]]]
+    # antd virtual list, needs scroll=dict(y=...)
+    virtual: Optional[rx.Var[bool]]
+    scroll: Optional[rx.Var[dict[str, Any]]]
+    # server fetched rows around the viewport: dict(view=, total=, start=, rows=), answers
+    # on_range_change; the table renders only those (+ spacers), needs scroll=dict(y=...)
+    row_block: Optional[rx.Var[dict[str, Any]]]
+    _row_fetch: dict[str, int] = PrivateAttr(default_factory=dict)
+    # ('debounce' | 'throttle', ms) applied to on_change on the client
+    _change_rate: Optional[tuple[str, int]] = PrivateAttr(default=None)
     _expandable: Optional[dict] = PrivateAttr(default=None)
+    # lazy expandable: row key -> detail payload of the expanded rows, filled by on_expand_row;
+    # expandedRowRender then gets (record, detail)
+    row_details: Optional[rx.Var[dict[str, Any]]]
+    # true when data_source holds every row (the server picks it from the row count): the ex columns
+    # get local sorter/onFilter functions, pagination is local and onChange is not sent
+    local_mode: Optional[rx.Var[bool]]
+    # {dataIndex: {op: value}} for the ex columns declaring aggregate=[count|sum|mean|min|max], shown
+    # in a summary row; local mode tables aggregate their filtered rows on the client instead
+    summary_data: Optional[rx.Var[dict[str, Any]]]
+    # label -> export url (with its ?format=) rendered as the table title, the view's query appended:
+    # export_query (the server's view) or, in local mode, the filters/sort antd applies in the browser
+    export_links: Optional[rx.Var[dict[str, str]]]
+    export_query: Optional[rx.Var[str]]
     # rowSelection: rx.Var[dict[str, Any]]
 
     @property
@@ -151,11 +210,47 @@ class Table(AntdComponent):
     def is_ex_expandable(self) -> bool:
         return self._expandable is not None
 
+    @property
+    def is_ex_patch(self) -> bool:
+        return self.data_patch is not None
+
+    @property
+    def is_ex_virtual(self) -> bool:
+        return self.row_block is not None
+
+    @property
+    def is_ex_lazy_expand(self) -> bool:
+        return self.row_details is not None
+
+    @property
+    def is_ex_local_mode(self) -> bool:
+        return self.local_mode is not None
+
+    @property
+    def is_ex_summary(self) -> bool:
+        has_data = self.summary_data is not None or self.is_ex_local_mode
+        return has_data and self.is_ex_columns and any(c.get('aggregate') for c in self._columns)
+
+    @property
+    def is_ex_export(self) -> bool:
+        return self.export_links is not None
+
+    @property
+    def is_ex_rate_limited(self) -> bool:
+        return self._change_rate is not None
+
+    @property
+    def is_ex_wrapped(self) -> bool:
+        return (self.is_ex_patch or self.is_ex_virtual or self.is_ex_rate_limited or self.is_ex_lazy_expand
+                or self.is_ex_local_mode or self.is_ex_summary or self.is_ex_export)
+
     @property
     def is_ex(self) -> bool:
-        return self.is_ex_columns or self.is_ex_expandable
+        return self.is_ex_columns or self.is_ex_expandable or self.is_ex_wrapped
 
-    def __init__(self, *args, columns=None, expandable=None, **kwargs):
+    def __init__(self, *args, columns=None, expandable=None, row_fetch=None,
+                 change_debounce: Optional[int] = None, change_throttle: Optional[int] = None,
+                 dynamic: bool = False, **kwargs):
         if isinstance(columns, rx.Var):
             self._columns = None
             kwargs['columns'] = columns
@@ -163,27 +258,38 @@ class Table(AntdComponent):
             self._columns = columns
         super().__init__(*args, **kwargs)
         self._expandable = expandable
+        # block_size rows per fetch, at most max_blocks cached, margin rows prefetched around the viewport
+        self._row_fetch = {**dict(block_size=100, max_blocks=20, margin=30, row_height=55), **(row_fetch or {})}
+        if change_debounce is not None:
+            self._change_rate = ('debounce', change_debounce)
+        elif change_throttle is not None:
+            self._change_rate = ('throttle', change_throttle)
+        if dynamic:
+            # not the statically imported name, other tables on the page may not be dynamic
+            self._dynamic = True
+            self.alias = 'AntdTableDynamic'
 
     def _get_imports(self) -> imports.ImportDict:
         import_list = []
         _imports = super()._get_imports()
 
-        def _check_obj(d: Any):
-            if isinstance(d, dict):
-                for k, v in d.items():
-                    _check_obj(v)
-            elif isinstance(d, list):
-                for i in d:
-                    _check_obj(i)
-            elif isinstance(d, rx.Component):
-                import_list.append(d.get_imports())
-            elif callable(d):
-                _check_obj(d())
-        for ex in [self._expandable, ]:
-            _check_obj(ex)
+        if self.is_ex_columns:
+            import_list.append(self._build_ex_code(self._columns)[2])
+        if self.is_ex_expandable:
+            import_list.append(self._build_ex_code(self._expandable)[2])
         # _imports.setdefault(self.__fields__["library"].default, []).append(
         #     imports.ImportVar(tag="TableColumnsType", is_default=False),
         # )
+        if self.is_ex_patch:
+            import_list.append(row_patch_imports)
+        if self.is_ex_virtual:
+            import_list.append(row_blocks_imports)
+        if self.is_ex_rate_limited:
+            import_list.append(rate_limit_imports)
+        if self.is_ex_lazy_expand:
+            import_list.append(lazy_expand_imports)
+        if self.is_ex_local_mode:
+            import_list.append(local_view_imports)
         if import_list:
             return imports.merge_imports(_imports, *import_list)
         return _imports
@@ -192,6 +298,9 @@ class Table(AntdComponent):
         _triggers = super().get_event_triggers()
         _triggers.update({
             EventTriggers.ON_CHANGE: lambda pagination, filters, sorter: [pagination, filters, sorter],
+            'on_patch_gap': lambda: [],
+            'on_range_change': lambda start, stop: [start, stop],
+            'on_expand_row': lambda key: [key],
         })
         return _triggers
 
@@ -204,16 +313,28 @@ class Table(AntdComponent):
     def _get_expandable_name(self) -> str:
         return f'{self._get_unique_name()}_expandable'
 
+    def _get_table_name(self) -> str:
+        return f'{self._get_unique_name()}_table'
+
+    @staticmethod
+    def _build_ex_code(items: Union[dict, list]) -> tuple[str, str, imports.ImportDict]:
+        """Generate (js body, state contexts, imports) for an ex spec, memoized on its fingerprint."""
+        return ex_code_cache.get(items, lambda: Table._gen_ex_code(items))
+
     @staticmethod
-    def _get_ex_code(name: str, code_name: str, items: Union[dict, list]) -> str:
+    def _gen_ex_code(items: Union[dict, list]) -> tuple[str, str, imports.ImportDict]:
         _states = []
+        _imports = []
 
         def _kvs(_items: dict, lines=None, sep=''):
             lines.append('{')
             for k, v in _items.items():
                 if isinstance(v, LambdaType):
                     args = inspect.signature(v).parameters
-                    lines.append(f"  {k}: ({','.join(args.keys())}) => {v(None)},")
+                    body = v(None)
+                    if isinstance(body, rx.Component):
+                        _imports.append(body.get_imports())
+                    lines.append(f"  {k}: ({','.join(args.keys())}) => {body},")
                 elif isinstance(v, str):
                     lines.append(f"  {k}: '{v}',")
                 else:
@@ -222,7 +343,7 @@ class Table(AntdComponent):
                     elif isinstance(v, rx.Var):
                         if v._var_data is None:
                             continue
-                        _states.append(v)
+                        _states.append(v._var_state.replace('.', '__'))
                         v = v._var_full_name
                     lines.append(f"  {k}: {v},")
             lines.append(f'}}{sep}')
@@ -241,8 +362,23 @@ class Table(AntdComponent):
 
         codes = _columns() if isinstance(items, list) else _dict()
         states = '\n'.join(
-            f"const {s._var_state.replace('.', '__')} = useContext(StateContexts.{s._var_state.replace('.', '__')});"
-            for s in _states)
+            f"const {s} = useContext(StateContexts.{s});"
+            for s in dict.fromkeys(_states))
+        return codes, states, imports.merge_imports(*_imports)
+
+    @staticmethod
+    def _get_ex_code(name: str, code_name: str, items: Union[dict, list], local: bool = False) -> str:
+        codes, states, _ = Table._build_ex_code(items)
+        if local:
+            # columns (local) => with sorter/onFilter functions when the whole table is on the client
+            return f"""
+        function {code_name} (local) {{
+            const [addEvents, connectError] = useContext(EventLoopContext);
+            {states}
+            const {name} = {codes}
+            return local ? localSortFilter({name}) : {name};
+        }}
+        """
         return f"""
         function {code_name} () {{
             const [addEvents, connectError] = useContext(EventLoopContext);
@@ -252,11 +388,45 @@ class Table(AntdComponent):
         """
 
     def _get_columns_code(self) -> str:
-        return self._get_ex_code('columns', self._get_columns_name(), self._columns)
+        return self._get_ex_code('columns', self._get_columns_name(), self._columns, self.is_ex_local_mode)
 
     def _get_expandable_code(self) -> str:
         return self._get_ex_code('expandable', self._get_expandable_name(), self._expandable)
 
+    def _get_table_code(self) -> str:
+        hooks = ['let rows = dataSource;']
+        if self.is_ex_patch:
+            hooks.append("rows = useRowPatch(rows, dataPatch, 'key', onPatchGap);")
+        if self.is_ex_virtual:
+            options = json.dumps({format.to_camel_case(k): v for k, v in self._row_fetch.items()})
+            hooks.append(
+                f"rows = useRowBlocks(props, rowBlock, onRangeChange, "
+                f"{{...{options}, height: (props.scroll && props.scroll.y) || 400}});"
+            )
+        if self.is_ex_rate_limited:
+            mode, wait = self._change_rate
+            hooks.append(f"props.onChange = useRateLimited(props.onChange, '{mode}', {int(wait)});")
+        if self.is_ex_lazy_expand:
+            hooks.append("props.expandable = useLazyExpandable(props.expandable, rowDetails, onExpandRow);")
+        if self.is_ex_local_mode:
+            # every row is here: antd pages, sorts and filters them, nothing to ask the server
+            hooks.append("if (localMode) { delete props.onChange; "
+                         "props.pagination = props.pagination && {pageSize: props.pagination.pageSize}; }")
+            hooks.append("const localView = useLocalView(props, localMode);")
+        local_view = 'localView' if self.is_ex_local_mode else 'null'
+        if self.is_ex_summary:
+            local = 'localMode' if self.is_ex_local_mode else 'false'
+            hooks.append(f"useTableSummary(props, summaryData, {local}, rows, {local_view} && {local_view}.filters);")
+        if self.is_ex_export:
+            hooks.append(f"useExportLinks(props, exportLinks, exportQuery, {local_view});")
+        hooks = '\n            '.join(hooks)
+        return f"""
+        const {self._get_table_name()} = forwardRef(({{dataSource, dataPatch, onPatchGap, rowBlock, onRangeChange, rowDetails, onExpandRow, localMode, summaryData, exportLinks, exportQuery, ...props}}, ref) => {{
+            {hooks}
+            return <{self.alias or self.tag} ref={{ref}} dataSource={{rows}} {{...props}}/>;
+        }});
+        """
+
     def _get_custom_code(self) -> str | None:
         if not self.is_ex:
             return
@@ -264,18 +434,43 @@ class Table(AntdComponent):
         codes = [
             self._get_columns_code() if self.is_ex_columns else "",
             self._get_expandable_code() if self.is_ex_expandable else "",
+            self._get_table_code() if self.is_ex_wrapped else "",
         ]
         return '\n'.join(codes)
 
+    def get_custom_code(self) -> set[str]:
+        code = super().get_custom_code()
+        # shared by every patched / virtual table, emitted once per page
+        if self.is_ex_patch:
+            code.add(row_patch_code)
+        if self.is_ex_virtual:
+            code.add(row_blocks_code)
+        if self.is_ex_rate_limited:
+            code.add(rate_limit_code)
+        if self.is_ex_lazy_expand:
+            code.add(lazy_expand_code)
+        if self.is_ex_local_mode and self.is_ex_columns:
+            code.add(local_sort_code)
+        if self.is_ex_local_mode:
+            code.add(local_view_code)
+        if self.is_ex_export:
+            code.add(export_links_code)
+        if self.is_ex_summary:
+            code.add(table_summary_code)
+        return code
+
     def _render(self, props: dict[str, Any] | None = None) -> Tag:
         if not self.is_ex:
             return super()._render(props=props)
-        tag = super()._render() \
-            .remove_props('columns', )
+        tag = super()._render()
 
+        if self.is_ex_wrapped:
+            tag.name = self._get_table_name()
         if self.is_ex_columns:
+            tag.remove_props('columns', )
+            local = self.local_mode._var_name_unwrapped if self.is_ex_local_mode else ''
             tag.special_props.add(
-                Var.create_safe(f"columns={{{self._get_columns_name()}()}}"),
+                Var.create_safe(f"columns={{{self._get_columns_name()}({local})}}"),
             )
         if self.is_ex_expandable:
             tag.special_props.add(
@@ -285,6 +480,9 @@ class Table(AntdComponent):
         return tag
 
 
+# generated ex columns/expandable code shared by every table with the same spec
+ex_code_cache: CodeCache[tuple[str, str, imports.ImportDict]] = CodeCache('antd_ex')
+
 icon = IconComponent.create
 button = ButtonComponent.create
 float_button = FloatButton.create
@@ -1,15 +1,17 @@
-from typing import Any
-import json
 import reflex as rx
 from reflex import Var
 from . import antd
+from ..exports import export_url
+from .state import ALLOW_REFRESH, ROW_BLOCK_SIZE, AntdState, VirtualState
 
 
 ex_expandable = {
-    "expandedRowRender": lambda record=None:
+    # detail: AntdState.row_details[record.key], fetched when the row is first expanded
+    "expandedRowRender": lambda record=None, detail=None:
         rx.flex(
             rx.link(rx.button(Var.create_safe('{record.key}')), rx.text('-ok'), href='/'),
             rx.card(rx.button(Var.create_safe('{record.name}')), rx.text('-ok'), ),
+            rx.text(Var.create_safe('{detail.visits}'), ' visits, last: ', Var.create_safe('{detail.last_visit}')),
             spacing="2",
         ),
     "rowExpandable": lambda record=None: "record.gender !== 'female'",
@@ -21,108 +23,58 @@ ex_expandable = {
 # ),
 # }
 
-_data: list[dict[str, Any]] = [
-    dict(key='1', name='Fike', age=32, gender='male', address='11 Downing Street', ),
-    dict(key='2', name='John', age=42, gender='female', address='12 Downing Street', ),
-    dict(key='3', name='Aim', age=22, gender='male', address='13 Downing Street', ),
-    dict(key='4', name='Expandable', age=52, gender='female', address='14 Downing Street', ),
-    dict(key='5', name='Black', age=62, gender='male', address='15 Downing Street', ),
-]
-
-
-class AntdState(rx.State):
-    """Define empty state to allow access to rx.State.router."""
-
-    table_gender_filter = [
-        dict(text="Male", value="male"),
-        dict(text="Female", value="female"),
-    ]
-    data_source: list[dict[str, Any]] = _data[:]
-
-    columns = [
-        dict(title='Id', dataIndex='key', key='key', ),
-        dict(title='Name', dataIndex='name', key='name', ),
-        dict(title='Age', dataIndex='age', key='age', ),
-        dict(title='Address', dataIndex='address', key='address', ),
-    ]
-
-    def on_selection_change(self):
-        print(self, 'works')
-        rx.console_log('works')
-
-    def on_table_change(self, pagination, filters, sorter):
-        print("on_table_change:", pagination, filters, sorter)
-        self.data_source = _data
-        if 'gender' in filters and filters['gender'] is not None:
-            # test table_gender_filter
-            self.data_source = [d for d in _data if d['gender'] in filters['gender']]
-            if len(filters['gender']) >= 2 and self.table_gender_filter[-1]['text'] != 'Test':
-                self.table_gender_filter.append(dict(text="Test", value="test"))
-            elif self.table_gender_filter[-1]['text'] == 'Test':
-                self.table_gender_filter.pop(-1)
-
-        if sorter and sorter['column'] is not None:
-            field, order = sorter['field'], sorter['order']
-            self.data_source = sorted(self.data_source, key=lambda d: d[field], reverse=bool(order == 'descend'))
-
-    @classmethod
-    def get_columns(cls):
-        ex_columns = [
-            dict(
-                title='Id',
-                dataIndex='key',
-                key='key',
-                sorter='true',
-                defaultSortOrder='descend',
-                render=lambda text=None: '<a>{text}</a>',
-            ),
-            dict(
-                title='Name',
-                dataIndex='name',
-                key='name',
-                sorter='true',
-                render=lambda text=None: rx.code(Var.create_safe('{text}')),
-            ),
-            dict(
-                title='Age',
-                dataIndex='age',
-                key='age',
-            ),
-            dict(
-                title='Gender',
-                dataIndex='gender',
-                key='gender',
-                filters=cls.table_gender_filter,
-            ),
-            dict(
-                title='Address',
-                dataIndex='address',
-                key='address',
-                ellipsis='true',
-                copyable='true',
-            ),
-        ]
-        return ex_columns
-
-
 def antd1() -> rx.Component:
     return rx.flex(
         antd.button("antd_demo ok"),
         rx.card(
             rx.text('antd_demo table'),
             antd.Table(
+                id='antd1',
                 data_source=AntdState.data_source, columns=AntdState.columns,
+                data_patch=AntdState.data_patch, on_patch_gap=AntdState.resync_rows,
             )
         ),
         rx.card(
-            rx.text('antd_demo tableEx'),
+            rx.hstack(
+                rx.text('antd_demo tableEx'),
+                # value + on_change: a debounced input, on_search coalesces what still comes in quick succession
+                rx.input(placeholder='Search', value=AntdState.search, on_change=AntdState.on_search, size='1'),
+                *([rx.button('Refresh rows', on_click=AntdState.refresh_data, size='1')] if ALLOW_REFRESH else []),
+                align='center',
+            ),
             antd.Table(
                 id='antdEx1',  # need
                 data_source=AntdState.data_source,
+                pagination=AntdState.pagination,
+                data_patch=AntdState.data_patch,
+                on_patch_gap=AntdState.resync_rows,
+                row_details=AntdState.row_details,
+                on_expand_row=AntdState.on_expand_row,
+                local_mode=AntdState.local_mode,
+                summary_data=AntdState.summary,
+                # CSV/XLSX of the view shown, local mode ones included
+                export_links={'CSV': export_url('antd', 'csv'), 'XLSX': export_url('antd', 'xlsx')},
+                export_query=AntdState.export_query,
                 # filters={'gender': ['male']},
                 columns=AntdState.get_columns(),
                 expandable=ex_expandable,
                 on_change=AntdState.on_table_change,
+                change_debounce=200,
+            )
+        ),
+        rx.card(
+            rx.text('antd_demo virtual table'),
+            antd.Table(
+                id='antdVirtual1',
+                scroll=dict(y=400),
+                pagination=False,
+                row_block=VirtualState.row_block,
+                row_fetch=dict(block_size=ROW_BLOCK_SIZE),
+                on_range_change=VirtualState.on_table_range,
+                columns=AntdState.get_columns(),
+                on_change=VirtualState.on_table_change,
+                change_throttle=300,
+                dynamic=True,
             )
         ),
         antd.float_button(
@@ -134,9 +86,8 @@ def antd1() -> rx.Component:
     )
 
 
-@rx.page('/antd_demo')
 def index() -> rx.Component:
-    return rx.center(
+    return antd.page_root(rx.center(
         rx.link('<- back', href='/'),
         rx.vstack(
             rx.heading("Dashboard", size="8"),
@@ -152,4 +103,4 @@ def index() -> rx.Component:
             font_size="2em",
         ),
         height="100vh",
-    )
+    ))
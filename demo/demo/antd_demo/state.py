@@ -0,0 +1,425 @@
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence, TypeVar
+from urllib.parse import urlencode
+import asyncio
+import json
+import os
+import reflex as rx
+from reflex import Var
+from ..table_data import (
+    SEARCH_FILTER, IndexedProvider, IndexedTable, LRUCache, SqliteProvider, SummaryIndex, TableProvider, TableView,
+    ViewFanout, aggregate_spec, diff_rows, is_full_resend, next_patch, normalize_pagination, page_slice, row_changes,
+    snapshot_patch, with_search,
+)
+
+T = TypeVar('T')
+
+# server side coalescing window for table changes, seconds
+CHANGE_SETTLE = 0.05
+# expanded row details kept in each session, older ones are fetched again (from _detail_cache)
+MAX_ROW_DETAILS = 20
+# tables of at most this many rows are sent whole, antd sorts/filters/pages them on the client
+LOCAL_THRESHOLD = int(os.environ.get('ANTD_LOCAL_THRESHOLD', 1000))
+# the demo's "Refresh rows" button (refresh_data), any client could rewrite the shared rows with it
+ALLOW_REFRESH = os.environ.get('ANTD_ALLOW_REFRESH', '').lower() in ('1', 'true', 'on', 'yes')
+# columns the search box looks in
+SEARCH_FIELDS = ('name', 'age', 'gender', 'address')
+
+_data: list[dict[str, Any]] = [
+    dict(key='1', name='Fike', age=32, gender='male', address='11 Downing Street', ),
+    dict(key='2', name='John', age=42, gender='female', address='12 Downing Street', ),
+    dict(key='3', name='Aim', age=22, gender='male', address='13 Downing Street', ),
+    dict(key='4', name='Expandable', age=52, gender='female', address='14 Downing Street', ),
+    dict(key='5', name='Black', age=62, gender='male', address='15 Downing Street', ),
+]
+
+
+class AntdState(rx.State):
+    """Define empty state to allow access to rx.State.router."""
+
+    table_gender_filter = [
+        dict(text="Male", value="male"),
+        dict(text="Female", value="female"),
+    ]
+    pagination: dict[str, int] = normalize_pagination(None, len(_data))
+    # baseline rows, only resent on resync; row changes go out as data_patch ops
+    data_source: list[dict[str, Any]] = page_slice(_data, pagination)
+    data_patch: dict[str, Any] = {}
+    _rows: list[dict[str, Any]] = page_slice(_data, pagination)
+    _change_seq: int = 0
+    row_details: dict[str, dict[str, Any]] = {}
+    # data_source holds every row, see load_table
+    local_mode: bool = False
+    # summary row of the filtered table (server mode), kept by table_summaries
+    summary: dict[str, dict[str, Any]] = {}
+    _filters: dict[str, Any] = {}
+    _sorter: dict[str, Any] = {}
+    # search box text, added to the filters as SEARCH_FILTER
+    search: str = ''
+    # query params of the export of the current (server mode) view, see export_view
+    export_query: str = ''
+
+    columns = [
+        dict(title='Id', dataIndex='key', key='key', ),
+        dict(title='Name', dataIndex='name', key='name', ),
+        dict(title='Age', dataIndex='age', key='age', ),
+        dict(title='Address', dataIndex='address', key='address', ),
+    ]
+
+    def on_selection_change(self):
+        print(self, 'works')
+        rx.console_log('works')
+
+    @rx.background
+    async def on_table_change(self, pagination, filters, sorter):
+        # a newer change for this session supersedes the ones still waiting for the lock
+        async with self:
+            self._change_seq += 1
+            seq = self._change_seq
+        await asyncio.sleep(CHANGE_SETTLE)
+        async with self:
+            if seq != self._change_seq:
+                return
+            self._update_gender_filter(filters)
+            # antd only sends its column filters, the search box text goes along with them
+            filters = with_search(filters, self.search)
+        return await self._fetch_view(seq, pagination, filters, sorter)
+
+    @rx.background
+    async def on_search(self, text: str):
+        """Search box: the rows with every term of `text` in SEARCH_FIELDS, within the column filters and sort."""
+        async with self:
+            self._change_seq += 1
+            seq = self._change_seq
+            self.search = text
+        await asyncio.sleep(CHANGE_SETTLE)
+        async with self:
+            if seq != self._change_seq:
+                return
+            filters = with_search(self._filters, text)
+            # back to the first page; a local mode table gets every matching row and filters/sorts them itself
+            pagination = dict(current=1, pageSize=LOCAL_THRESHOLD if self.local_mode else self.pagination['pageSize'])
+            sorter = self._sorter
+        return await self._fetch_view(seq, pagination, filters, sorter)
+
+    async def _fetch_view(self, seq: int, pagination, filters, sorter):
+        """Query the view outside the state lock and apply it, unless a newer change came in meanwhile."""
+        async with self:
+            page_size = self.pagination['pageSize']
+            local = self.local_mode
+            token = self.router.session.client_token
+        # blocking providers run in a worker thread
+        page, rows = await _provider.fetch(pagination, filters, sorter, page_size)
+        summary = None if local else await table_summary(filters)
+        async with self:
+            if seq != self._change_seq:
+                return
+            self.pagination = normalize_pagination(self.pagination, page['total']) if local else page
+            self._set_rows(rows)
+            self._filters = filters
+            self._sorter = sorter or {}
+            if summary is not None:
+                self.summary = summary
+            self.export_query = export_query(filters, sorter)
+            view = pagination if local else page
+            if not table_fanout.update(token, view, filters, sorter, page_size):
+                # the socket closed (and reconnected since, without an on_load) or the session idled out
+                return self._subscribe(view, filters, sorter)
+
+    def _subscribe(self, pagination, filters, sorter):
+        """Subscribe the session's socket to pushes of this view, returns the handler that applies them."""
+        table_fanout.subscribe(self.router.session.client_token, pagination, filters, sorter,
+                               self.pagination['pageSize'], sid=self.router.session.session_id)
+        return AntdState.watch_table
+
+    async def load_table(self):
+        """on_load: the whole table when it has at most LOCAL_THRESHOLD rows, else its first page."""
+        page_size = self.pagination['pageSize']
+        total = await provider_query(_provider.count, None)
+        self.local_mode = total <= LOCAL_THRESHOLD
+        table_modes['local' if self.local_mode else 'server'] += 1
+        self.pagination = normalize_pagination(None, total, page_size)
+        # every row or the first page, only what the mode shows
+        self._rows = await provider_query(_provider.rows, None, None, 0, total if self.local_mode else page_size)
+        self._filters = {}
+        self._sorter = {}
+        self.search = ''
+        self.export_query = export_query(None, None)
+        if not self.local_mode:
+            self.summary = await table_summary(None)
+        self.resync_rows()
+        # a local session watches the whole table, a server one its current page
+        return self._subscribe(dict(current=1, pageSize=max(LOCAL_THRESHOLD, 1)) if self.local_mode else self.pagination,
+                               None, None)
+
+    @rx.background
+    async def watch_table(self):
+        """Apply the pages pushed after a row refresh, until the session subscribes again, disconnects or idles out."""
+        async with self:
+            sub = table_fanout.subscription(self.router.session.client_token)
+        while sub is not None and (page := await table_fanout.next_page(sub)) is not None:
+            pagination, rows = page
+            async with self:
+                if self.local_mode:
+                    pagination = normalize_pagination(self.pagination, pagination['total'])
+                self.pagination = pagination
+                self._set_rows(rows)
+                filters = None if self.local_mode else self._filters
+            if filters is not None:
+                summary = await table_summary(filters)
+                async with self:
+                    self.summary = summary
+
+    async def refresh_data(self):
+        """Stands in for a background reload of the rows, every session gets its view pushed.
+
+        It rewrites the rows of every session, so it only runs with ALLOW_REFRESH.
+        """
+        if not ALLOW_REFRESH:
+            return
+        await refresh_rows([dict(r, age=r['age'] + 1) for r in _data])
+
+    def _set_rows(self, rows: list[dict[str, Any]]):
+        ops = diff_rows(self._rows, rows)
+        self._rows = rows
+        if is_full_resend(ops, rows):
+            self.resync_rows()
+        elif ops:
+            self.data_patch = next_patch(self.data_patch, ops)
+
+    def resync_rows(self):
+        self.data_source = [dict(r) for r in self._rows]
+        self.data_patch = snapshot_patch(self.data_patch)
+        table_fanout.touch(self.router.session.client_token)
+
+    @rx.background
+    async def on_expand_row(self, key: str):
+        detail = _detail_cache.get(key)
+        if detail is None:
+            detail = await asyncio.to_thread(_row_detail, key)
+            _detail_cache.put(key, detail)
+        async with self:
+            details = {k: v for k, v in self.row_details.items() if k != key}
+            details[key] = detail
+            self.row_details = dict(list(details.items())[-MAX_ROW_DETAILS:])
+
+    def _upsert_row(self, row: dict[str, Any]):
+        """Server side row change, not an event handler: clients cannot send rows.
+
+        Returns on_expand_row for the calling handler to chain when the row's detail was shown.
+        """
+        key = row['key']
+        _detail_cache.pop(key)
+        for i, r in enumerate(self._rows):
+            if r['key'] == key:
+                self._rows[i] = row
+                self.data_patch = next_patch(self.data_patch, [['u', key, row]])
+                break
+        else:
+            self._rows.append(row)
+            self.data_patch = next_patch(self.data_patch, [['i', len(self._rows) - 1, row]])
+        if key in self.row_details:
+            # an expanded row shows 'Loading...' until its detail is fetched again
+            self.row_details = {k: v for k, v in self.row_details.items() if k != key}
+            return AntdState.on_expand_row(key)
+
+    def _delete_row(self, key: str):
+        self._rows = [r for r in self._rows if r['key'] != key]
+        self.data_patch = next_patch(self.data_patch, [['d', key]])
+
+    def _update_gender_filter(self, filters):
+        if 'gender' in filters and filters['gender'] is not None:
+            # test table_gender_filter
+            if len(filters['gender']) >= 2 and self.table_gender_filter[-1]['text'] != 'Test':
+                self.table_gender_filter.append(dict(text="Test", value="test"))
+            elif self.table_gender_filter[-1]['text'] == 'Test':
+                self.table_gender_filter.pop(-1)
+
+    @classmethod
+    def get_columns(cls):
+        ex_columns = [
+            dict(
+                title='Id',
+                dataIndex='key',
+                key='key',
+                sorter='true',
+                defaultSortOrder='descend',
+                aggregate=['count'],
+                render=lambda text=None: '<a>{text}</a>',
+            ),
+            dict(
+                title='Name',
+                dataIndex='name',
+                key='name',
+                sorter='true',
+                render=lambda text=None: rx.code(Var.create_safe('{text}')),
+            ),
+            dict(
+                title='Age',
+                dataIndex='age',
+                key='age',
+                aggregate=['sum', 'mean', 'min', 'max'],
+            ),
+            dict(
+                title='Gender',
+                dataIndex='gender',
+                key='gender',
+                filters=cls.table_gender_filter,
+            ),
+            dict(
+                title='Address',
+                dataIndex='address',
+                key='address',
+                ellipsis='true',
+                copyable='true',
+            ),
+        ]
+        return ex_columns
+
+
+# sort permutations / filter bitmaps built once per process, shared by every session
+_table = IndexedTable.from_columns(_data, AntdState.get_columns())
+
+
+def _make_provider() -> TableProvider:
+    # ANTD_TABLE_PROVIDER=sqlite pushes sort/filter/paging down to a SQLite file instead
+    if os.environ.get('ANTD_TABLE_PROVIDER') == 'sqlite':
+        return SqliteProvider.from_rows(
+            os.environ.get('ANTD_TABLE_DB', 'antd_demo.db'), 'antd_rows', _data,
+            sortable=_table.sortable, filterable=_table.filterable, search_fields=SEARCH_FIELDS,
+        )
+    return IndexedProvider(_table, search_fields=SEARCH_FIELDS)
+
+
+_provider = _make_provider()
+# sessions subscribed to their current view, a row refresh computes each distinct view once
+table_fanout = ViewFanout(_provider, channel='antd_rows')
+
+# page loads in each mode, for the metrics endpoint
+table_modes: dict[str, int] = dict(local=0, server=0)
+
+
+def table_mode_info() -> dict[str, Any]:
+    return dict(local_threshold=LOCAL_THRESHOLD, page_loads=dict(table_modes))
+
+
+async def provider_query(fn: Callable[..., T], *args) -> T:
+    """Call a _provider method, in a worker thread when the provider blocks."""
+    if _provider.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+# aggregates of the `aggregate` columns per filter, updated per changed row on refresh
+table_summaries = SummaryIndex(aggregate_spec(AntdState.get_columns()), search_fields=SEARCH_FIELDS)
+
+
+def _filtered_rows(filters) -> list[dict[str, Any]]:
+    return _provider.rows(filters, None, 0, _provider.count(filters))
+
+
+async def table_summary(filters) -> dict[str, dict[str, Any]]:
+    return await provider_query(table_summaries.result, filters, _filtered_rows)
+
+
+# one refresh at a time, each diffs against the rows the previous one left
+_refresh_lock = asyncio.Lock()
+
+
+async def refresh_rows(rows: list[dict[str, Any]]):
+    """Replace the shared rows and push the refreshed views to every subscribed session."""
+    async with _refresh_lock:
+        changes = row_changes(_data, rows)
+        # the provider has the new rows before the kept summaries get their changes
+        with table_summaries.refresh():
+            await provider_query(_provider.replace_rows, rows)
+            _data[:] = rows
+            table_summaries.apply(changes)
+    _detail_cache.clear()
+    await table_fanout.publish()
+
+
+def export_query(filters, sorter) -> str:
+    params = dict(filters=json.dumps({f: v for f, v in (filters or {}).items() if v}, separators=(',', ':')))
+    if sorter and sorter.get('column') is not None:
+        params.update(sort=sorter['field'], order=sorter['order'])
+    return urlencode(params)
+
+
+async def export_view(app: rx.App, params: Mapping[str, str]) -> tuple[list[str], Iterable[Sequence[Any]], Optional[int]]:
+    """Export source of the ex table's `?filters=<json>&sort=<field>&order=ascend|descend` view."""
+    columns = AntdState.get_columns()
+    try:
+        filters = json.loads(params.get('filters') or '{}')
+    except json.JSONDecodeError:
+        raise ValueError('filters must be json') from None
+    allowed = [*_table.filterable, SEARCH_FILTER]
+    if not isinstance(filters, dict) or any(
+            f not in allowed or not isinstance(v, (list, type(None)))
+            or not all(isinstance(x, (str, int, float)) for x in v or ()) for f, v in filters.items()):
+        raise ValueError(f'filters must map {sorted(allowed)} to lists of values')
+    sorter = None
+    if params.get('sort'):
+        if params['sort'] not in _table.sortable or params.get('order') not in ('ascend', 'descend'):
+            raise ValueError(f'sort must be one of {sorted(_table.sortable)}, order ascend or descend')
+        sorter = dict(field=params['sort'], column=params['sort'], order=params['order'])
+    total = await provider_query(_provider.count, filters)
+    fields = [c['dataIndex'] for c in columns]
+    # here on the event loop: the in-memory provider resolves its view now, the rows are read by the response
+    batches = _provider.iter_rows(filters, sorter)
+    rows = (tuple(r.get(f) for f in fields) for batch in batches for r in batch)
+    return [c['title'] for c in columns], rows, total
+
+# row key -> detail payload, shared by every session
+_detail_cache: LRUCache[str, dict[str, Any]] = LRUCache(maxsize=1024, ttl=300)
+
+
+def _row_detail(key: str) -> dict[str, Any]:
+    # stands in for an expensive per row lookup (orders, history, ...), runs in a worker thread
+    row = next((r for r in _data if r['key'] == key), None)
+    if row is None:
+        return {}
+    visits = sum(ord(c) for c in row['name'] + row['address']) % 97
+    return dict(key=key, visits=visits, last_visit=f'2024-01-{visits % 28 + 1:02d}')
+
+# a bigger generated dataset for the virtual table
+_many: list[dict[str, Any]] = [
+    dict(key=str(i), name=f'User {i}', age=18 + i % 60, gender=('male', 'female')[i % 2],
+         address=f'{i} Downing Street', )
+    for i in range(1, 10001)
+]
+_many_table = IndexedTable.from_columns(_many, AntdState.get_columns())
+
+ROW_BLOCK_SIZE = 100
+MAX_ROW_RANGE = 1000
+
+
+class VirtualState(rx.State):
+    """Virtual antd table, only the rows around the viewport are sent."""
+
+    row_block: dict[str, Any] = dict(view=0, total=len(_many), start=0, rows=_many[:ROW_BLOCK_SIZE])
+    _view: TableView = TableView(None, len(_many))
+    _view_version: int = 0
+    _change_seq: int = 0
+
+    @rx.background
+    async def on_table_change(self, pagination, filters, sorter):
+        async with self:
+            self._change_seq += 1
+            seq = self._change_seq
+        await asyncio.sleep(CHANGE_SETTLE)
+        async with self:
+            if seq == self._change_seq:
+                self._apply_table_change(filters, sorter)
+
+    def _apply_table_change(self, filters, sorter):
+        self._view = _many_table.view(filters, sorter)
+        self._view_version += 1
+        self.on_table_range(0, ROW_BLOCK_SIZE)
+
+    def on_table_range(self, start: int, stop: int):
+        start = max(int(start), 0)
+        stop = min(int(stop), start + MAX_ROW_RANGE, len(self._view))
+        self.row_block = dict(
+            view=self._view_version, total=len(self._view), start=start,
+            rows=_many_table.materialize(self._view[start:stop]),
+        )
@@ -0,0 +1,204 @@
+from typing import Any, Callable, Generic, Optional, TypeVar
+from types import CodeType, FunctionType, ModuleType
+from pathlib import Path
+import hashlib
+import importlib.util
+import os
+import pickle
+import shutil
+import sys
+
+import reflex as rx
+
+T = TypeVar('T')
+
+# where compiled artifacts are kept between runs, DEMO_CODE_CACHE=0 bypasses the disk cache
+CACHE_DIR_ENV = 'DEMO_CODE_CACHE_DIR'
+CACHE_ENV = 'DEMO_CODE_CACHE'
+DEFAULT_CACHE_DIR = Path(rx.constants.Dirs.WEB) / '.code_cache'
+# generator sources: an edit to any of them drops every cached entry
+_GENERATOR_MODULES = (
+    'demo.components.code_cache', 'demo.antd_demo.antd', 'demo.datatable.components',
+    'demo.components.row_index', 'demo.components.shared_popover', 'demo.components.lazy_expand',
+)
+
+
+_module_digests: dict[str, str] = {}
+
+
+def module_digest(name: str) -> str:
+    """Hash of a module's source file, found by name whether it is imported yet or not.
+
+    '' when it has none (builtins, missing), which is not memoized: the generator modules of
+    lazily compiled pages may only become importable later in the process.
+    """
+    digest = _module_digests.get(name)
+    if digest is None:
+        try:
+            spec = importlib.util.find_spec(name)
+            path = spec.origin if spec and spec.has_location else None
+            digest = hashlib.sha1(Path(path).read_bytes()).hexdigest() if path else ''
+        except (ImportError, ValueError, OSError):
+            digest = ''
+        if digest:
+            _module_digests[name] = digest
+    return digest
+
+
+def cache_version() -> str:
+    """Salt of the disk cache: python + reflex versions and the generator sources."""
+    h = hashlib.sha1(f'{sys.version_info[:2]}:{rx.constants.Reflex.VERSION}'.encode())
+    for name in _GENERATOR_MODULES:
+        h.update(f'{name}:{module_digest(name)}'.encode())
+    return h.hexdigest()[:16]
+
+
+def _global_names(code: CodeType) -> set[str]:
+    """The global names `code` and the code objects nested in it (comprehensions, lambdas) read."""
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, CodeType):
+            names |= _global_names(c)
+    return names
+
+
+def fingerprint(obj: Any) -> str:
+    """Stable content hash of a column/expandable spec: dicts, lists, vars, components and lambdas.
+
+    Lambdas hash by their bytecode, constants, defaults, closure values and the current values of
+    the globals they read: constants by value, functions recursively (with the source of their own
+    module), modules and classes by their source, so editing a helper or a constant elsewhere
+    changes the fingerprint. States also hash their event handler names, which generated code
+    calls. Two tables built from the same spec share it across processes.
+    """
+    h = hashlib.sha1()
+    seen: set[int] = set()
+
+    def _feed(v: Any):
+        if isinstance(v, dict):
+            h.update(b'{')
+            for k, i in v.items():
+                _feed(k)
+                _feed(i)
+            h.update(b'}')
+        elif isinstance(v, (list, tuple)):
+            h.update(b'[')
+            for i in v:
+                _feed(i)
+            h.update(b']')
+        elif isinstance(v, FunctionType):
+            h.update(f'fn:{v.__module__}:{v.__qualname__}:{module_digest(v.__module__)}'.encode())
+            if id(v) in seen:
+                # recursive helpers
+                return
+            seen.add(id(v))
+            _feed(v.__code__)
+            _feed(v.__defaults__)
+            _feed([c.cell_contents for c in v.__closure__ or ()])
+            for name in sorted(_global_names(v.__code__)):
+                if name not in v.__globals__:
+                    # builtins and attribute names
+                    continue
+                h.update(f'global:{name}'.encode())
+                _feed(v.__globals__[name])
+        elif isinstance(v, ModuleType):
+            h.update(f'module:{v.__name__}:{module_digest(v.__name__)}'.encode())
+        elif isinstance(v, type):
+            h.update(f'class:{v.__module__}.{v.__qualname__}:{module_digest(v.__module__)}'.encode())
+            if issubclass(v, rx.State):
+                _feed(sorted(v.event_handlers))
+        elif isinstance(v, CodeType):
+            h.update(v.co_code)
+            _feed(v.co_consts)
+            _feed(v.co_names)
+            _feed(v.co_varnames)
+        elif isinstance(v, rx.Var):
+            h.update(f'var:{v._var_full_name}:{v._var_state}'.encode())
+        else:
+            h.update(f'{type(v).__name__}:{v}'.encode())
+
+    _feed(obj)
+    return h.hexdigest()
+
+
+class CodeCache(Generic[T]):
+    """Fingerprint -> generated code, with hit/miss counters.
+
+    With a `name` entries are also pickled to `<cache dir>/<version>/<name>-<key>.pkl` and read back
+    by the next process, so an unchanged spec is not generated again on `reflex run` / hot reload.
+    Entries of other versions are removed, unreadable ones are rebuilt.
+    """
+
+    def __init__(self, name: Optional[str] = None, cache_dir: Optional[Path] = None):
+        self.name = name
+        self._cache_dir = cache_dir
+        self._entries: dict[str, T] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def disk_dir(self) -> Optional[Path]:
+        if self.name is None or os.environ.get(CACHE_ENV, '1').lower() in ('0', 'false', 'off', 'no'):
+            return None
+        root = self._cache_dir or Path(os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        return root / cache_version()
+
+    def get(self, spec: Any, build: Callable[[], T]) -> T:
+        return self.lookup(fingerprint(spec), build)
+
+    def lookup(self, key: str, build: Callable[[], T]) -> T:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        disk = self.disk_dir
+        path = disk / f'{self.name}-{key}.pkl' if disk else None
+        entry = self._load(path) if path else None
+        if entry is None:
+            self.misses += 1
+            entry = build()
+            if path:
+                self._store(path, entry)
+        else:
+            self.disk_hits += 1
+        self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _load(path: Path) -> Optional[T]:
+        try:
+            with path.open('rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # truncated / from an incompatible build: drop it, the caller rebuilds
+            path.unlink(missing_ok=True)
+            return None
+
+    @staticmethod
+    def _store(path: Path, entry: T):
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for stale in path.parent.parent.iterdir():
+                if stale.is_dir() and stale != path.parent:
+                    shutil.rmtree(stale, ignore_errors=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            tmp.write_bytes(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+            # atomic, concurrent workers writing the same key write the same content
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def info(self) -> dict[str, int]:
+        return dict(hits=self.hits, disk_hits=self.disk_hits, misses=self.misses, size=len(self._entries))
+
+    def clear(self, disk: bool = False):
+        """Forget the in-memory entries, with `disk` also this cache's files of the current version."""
+        self._entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+        if disk and self.disk_dir and self.disk_dir.exists():
+            for path in self.disk_dir.glob(f'{self.name}-*.pkl'):
+                path.unlink(missing_ok=True)
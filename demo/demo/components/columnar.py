@@ -0,0 +1,27 @@
+from reflex.utils import imports
+
+# decodes demo.table_data.ColumnarFrame.encode() into gridjs rows on the client
+columnar_imports: imports.ImportDict = {
+    "react": {imports.ImportVar(tag="useMemo")},
+}
+
+columnar_code = """
+const decodeColumnar = (frame) => {
+    const columns = frame.buffers.map((buffer, j) => {
+        const type = frame.dtypes[j];
+        if (type === 'json') return buffer;
+        const binary = atob(buffer);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+        const values = new globalThis[type](bytes.buffer);
+        return type.startsWith('Big') ? Array.from(values, Number) : values;
+    });
+    const rows = new Array(frame.length);
+    for (let i = 0; i < frame.length; i++) rows[i] = columns.map((c) => c[i]);
+    return rows;
+};
+
+const useColumnarRows = (frame) => useMemo(
+    () => (frame && frame.buffers ? decodeColumnar(frame) : frame), [frame],
+);
+"""
@@ -0,0 +1,30 @@
+# export links of a table view: the server's query (AntdState.export_query: its filters, search and
+# sort) or, for a local mode table, the column filters and sort antd applies in the browser on top
+# of the server's search
+export_links_code = """
+const localExportQuery = (serverQuery, view) => {
+    const params = new URLSearchParams(serverQuery || '');
+    if (!view) return params.toString();
+    const filters = JSON.parse(params.get('filters') || '{}');
+    for (const [field, values] of Object.entries(view.filters || {})) {
+        if (values && values.length) filters[field] = values;
+        else delete filters[field];
+    }
+    params.set('filters', JSON.stringify(filters));
+    params.delete('sort');
+    params.delete('order');
+    const sorter = view.sorter;
+    if (sorter && sorter.column && sorter.order) {
+        params.set('sort', sorter.field);
+        params.set('order', sorter.order);
+    }
+    return params.toString();
+};
+
+const useExportLinks = (props, links, serverQuery, localView) => {
+    const query = localExportQuery(serverQuery, localView);
+    props.title = () => Object.entries(links || {}).map(([label, url]) => (
+        <a key={label} href={`${url}&${query}`} target="_blank" rel="noreferrer" style={{marginRight: 12}}>{label}</a>
+    ));
+};
+"""
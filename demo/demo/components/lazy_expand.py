@@ -0,0 +1,27 @@
+from reflex.utils import imports
+
+# expandable rows whose panel is fetched from the server: expanding a row without a detail
+# fires onExpandRow(record.key), the panel renders once rowDetails[record.key] arrives
+lazy_expand_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="forwardRef"),
+    },
+}
+
+lazy_expand_code = """
+const useLazyExpandable = (expandable, details, onExpandRow) => {
+    const render = expandable && expandable.expandedRowRender;
+    return {
+        ...expandable,
+        onExpand: (expanded, record) => {
+            expandable && expandable.onExpand && expandable.onExpand(expanded, record);
+            if (expanded && (!details || details[record.key] === undefined)) onExpandRow && onExpandRow(record.key);
+        },
+        expandedRowRender: (record, ...rest) => {
+            const detail = details ? details[record.key] : undefined;
+            if (detail === undefined) return 'Loading...';
+            return render ? render(record, detail, ...rest) : JSON.stringify(detail);
+        },
+    };
+};
+"""
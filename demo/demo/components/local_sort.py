@@ -0,0 +1,64 @@
+from reflex.utils import imports
+
+# client side sort/filter for tables small enough to be sent whole: antd sorts and filters the
+# rows itself (sorter / onFilter functions) instead of asking the server through onChange
+local_sort_code = """
+// the server's order (demo.table_data.indexed.sort_key, SQLite): null, numbers, then text by code
+// point, so a local mode table shows its rows in the order a server mode one and the export give
+const sortRank = (v) => (v === null || v === undefined ? 0 : typeof v === 'number' ? 1 : 2);
+
+const compareValues = (a, b) => {
+    const ra = sortRank(a), rb = sortRank(b);
+    if (ra !== rb || ra === 0) return ra - rb;
+    if (ra === 1) return a - b;
+    const x = String(a), y = String(b);
+    if (x === y) return 0;
+    // code points, not UTF-16 code units like < does
+    for (let i = 0, j = 0; i < x.length && j < y.length;) {
+        const cx = x.codePointAt(i), cy = y.codePointAt(j);
+        if (cx !== cy) return cx - cy;
+        i += cx > 0xffff ? 2 : 1;
+        j += cy > 0xffff ? 2 : 1;
+    }
+    return x.length - y.length;
+};
+
+const localSortFilter = (columns) => columns.map((c) => {
+    const key = c.dataIndex;
+    if (key === undefined) return c;
+    const col = {...c};
+    if (c.sorter && typeof c.sorter !== 'function') col.sorter = (a, b) => compareValues(a[key], b[key]);
+    if (c.filters && !c.onFilter) col.onFilter = (value, record) => record[key] === value;
+    return col;
+});
+"""
+
+# the filters/sorter antd applies to a local mode table, onChange is not sent to the server; the
+# summary row and the export links follow them
+local_view_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="useState"),
+    },
+}
+
+local_view_code = """
+// the view before antd's first onChange: the columns' (default) filtered values and sort order
+const initialLocalView = (columns) => {
+    const filters = {};
+    let sorter = {};
+    for (const c of columns || []) {
+        if (c.dataIndex === undefined) continue;
+        const filtered = c.filteredValue !== undefined ? c.filteredValue : c.defaultFilteredValue;
+        if (filtered) filters[c.dataIndex] = filtered;
+        const order = c.sortOrder !== undefined ? c.sortOrder : c.defaultSortOrder;
+        if (order && !sorter.column) sorter = {column: c, field: c.dataIndex, order};
+    }
+    return {filters, sorter};
+};
+
+const useLocalView = (props, localMode) => {
+    const [view, setView] = useState(null);
+    if (localMode) props.onChange = (pagination, filters, sorter) => setView({filters, sorter});
+    return localMode ? view || initialLocalView(props.columns) : null;
+};
+"""
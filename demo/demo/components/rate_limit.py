@@ -0,0 +1,33 @@
+from reflex.utils import imports
+
+# debounce / throttle an event trigger callback on the client
+rate_limit_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="useRef"),
+        imports.ImportVar(tag="useCallback"),
+    },
+}
+
+rate_limit_code = """
+const useRateLimited = (fn, mode, wait) => {
+    const latest = useRef(fn);
+    latest.current = fn;
+    const timer = useRef(null);
+    const lastCall = useRef(0);
+    return useCallback((...args) => {
+        clearTimeout(timer.current);
+        const run = () => {
+            lastCall.current = Date.now();
+            latest.current && latest.current(...args);
+        };
+        if (mode === 'throttle') {
+            // leading call right away, then at most one trailing call per window with the latest args
+            const remaining = wait - (Date.now() - lastCall.current);
+            if (remaining <= 0) run();
+            else timer.current = setTimeout(run, remaining);
+        } else {
+            timer.current = setTimeout(run, wait);
+        }
+    }, [mode, wait]);
+};
+"""
@@ -0,0 +1,102 @@
+from reflex.utils import imports
+
+# client side block cache for virtual tables: asks the server for the visible rows
+# (+ a prefetch margin) through onRangeChange and keeps at most maxBlocks blocks.
+# antd only gets the rows around the viewport plus two spacer rows standing in for the rest,
+# so client memory and the work per block follow maxBlocks, not the table length
+row_blocks_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="useState"),
+        imports.ImportVar(tag="useEffect"),
+        imports.ImportVar(tag="useRef"),
+        imports.ImportVar(tag="useMemo"),
+        imports.ImportVar(tag="useCallback"),
+        imports.ImportVar(tag="forwardRef"),
+    },
+}
+
+row_blocks_code = """
+const BlockSpacerRow = ({children, ...props}) => props['data-spacer'] === undefined
+    ? <tr {...props}>{children}</tr>
+    : <tr style={props.style}><td colSpan={1000} style={{padding: 0, border: 0}}/></tr>;
+
+const useRowBlocks = (props, rowBlock, onRangeChange, {blockSize, maxBlocks, margin, rowHeight, height}) => {
+    const cache = useRef({view: null, blocks: new Map(), pending: new Set(), scrollTop: 0});
+    const [version, setVersion] = useState(0);
+    // [first, last) rows around the viewport, the ones handed to antd
+    const [range, setRange] = useState([0, Math.ceil(height / rowHeight) + margin]);
+    const total = rowBlock ? rowBlock.total : 0;
+
+    const request = useCallback((scrollTop) => {
+        const c = cache.current;
+        c.scrollTop = scrollTop;
+        const first = Math.max(Math.floor(scrollTop / rowHeight) - margin, 0);
+        const last = Math.min(Math.ceil((scrollTop + height) / rowHeight) + margin, total);
+        setRange((r) => (r[0] === first && r[1] === last ? r : [first, last]));
+        let missing = null;
+        const flush = (end) => {
+            if (missing !== null) onRangeChange(missing * blockSize, end * blockSize);
+            missing = null;
+        };
+        for (let b = Math.floor(first / blockSize); b * blockSize < last; b++) {
+            const block = c.blocks.get(b);
+            if (block !== undefined) {
+                // touch: Map keeps insertion order, the first key is the least recently used
+                c.blocks.delete(b);
+                c.blocks.set(b, block);
+                flush(b);
+            } else if (c.pending.has(b)) {
+                flush(b);
+            } else {
+                c.pending.add(b);
+                if (missing === null) missing = b;
+            }
+        }
+        flush(Math.ceil(last / blockSize));
+    }, [onRangeChange, blockSize, margin, rowHeight, height, total]);
+
+    useEffect(() => {
+        if (!rowBlock) return;
+        const c = cache.current;
+        const reset = c.view !== rowBlock.view;
+        if (reset) {
+            c.view = rowBlock.view;
+            c.blocks = new Map();
+            c.pending = new Set();
+        }
+        const first = Math.floor(rowBlock.start / blockSize);
+        for (let i = 0; i * blockSize < rowBlock.rows.length; i++) {
+            c.blocks.delete(first + i);
+            c.blocks.set(first + i, rowBlock.rows.slice(i * blockSize, (i + 1) * blockSize));
+            c.pending.delete(first + i);
+        }
+        while (c.blocks.size > maxBlocks) c.blocks.delete(c.blocks.keys().next().value);
+        setVersion((v) => v + 1);
+        if (reset) request(c.scrollTop);
+    }, [rowBlock]);
+
+    const rows = useMemo(() => {
+        const blocks = cache.current.blocks;
+        const last = Math.min(range[1], total);
+        const first = Math.min(range[0], last);
+        const rows = [];
+        if (first > 0) rows.push({key: '__spacer_before', __spacer: first * rowHeight});
+        for (let i = first; i < last; i++) {
+            const block = blocks.get(Math.floor(i / blockSize));
+            rows.push((block && block[i % blockSize]) || {key: `__loading_${i}`});
+        }
+        if (last < total) rows.push({key: '__spacer_after', __spacer: (total - last) * rowHeight});
+        return rows;
+    }, [version, range, total, rowHeight]);
+
+    // the window is the virtual list: antd's would lay out the spacers as rows of rowHeight
+    delete props.virtual;
+    const onRow = props.onRow;
+    props.onRow = (record, index) => (record.__spacer === undefined
+        ? (onRow ? onRow(record, index) : {})
+        : {'data-spacer': true, style: {height: record.__spacer}});
+    props.components = {...props.components, body: {...(props.components && props.components.body), row: BlockSpacerRow}};
+    props.onScroll = useCallback((e) => request(e.currentTarget.scrollTop), [request]);
+    return rows;
+};
+"""
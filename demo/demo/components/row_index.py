@@ -0,0 +1,17 @@
+from reflex.utils import imports
+
+# gridjs only hands formatters its own Row object, so DataTableEx appends the data index as a
+# hidden last cell; formatters then identify their row by the row_key cell or by that index
+row_index_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="useMemo"),
+    },
+}
+
+row_index_code = """
+const useIndexedRows = (rows) => useMemo(() => rows.map((r, i) => [...r, i]), [rows]);
+
+const gridRowIndex = (gridRow) => gridRow.cells[gridRow.cells.length - 1].data;
+
+const gridRowId = (gridRow, keyIndex) => keyIndex === null ? gridRowIndex(gridRow) : gridRow.cells[keyIndex].data;
+"""
@@ -0,0 +1,63 @@
+from reflex.utils import imports
+
+# applies the ops of demo.table_data.diff.diff_rows to the table rows on the client
+row_patch_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="useState"),
+        imports.ImportVar(tag="useEffect"),
+        imports.ImportVar(tag="useRef"),
+        imports.ImportVar(tag="forwardRef"),
+    },
+}
+
+row_patch_code = """
+const applyRowPatch = (data, ops, keyField) => {
+    const rows = data.slice();
+    let index = null;
+    const at = (id) => {
+        if (!keyField) return id;
+        if (index === null) index = new Map(rows.map((r, i) => [r[keyField], i]));
+        return index.has(id) ? index.get(id) : -1;
+    };
+    for (const [op, id, row] of ops) {
+        if (op === 'u') {
+            const i = at(id);
+            if (i >= 0) rows[i] = row;
+        } else if (op === 'i') {
+            rows.splice(id, 0, row);
+            index = null;
+        } else if (op === 'd') {
+            const i = at(id);
+            if (i >= 0) rows.splice(i, 1);
+            index = null;
+        } else if (op === 'o') {
+            const byKey = new Map(rows.map((r) => [r[keyField], r]));
+            rows.splice(0, rows.length, ...id.map((k) => byKey.get(k)));
+            index = null;
+        }
+    }
+    return rows;
+};
+
+const useRowPatch = (rows, patch, keyField, onGap) => {
+    const [data, setData] = useState(rows);
+    // version of the rows in data: the snapshot's, then each applied patch's; null while resyncing
+    const applied = useRef(null);
+    useEffect(() => {
+        setData(rows);
+        applied.current = (patch && patch.snapshot) || 0;
+    }, [rows]);
+    useEffect(() => {
+        if (!patch || patch.v === undefined || applied.current === null || patch.v === applied.current) return;
+        if (patch.base !== applied.current) {
+            // missed a patch, or the rows were (re)loaded older than the patch: ask the server for the full rows
+            applied.current = null;
+            onGap && onGap();
+            return;
+        }
+        applied.current = patch.v;
+        setData((prev) => applyRowPatch(prev, patch.ops, keyField));
+    }, [patch]);
+    return data;
+};
+"""
@@ -0,0 +1,31 @@
+from reflex.utils import imports
+
+# one popover per grid instead of one per cell: cells only render a button (popoverTrigger, generated from
+# rx.button by DataTableEx) carrying the row index/id (see row_index), a click on the grid is delegated to
+# useSharedPopover which anchors the single popover at the clicked button and mounts its content only while it is open
+shared_popover_imports: imports.ImportDict = {
+    "react": {
+        imports.ImportVar(tag="useState"),
+        imports.ImportVar(tag="useCallback"),
+    },
+}
+
+shared_popover_code = """
+const useSharedPopover = () => {
+    const [target, setTarget] = useState(null);
+    const onClick = useCallback((e) => {
+        const el = e.target.closest('[data-popover-row]');
+        if (!el) return;
+        const r = el.getBoundingClientRect();
+        setTarget({
+            row: Number(el.dataset.popoverRow),
+            id: JSON.parse(el.dataset.popoverId),
+            col: el.dataset.popoverCol,
+            index: Number(el.dataset.popoverIndex),
+            anchor: {position: 'fixed', left: r.left, top: r.top, width: r.width, height: r.height},
+        });
+    }, []);
+    const onOpenChange = useCallback((open) => open || setTarget(null), []);
+    return [target, onClick, onOpenChange];
+};
+"""
@@ -0,0 +1,48 @@
+# antd Table summary row for the columns declaring `aggregate: [ops]`: the values come from the
+# server (summaryData, {dataIndex: {op: value}}) or, for local mode tables, from the rows passing
+# the filters antd last reported (useLocalView, at most the local threshold)
+
+table_summary_code = """
+const aggregateRows = (rows, columns) => {
+    const out = {};
+    for (const c of columns) {
+        if (!c.aggregate) continue;
+        let count = 0, sum = 0, min = null, max = null;
+        for (const r of rows) {
+            const v = r[c.dataIndex];
+            if (v === null || v === undefined) continue;
+            count++;
+            if (typeof v === 'number') sum += v;
+            if (min === null || v < min) min = v;
+            if (max === null || v > max) max = v;
+        }
+        out[c.dataIndex] = {count, sum, mean: count ? sum / count : null, min, max};
+    }
+    return out;
+};
+
+const filterRows = (rows, columns, filters) => !filters ? rows : rows.filter((r) => columns.every((c) => {
+    const values = filters[c.key || c.dataIndex];
+    return !values || !values.length || !c.onFilter || values.some((v) => c.onFilter(v, r));
+}));
+
+const formatAggregate = (v) => typeof v === 'number' && !Number.isInteger(v) ? v.toFixed(2) : String(v ?? '-');
+
+const useTableSummary = (props, summaryData, localMode, rows, filters) => {
+    const columns = props.columns || [];
+    const data = localMode ? aggregateRows(filterRows(rows || [], columns, filters), columns) : (summaryData || {});
+    const lead = (props.expandable ? 1 : 0) + (props.rowSelection ? 1 : 0);
+    props.summary = () => (
+        <tr className="ant-table-summary-row">
+            {Array.from({length: lead}, (_, i) => <td key={`lead${i}`} className="ant-table-cell"/>)}
+            {columns.map((c, i) => (
+                <td key={c.key || i} className="ant-table-cell">
+                    {c.aggregate && data[c.dataIndex]
+                        ? c.aggregate.map((op) => `${op} ${formatAggregate(data[c.dataIndex][op])}`).join(' · ')
+                        : null}
+                </td>
+            ))}
+        </tr>
+    );
+};
+"""
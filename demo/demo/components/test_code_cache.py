@@ -0,0 +1,68 @@
+"""Checks of the code cache keys: python -m pytest demo/components"""
+import hashlib
+import importlib
+import sys
+
+import pytest
+import reflex as rx
+
+from . import code_cache
+from .code_cache import cache_version, fingerprint, module_digest
+
+SCALE = 2
+
+
+def scaled(v):
+    return v * SCALE
+
+
+class FingerprintState(rx.State):
+    def click(self, row: str):
+        pass
+
+
+@pytest.fixture
+def source_dir(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(code_cache, '_module_digests', {})
+    yield tmp_path
+    for name in [n for n in sys.modules if n.startswith('cc_gen')]:
+        del sys.modules[name]
+
+
+def test_module_digest_reads_modules_not_imported_yet(source_dir):
+    path = source_dir / 'cc_gen_a.py'
+    path.write_text('X = 1\n')
+    importlib.invalidate_caches()
+    assert 'cc_gen_a' not in sys.modules
+    assert module_digest('cc_gen_a') == hashlib.sha1(path.read_bytes()).hexdigest()
+    assert 'cc_gen_a' not in sys.modules
+
+
+def test_missing_module_digest_is_not_memoized(source_dir, monkeypatch):
+    monkeypatch.setattr(code_cache, '_GENERATOR_MODULES', ('cc_gen_b',))
+    assert module_digest('cc_gen_b') == ''
+    before = cache_version()
+    (source_dir / 'cc_gen_b.py').write_text('X = 1\n')
+    importlib.invalidate_caches()
+    assert module_digest('cc_gen_b') != ''
+    assert cache_version() != before
+
+
+def test_fingerprint_follows_globals_and_helpers(monkeypatch):
+    spec = dict(render=lambda v: scaled(v) + 1)
+    key = fingerprint(spec)
+    assert fingerprint(dict(render=lambda v: scaled(v) + 1)) == key
+    monkeypatch.setattr(sys.modules[__name__], 'SCALE', 3)
+    assert fingerprint(spec) != key
+    monkeypatch.undo()
+    assert fingerprint(spec) == key
+    assert fingerprint(dict(render=lambda v: scaled(v) + 2)) != key
+
+
+def test_fingerprint_follows_state_handler_names(monkeypatch):
+    key = fingerprint((lambda row: row, FingerprintState))
+    handlers = dict(FingerprintState.event_handlers)
+    handlers['press'] = handlers.pop('click')
+    monkeypatch.setattr(FingerprintState, 'event_handlers', handlers)
+    assert fingerprint((lambda row: row, FingerprintState)) != key
@@ -0,0 +1,56 @@
+"""The local mode sort (run with node) against the server's: python -m pytest demo/components"""
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from ..table_data import IndexedTable, SqliteProvider
+from .local_sort import local_sort_code, local_view_code
+
+VALUES = ['1', '10', '2', None, 'b', 'B', 'a10', 'a9', '', 3, 20, 2.5, 'é', 'z', '\U0001f600', '～', '10', None, 2]
+
+# antd's sorter: the column's compare function, negated for 'descend', through a stable Array.sort
+SORT_JS = """
+const [rows, order] = JSON.parse(process.argv[1]);
+const [column] = localSortFilter([{dataIndex: 'value', sorter: 'true'}]);
+const sign = order === 'descend' ? -1 : 1;
+const sorted = rows.slice().sort((a, b) => sign * column.sorter(a, b));
+console.log(JSON.stringify(sorted.map((r) => r.key)));
+"""
+
+
+def node(code: str, *args: str) -> str:
+    return subprocess.run(['node', '-e', code, *args], check=True, capture_output=True, text=True).stdout
+
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+
+
+def local_order(rows: list[dict], order: str) -> list[str]:
+    return json.loads(node(local_sort_code + SORT_JS, json.dumps([rows, order])))
+
+
+@pytest.mark.parametrize('order', ['ascend', 'descend'])
+def test_local_sort_matches_the_providers(order, tmp_path):
+    rows = [dict(key=f'k{i}', value=v) for i, v in enumerate(VALUES)]
+    sorter = dict(column={}, field='value', order=order)
+    table = IndexedTable(rows, sortable=['value'])
+    indexed = [rows[i]['key'] for i in table.view(None, sorter)[:]]
+    sqlite = SqliteProvider.from_rows(str(tmp_path / 'rows.db'), 'rows', rows, sortable=['value'])
+    try:
+        pushed = [r['key'] for r in sqlite.rows(None, sorter, 0, len(rows))]
+    finally:
+        sqlite.close()
+    assert local_order(rows, order) == indexed == pushed
+
+
+def test_local_view_starts_from_the_column_defaults():
+    columns = [dict(dataIndex='key', defaultSortOrder='descend'), dict(dataIndex='name', sortOrder=None),
+               dict(dataIndex='gender', defaultFilteredValue=['male']), dict(title='no data index')]
+    view = json.loads(node(local_view_code.replace('useState(null)', '[null, () => {}]') + f"""
+const props = {{columns: {json.dumps(columns)}}};
+const view = useLocalView(props, true);
+console.log(JSON.stringify([view.filters, view.sorter.field, view.sorter.order, typeof props.onChange]));
+"""))
+    assert view == [{'gender': ['male']}, 'key', 'descend', 'function']
@@ -1 +1 @@
-from .datatable import index
\ No newline at end of file
+from .state import State
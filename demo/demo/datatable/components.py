@@ -1,73 +1,175 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Union, Type
+from typing import Any, Callable, Dict, List, Optional, Type
+import json
 import uuid
 
+from pydantic import PrivateAttr
+
 import reflex as rx
 from reflex.components.gridjs.datatable import DataTable
 from reflex.components.component import Component
 from reflex.components.tags import Tag
 from reflex.utils import imports, types
-from reflex.utils.serializers import serialize
-from reflex.vars import BaseVar, ComputedVar, Var
+from reflex.utils.serializers import serialize, serializer
+from reflex.vars import BaseVar, Var
+
+from ..components.code_cache import CodeCache, fingerprint
+from ..components.columnar import columnar_code, columnar_imports
+from ..components.row_index import row_index_code, row_index_imports
+from ..components.row_patch import row_patch_code, row_patch_imports
+from ..components.shared_popover import shared_popover_code, shared_popover_imports
+from ..table_data import ColumnarFrame
+
+
+@serializer
+def serialize_columnar_frame(frame: ColumnarFrame) -> dict:
+    return frame.encode()
 
 
-def ui_name(cell: rx.Var, row: rx.Var, state: Type[rx.State]) -> rx.Component:
-    href_var = Var.create_safe(cell._var_full_name, _var_is_local=False, _var_is_string=False)
-    return rx.link(cell, href=href_var)
+def ui_name(cell: rx.Var, row: rx.Var, column: rx.Var, state: Type[rx.State]) -> rx.Component:
+    return rx.link(cell, href=cell)
 
 
-def ui_code(cell: rx.Var, row: rx.Var, state: Type[rx.State]) -> rx.Component:
+def ui_code_popover(cell: rx.Var, row: rx.Var, column: rx.Var, state: Type[rx.State]) -> rx.Component:
+    """ui_code content for DataTableEx(popovers=...), the trigger is rendered by the grid."""
+    return rx.popover.content(
+        rx.flex(
+            rx.avatar(
+                "2",
+                fallback="RX",
+                radius="full"
+            ),
+            rx.box(
+                rx.text_area(placeholder="Write a comment…", style={"height": 80}),
+                rx.flex(
+                    rx.checkbox("Send to group"),
+                    rx.popover.close(
+                        rx.button(cell, size="1", on_click=lambda: state.click(row, column))
+                    ),
+                    spacing="3",
+                    margin_top="12px",
+                    justify="between",
+                ),
+                flex_grow="1",
+            ),
+            spacing="3"
+        ),
+        style={"width": 360},
+    )
+
+
+def ui_code(cell: rx.Var, row: rx.Var, column: rx.Var, state: Type[rx.State]) -> rx.Component:
     return rx.popover.root(
         rx.popover.trigger(
             rx.button(cell, variant="soft"),
         ),
-        rx.popover.content(
-            rx.flex(
-                rx.avatar(
-                    "2",
-                    fallback="RX",
-                    radius="full"
-                ),
-                rx.box(
-                    rx.text_area(placeholder="Write a comment…", style={"height": 80}),
-                    rx.flex(
-                        rx.checkbox("Send to group"),
-                        rx.popover.close(
-                            rx.button(cell, size="1", on_click=lambda: state.click(cell, row))
-                        ),
-                        spacing="3",
-                        margin_top="12px",
-                        justify="between",
-                    ),
-                    flex_grow="1",
-                ),
-                spacing="3"
-            ),
-            style={"width": 360},
-        )
+        ui_code_popover(cell, row, column, state),
     )
 
 
+def ui_url(cell: rx.Var, row: rx.Var, column: rx.Var, state: Type[rx.State]) -> rx.Component:
+    return rx.link(cell, on_click=lambda: state.click(row, column))
+
+
+# (cell value, row id, column name, state) -> cell component; events should only send row + column,
+# the row id is the DataTableEx row_key cell (or the data index) and the handler looks the row up
+Formatter = Callable[[rx.Var, rx.Var, rx.Var, Type[rx.State]], rx.Component]
+
+_cell_var = Var.create_safe('cell', _var_is_local=False)
+_row_var = Var.create_safe('row', _var_is_local=False)
+_column_var = Var.create_safe('column', _var_is_local=False)
+
+# (js name, js code, imports) per formatter + state, rendered once and shared by every table
+formatter_cache: CodeCache[tuple[str, str, imports.ImportDict]] = CodeCache('gridjs')
+
+
+def render_formatter(formatter: Formatter, state: Type[rx.State]) -> tuple[str, str, imports.ImportDict]:
+    key = fingerprint((formatter, state))
+
+    def _build():
+        ui = formatter(_cell_var, _row_var, _column_var, state)
+        name = f'gridjsFormatter_{key[:12]}'
+        return name, f"""
+        const {name} = (addEvents, column, keyIndex) => (cell, gridRow) => {{
+            const row = gridRowId(gridRow, keyIndex);
+            return _({ui});
+        }};""", ui.get_imports()
+    return formatter_cache.lookup(key, _build)
+
+
+def render_popover(content: Formatter, state: Type[rx.State]) -> tuple[str, str, imports.ImportDict]:
+    """(js name, js code, imports) of a shared popover component around `content`."""
+    key = fingerprint(('popover', content, state))
+
+    def _build():
+        ui = rx.popover.root(
+            rx.popover.trigger(
+                rx.el.span(special_props={Var.create_safe('style={anchor}')}),
+            ),
+            content(_cell_var, _row_var, _column_var, state),
+            special_props={Var.create_safe('open={true}'), Var.create_safe('onOpenChange={onOpenChange}')},
+        )
+        name = f'gridjsPopover_{key[:12]}'
+        return name, f"""
+        const {name} = ({{cell, row, column, anchor, onOpenChange}}) => {{
+            const [addEvents, connectError] = useContext(EventLoopContext);
+            return ({ui});
+        }};""", ui.get_imports()
+    return formatter_cache.lookup(key, _build)
+
 
-def ui_url(cell: rx.Var, row: rx.Var, state: Type[rx.State]) -> rx.Component:
-    return rx.link(cell, on_click=lambda: state.click(cell, row))
+def render_popover_trigger() -> tuple[str, str, imports.ImportDict]:
+    """(js name, js code, imports) of the cell button of popover columns, carrying what useSharedPopover reads."""
+    def _build():
+        ui = rx.button(
+            _cell_var,
+            variant='soft',
+            custom_attrs={
+                'data-popover-row': Var.create_safe('gridRowIndex(gridRow)', _var_is_local=False),
+                'data-popover-id': Var.create_safe('JSON.stringify(gridRowId(gridRow, keyIndex))', _var_is_local=False),
+                'data-popover-col': Var.create_safe('col', _var_is_local=False),
+                'data-popover-index': Var.create_safe('index', _var_is_local=False),
+            },
+        )
+        return 'popoverTrigger', f"""
+        const popoverTrigger = (col, index, keyIndex) => (cell, gridRow) => _({ui});""", ui.get_imports()
+    return formatter_cache.lookup('popover_trigger', _build)
 
 
 class DataTableEx(DataTable):
     """A data table component."""
 
     alias = "DataTableExGrid"
-    
-    # _state: Type[rx.State] = None
+
+    # positional row ops (demo.table_data.diff, key=None) applied on top of data by the client
+    data_patch: Var[Dict[str, Any]]
+
+    # column name -> formatter, the other columns render as plain text
+    _formatters: Dict[str, Formatter] = PrivateAttr(default_factory=dict)
+    # column name -> popover content, cells only render a trigger and one popover is shared by the grid
+    _popovers: Dict[str, Formatter] = PrivateAttr(default_factory=dict)
+    # the state formatters bind their events to
+    _state: Type[rx.State] = PrivateAttr(default=rx.State)
+    # column whose cell identifies the row in formatter events, the data index when None
+    _row_key: Optional[str] = PrivateAttr(default=None)
+
+    def __init__(self, *args, formatters=None, popovers=None, state=None, row_key=None, **kwargs):
+        data = kwargs.get('data')
+        if isinstance(data, ColumnarFrame):
+            kwargs.setdefault('columns', list(data.columns))
+            kwargs['data'] = Var.create_safe(data.encode())._replace(_var_type=ColumnarFrame)
+        super().__init__(*args, **kwargs)
+        self._formatters = formatters or {}
+        self._popovers = popovers or {}
+        self._row_key = row_key
+        self._state = state or rx.State
 
     @classmethod
     def create(cls, *children, **props):
-        _state = props.pop('_state')
-        rs = super().create(cls, *children, **props)
+        rs = super().create(*children, **props)
         if rs.id is None:
             rs.id = uuid.uuid4().hex
-        # rs._state = _state
         return rs
 
     def _get_unique_name(self) -> str:
@@ -76,47 +178,125 @@ class DataTableEx(DataTable):
     def _get_columns_name(self) -> str:
         return f'{self._get_unique_name()}_columns'
 
-    def _get_ex_params(self):
-        from .datatable import State
-        cell_var = Var.create_safe('{cell}')
-        row_var = Var.create_safe('{row}')
-        return cell_var, row_var, State  # self._state
+    def _get_grid_name(self) -> str:
+        return f'{self._get_unique_name()}_grid'
 
-    def _get_custom_code(self) -> str | None:
-        cell_var, row_var, state = self._get_ex_params()
+    @property
+    def is_ex_patch(self) -> bool:
+        return self.data_patch is not None
+
+    @property
+    def is_ex_columnar(self) -> bool:
+        # opt in by passing a ColumnarFrame (or a state var of that type) as data
+        return isinstance(self.data, Var) and types._issubclass(self.data._var_type, ColumnarFrame)
+
+    @property
+    def is_ex_popover(self) -> bool:
+        return bool(self._popovers)
+
+    @property
+    def is_ex_indexed(self) -> bool:
+        # formatted cells need their row index, carried in a hidden last column
+        return bool(self._formatters) or self.is_ex_popover
+
+    @property
+    def is_ex_wrapped(self) -> bool:
+        return self.is_ex_patch or self.is_ex_columnar or self.is_ex_indexed
+
+    def get_event_triggers(self) -> Dict[str, Any]:
+        return {
+            **super().get_event_triggers(),
+            'on_patch_gap': lambda: [],
+        }
+
+    def _get_formatters(self) -> dict[str, tuple[str, str, imports.ImportDict]]:
+        return {name: render_formatter(fn, self._state) for name, fn in self._formatters.items()}
+
+    def _get_popovers(self) -> dict[str, tuple[str, str, imports.ImportDict]]:
+        return {name: render_popover(fn, self._state) for name, fn in self._popovers.items()}
+
+    def _get_grid_code(self) -> str:
+        rows = 'useColumnarRows(data)' if self.is_ex_columnar else 'data'
+        if self.is_ex_patch:
+            rows = f'useRowPatch({rows}, dataPatch, null, onPatchGap)'
+        if not self.is_ex_popover:
+            data = 'useIndexedRows(rows)' if self.is_ex_indexed else 'rows'
+            return f"""
+        const {self._get_grid_name()} = forwardRef(({{data, dataPatch, onPatchGap, ...props}}, ref) => {{
+            const rows = {rows};
+            return <{self.alias} ref={{ref}} data={{{data}}} {{...props}}/>;
+        }});
+        """
+        popovers = ', '.join(f'{json.dumps(name)}: {fn}' for name, (fn, _, _) in self._get_popovers().items())
         return f"""
-        function {self._get_columns_name()} () {{
+        const {self._get_grid_name()} = forwardRef(({{data, dataPatch, onPatchGap, ...props}}, ref) => {{
+            const rows = {rows};
+            const indexed = useIndexedRows(rows);
+            const [target, onClick, onOpenChange] = useSharedPopover();
+            const Popover = target && {{{popovers}}}[target.col];
+            const row = target && rows[target.row];
+            return (
+                <div onClick={{onClick}}>
+                    <{self.alias} ref={{ref}} data={{indexed}} {{...props}}/>
+                    {{row && <Popover cell={{row[target.index]}} row={{target.id}} column={{target.col}} anchor={{target.anchor}} onOpenChange={{onOpenChange}}/>}}
+                </div>
+            );
+        }});
+        """
+
+    def get_custom_code(self) -> set[str]:
+        code = super().get_custom_code()
+        code.update(js for _, js, _ in self._get_formatters().values())
+        code.update(js for _, js, _ in self._get_popovers().values())
+        if self.is_ex_indexed:
+            code.add(row_index_code)
+        if self.is_ex_popover:
+            code.add(shared_popover_code)
+            code.add(render_popover_trigger()[1])
+        if self.is_ex_patch:
+            code.add(row_patch_code)
+        if self.is_ex_columnar:
+            code.add(columnar_code)
+        return code
+
+    def _get_custom_code(self) -> str | None:
+        grid_code = self._get_grid_code() if self.is_ex_wrapped else ""
+        formatters = ', '.join(f'{json.dumps(name)}: {fn}' for name, (fn, _, _) in self._get_formatters().items())
+        popovers = json.dumps(list(self._popovers))
+        columns = "[...mapped, {id: '__row', name: '__row', hidden: true}]" if self.is_ex_indexed else 'mapped'
+        return grid_code + f"""
+        function {self._get_columns_name()} (columns) {{
             const [addEvents, connectError] = useContext(EventLoopContext);
-            return [{{
-                    name: "FirstName",
-                    formatter: (cell, row) => {{
-                        return _({ui_name(cell_var, row_var, state)});
-                    }},
-                }},  "LastName", 
-                {{
-                    name: "Code",
-                    formatter: (cell, row) => {{
-                        return _({ui_code(cell_var, row_var, state)});
-                    }},
-                }}, 
-                {{
-                    name: "Url",
-                    formatter: (cell, row) => {{
-                        return _({ui_url(cell_var, row_var, state)});
-                    }},
-                }},
-            ]
+            const formatters = {{{formatters}}};
+            const popovers = {popovers};
+            const names = (columns || []).map((c) => typeof c === 'string' ? c : c.name);
+            const keyAt = names.indexOf({json.dumps(self._row_key)});
+            const keyIndex = keyAt < 0 ? null : keyAt;
+            const mapped = (columns || []).map((c, i) => {{
+                const name = names[i];
+                const formatter = popovers.includes(name) ? popoverTrigger(name, i, keyIndex)
+                    : formatters[name] && formatters[name](addEvents, name, keyIndex);
+                if (!formatter) return c;
+                return {{...(typeof c === 'string' ? {{name: c}} : c), formatter}};
+            }});
+            return {columns};
         }}
         """
 
     def _get_imports(self) -> imports.ImportDict:
-        cell_var, row_var, state = self._get_ex_params()
-        uis = [op(cell_var, row_var, state) for op in [ui_code, ui_name, ui_url]]
         return imports.merge_imports(
             super()._get_imports(),
             {self.library: {imports.ImportVar(tag='_'), imports.ImportVar(tag='h')}},
+            # the page hands the wrapper the grid's ref (ref_<id>)
+            {'react': {imports.ImportVar(tag='forwardRef')}} if self.is_ex_wrapped else {},
             {"": {imports.ImportVar(tag="gridjs/dist/theme/mermaid.css")}},
-            *[ui.get_imports() for ui in uis],
+            *[_imports for _, _, _imports in self._get_formatters().values()],
+            *[_imports for _, _, _imports in self._get_popovers().values()],
+            row_index_imports if self.is_ex_indexed else {},
+            shared_popover_imports if self.is_ex_popover else {},
+            render_popover_trigger()[2] if self.is_ex_popover else {},
+            row_patch_imports if self.is_ex_patch else {},
+            columnar_imports if self.is_ex_columnar else {},
         )
 
     def _render(self) -> Tag:
@@ -131,6 +311,12 @@ class DataTableEx(DataTable):
                 _var_type=List[List[Any]],
                 _var_full_name_needs_state_prefix=True,
             )._replace(merge_var_data=self.data._var_data)
+        if self.is_ex_columnar and self.columns is None:
+            self.columns = BaseVar(
+                _var_name=f"{self.data._var_name}.columns",
+                _var_type=List[Any],
+                _var_full_name_needs_state_prefix=True,
+            )._replace(merge_var_data=self.data._var_data)
         if types.is_dataframe(type(self.data)):
             # If given a pandas df break up the data and columns
             data = serialize(self.data)
@@ -138,18 +324,18 @@ class DataTableEx(DataTable):
             self.columns = Var.create_safe(data["columns"])
             self.data = Var.create_safe(data["data"])
 
-        tag = (
-            super()
-            ._render()
-            .remove_props("columns", )
-        )
-        tag.special_props.add(
-            Var.create_safe(
-                f"columns={{{self._get_columns_name()}()}}",
-                _var_is_local=True,
-                _var_is_string=False,
-            ),
-        )
+        tag = super()._render()
+        if self.columns is not None:
+            tag.remove_props("columns", )
+            tag.special_props.add(
+                Var.create_safe(
+                    f"columns={{{self._get_columns_name()}({self.columns._var_full_name})}}",
+                    _var_is_local=True,
+                    _var_is_string=False,
+                ),
+            )
+        if self.is_ex_wrapped:
+            tag.name = self._get_grid_name()
         # Render the table.
         return tag
 
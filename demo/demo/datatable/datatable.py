@@ -1,30 +1,16 @@
 """Welcome to Reflex! This file outlines the steps to create a basic app."""
-from typing import List
-
 from rxconfig import config
 
 import reflex as rx
 
-from demo.datatable.components import DataTableEx
+from demo.datatable.components import DataTableEx, ui_code_popover, ui_name, ui_url
+from demo.datatable.state import ROW_KEY, State
 from demo.layouts import default_layout
 
 docs_url = "https://reflex.dev/docs/getting-started/introduction"
 filename = f"{config.app_name}/{config.app_name}.py"
 
 
-class State(rx.State):
-    """The app state."""
-
-    data: List = [
-        ["antd_demo", "Messi", "PSG", "/abc"],
-        ["Christiano", "Ronaldo", "Al-Nasir", "/def"]
-     ]
-    columns: List[str] = ["First Name", "Last Name", "Code", "Url"]
-
-    def click(self, cell, row):
-        print('click', cell, row)
-
-
 @default_layout()
 def index() -> rx.Component:
     return rx.center(
@@ -37,10 +23,28 @@ def index() -> rx.Component:
                 on_click=lambda: rx.redirect(docs_url),
                 size="4",
             ),
+            rx.hstack(
+                rx.button("Load rows", on_click=State.load_rows, disabled=State.streaming),
+                rx.cond(
+                    State.streaming,
+                    rx.button("Cancel", on_click=State.cancel_stream, color_scheme="red"),
+                ),
+                rx.text(State.stream_loaded, " / ", State.stream_total),
+                rx.input(placeholder="Search", value=State.search, on_change=State.on_search),
+                rx.button("CSV", on_click=State.export_grid("csv"), variant="soft"),
+                rx.button("XLSX", on_click=State.export_grid("xlsx"), variant="soft"),
+                align="center",
+            ),
             DataTableEx(
-                # _state=State,
+                id='gridEx1',
                 data=State.data,
                 columns=State.columns,
+                formatters={"First Name": ui_name, "Url": ui_url},
+                popovers={"Code": ui_code_popover},
+                state=State,
+                row_key=ROW_KEY,
+                data_patch=State.data_patch,
+                on_patch_gap=State.resync_rows,
             ),
 
             align="center",
@@ -0,0 +1,157 @@
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Sequence
+import asyncio
+
+import reflex as rx
+
+from demo.exports import FORMATS, download_export, table_exports
+from demo.table_data import SearchIndex, diff_rows, is_full_resend, next_patch, snapshot_patch, stream_batches
+
+
+_players = [
+    ["antd_demo", "Messi", "PSG", "/abc"],
+    ["Christiano", "Ronaldo", "Al-Nasir", "/def"]
+]
+
+_columns = ["First Name", "Last Name", "Code", "Url"]
+
+# the Code column identifies a row in click events
+ROW_KEY = "Code"
+_KEY_AT = _columns.index(ROW_KEY)
+
+STREAM_ROWS = 2000
+STREAM_BATCH = 200
+# server side coalescing window for search box changes, seconds, like antd_demo's CHANGE_SETTLE
+SEARCH_SETTLE = 0.05
+
+
+async def _player_batches() -> AsyncIterator[List]:
+    """A slow row source."""
+    for start in range(0, STREAM_ROWS, STREAM_BATCH):
+        await asyncio.sleep(0.2)
+        yield [
+            [f"Player {i}", f"Last {i}", f"C{i}", f"/player/{i}"]
+            for i in range(start, min(start + STREAM_BATCH, STREAM_ROWS))
+        ]
+
+
+class State(rx.State):
+    """The app state."""
+
+    # baseline rows, only resent on resync; row changes go out as data_patch ops
+    data: List = _players
+    data_patch: Dict[str, Any] = {}
+    _rows: List = _players
+    # row key -> index into _rows, kept in sync with every row change
+    _row_ids: Dict[str, int] = {r[_KEY_AT]: i for i, r in enumerate(_players)}
+    columns: List[str] = _columns
+    # streaming load progress, clear streaming to cancel
+    streaming: bool = False
+    _stream_id: int = 0
+    stream_loaded: int = 0
+    stream_total: int = 0
+    # search box text, applied to data as _shown_search once it settles (on_search)
+    search: str = ''
+    _search_seq: int = 0
+    # while set, data holds the rows matching it; appended rows go out as ops, other changes resend them
+    _shown_search: str = ''
+    _search_index: Optional[SearchIndex] = None
+
+    def click(self, row: str, column: str):
+        print('click', column, self._row_by_id(row))
+
+    def _row_by_id(self, row_id: str) -> List | None:
+        i = self._row_ids.get(row_id)
+        return None if i is None else self._rows[i]
+
+    def _set_rows(self, rows: List):
+        ops = diff_rows(self._rows, rows, key=None)
+        self._rows = rows
+        self._row_ids = {r[_KEY_AT]: i for i, r in enumerate(rows)}
+        if self._shown_search or is_full_resend(ops, rows):
+            self.resync_rows()
+        elif ops:
+            self.data_patch = next_patch(self.data_patch, ops)
+
+    def set_row(self, index: int, row: List):
+        self._row_ids.pop(self._rows[index][_KEY_AT], None)
+        self._row_ids[row[_KEY_AT]] = index
+        self._rows[index] = row
+        if self._shown_search:
+            self.resync_rows()
+        else:
+            self.data_patch = next_patch(self.data_patch, [['u', index, row]])
+
+    def resync_rows(self):
+        self.data = [list(r) for r in self._shown_rows()]
+        self.data_patch = snapshot_patch(self.data_patch)
+
+    def _plain_rows(self) -> List:
+        """_rows itself, not wrapped in the proxy that tracks changes to state vars; only read it."""
+        return self._backend_vars['_rows']
+
+    def _shown_rows(self) -> List:
+        """_rows, or the ones matching _shown_search while it is set."""
+        # the index keeps the rows to only re-index the ones changed by the next search
+        rows = self._plain_rows()
+        if not self._shown_search:
+            return rows
+        if self._search_index is None:
+            self._search_index = SearchIndex(rows, range(len(self.columns)))
+        else:
+            self._search_index.replace_rows(rows)
+        return [rows[i] for i in self._search_index.ids(self._shown_search)]
+
+    @rx.background
+    async def on_search(self, text: str):
+        """Search box: show the rows with every term of `text`, once it stops changing for SEARCH_SETTLE."""
+        async with self:
+            self._search_seq += 1
+            seq = self._search_seq
+            self.search = text
+        await asyncio.sleep(SEARCH_SETTLE)
+        async with self:
+            if seq != self._search_seq:
+                return
+            self._shown_search = text
+            self.resync_rows()
+
+    def _append_rows(self, rows: List):
+        start = len(self._rows)
+        self._rows.extend(rows)
+        self._row_ids.update((r[_KEY_AT], start + i) for i, r in enumerate(rows))
+        index = self._search_index
+        if not self._shown_search:
+            self.data_patch = next_patch(self.data_patch, [['i', start + i, r] for i, r in enumerate(rows)])
+        elif index is None or len(index) != start:
+            self.resync_rows()
+        else:
+            # only index the new rows and send the matching ones after the shown matches
+            index.append_rows(rows)
+            shown = index.count(self._shown_search, start)
+            ops = [['i', shown + j, rows[i - start]] for j, i in enumerate(index.ids(self._shown_search, start))]
+            if ops:
+                self.data_patch = next_patch(self.data_patch, ops)
+
+    def _clear_rows(self):
+        self._set_rows([])
+
+    @rx.background
+    async def load_rows(self):
+        await stream_batches(self, _player_batches(), self._append_rows, total=STREAM_ROWS, reset=self._clear_rows)
+
+    def export_grid(self, fmt: str):
+        """Download the rows shown now (the search matches while it is set) as csv/xlsx."""
+        if fmt not in FORMATS:
+            return
+        # taken under the state lock: set_row/_set_rows replace rows and lists, they never change them in place
+        export_id = table_exports.grant('players', (list(self.columns), list(self._shown_rows())))
+        return download_export('players', fmt, export_id)
+
+    def cancel_stream(self):
+        self.streaming = False
+
+
+async def export_rows(app: rx.App, params: Mapping[str, str]) -> tuple[List[str], Iterable[Sequence], Optional[int]]:
+    """Export source of the grid snapshot of State.export_grid, `?id=<export id>`."""
+    columns, rows = table_exports.granted('players', params)
+    return columns, iter(rows), len(rows)
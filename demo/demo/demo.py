@@ -1,8 +1,43 @@
+import os
+
 import reflex as rx
 
-from .datatable import index
-from .antd_demo import index as antd_index  # noqa
+from .datatable import State
+from .datatable.state import export_rows
+from .antd_demo import AntdState
+from .antd_demo.state import export_view, table_fanout, table_mode_info
+from .exports import table_exports
+from .metrics import instrument
+from .routes import LazyRoutes
 
 
 app = rx.App()
-app.add_page(index, route='/')
+# GET /metrics for handler latency histograms, DEMO_PROFILE_DIR to dump cProfile stats of slow calls
+handler_metrics = instrument(app, AntdState, State, profile_dir=os.environ.get('DEMO_PROFILE_DIR'))
+handler_metrics.info['antd_table_mode'] = table_mode_info
+handler_metrics.info['antd_table_fanout'] = table_fanout.info
+
+# a table subscription lives as long as its socket: an open one keeps a quiet viewer subscribed,
+# closing it ends the subscription and the session's watch_table task
+table_fanout.connected = lambda sid: app.sio.manager.is_connected(sid, app.event_namespace.namespace)
+_on_disconnect = app.event_namespace.on_disconnect
+
+
+def _end_subscriptions(sid, *args):
+    table_fanout.disconnect(sid)
+    return _on_disconnect(sid)
+
+
+app.event_namespace.on_disconnect = _end_subscriptions
+
+# GET /export/<table>?format=csv|xlsx streams a table view, see export_view / export_rows for the params
+table_exports.add('antd', export_view)
+table_exports.add('players', export_rows)
+table_exports.route(app)
+handler_metrics.info['exports'] = table_exports.info
+
+# page modules are only imported when the pages are compiled, states are needed by every worker;
+# added after instrument() so on_load gets the instrumented handlers
+routes = LazyRoutes()
+routes.add('/', 'demo.datatable.datatable:index', on_load=State.resync_rows)
+routes.add('/antd_demo', 'demo.antd_demo.index:index', on_load=AntdState.load_table)
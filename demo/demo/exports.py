@@ -0,0 +1,125 @@
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Mapping, Optional, Sequence
+from collections import Counter
+import secrets
+
+import reflex as rx
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from reflex.config import get_config
+from reflex.event import EventSpec
+from reflex.vars import Var
+
+from .table_data import LRUCache
+from .table_data.export import CSV_MEDIA_TYPE, XLSX_MAX_ROWS, XLSX_MEDIA_TYPE, csv_chunks, xlsx_chunks
+
+EXPORT_ENDPOINT = '/export'
+# seconds an export id handed out by grant() can be downloaded, once
+EXPORT_GRANT_TTL = 60.0
+
+# (app, query params) -> (header, rows as value sequences, row count or None when unknown);
+# raises ValueError for bad params, LookupError for an unknown export id. `rows` must be lazy
+# (or a snapshot), it is only read while the response streams.
+ExportSource = Callable[[rx.App, Mapping[str, str]], Awaitable[tuple[Sequence[str], Iterable[Sequence[Any]], Optional[int]]]]
+
+FORMATS = {
+    'csv': (csv_chunks, CSV_MEDIA_TYPE),
+    'xlsx': (xlsx_chunks, XLSX_MEDIA_TYPE),
+}
+
+
+def export_url(table: str, fmt: str = 'csv', endpoint: str = EXPORT_ENDPOINT) -> str:
+    """Backend url of a table's export, the source's own query params are appended by the caller."""
+    return f'{get_config().api_url}{endpoint}/{table}?format={fmt}'
+
+
+def download_export(table: str, fmt: str, export_id: str) -> EventSpec:
+    """Event downloading the export of a grant() id, for a handler to return."""
+    # a Var: rx.download only takes relative urls as str, the api may be on another origin
+    url = Var.create_safe(f'{export_url(table, fmt)}&id={export_id}', _var_is_string=True)
+    return rx.download(url=url, filename=f'{table}.{fmt}')
+
+
+class TableExports:
+    """Streams table views as CSV or XLSX at GET `{endpoint}/{table}?format=csv|xlsx&...`.
+
+    A source turns the query params (filters, sort, export id) into a lazy row iterator,
+    the encoders pull from it as the client reads: memory stays at one batch plus one output
+    chunk whatever the row count, and the download starts with the first chunk.
+
+    Session data is never looked up from the url: an event handler snapshots it under the state
+    lock and grant()s it an opaque id, valid once for EXPORT_GRANT_TTL seconds; the source reads
+    it back with granted().
+    """
+
+    def __init__(self, max_grants: int = 256):
+        self.grants: LRUCache[str, tuple[str, Any]] = LRUCache(maxsize=max_grants, ttl=EXPORT_GRANT_TTL)
+        self.sources: dict[str, ExportSource] = {}
+        self.exports: Counter = Counter()
+        self.rows: Counter = Counter()
+        self.active = 0
+
+    def add(self, table: str, source: ExportSource):
+        self.sources[table] = source
+
+    def grant(self, table: str, snapshot: Any) -> str:
+        export_id = secrets.token_urlsafe(16)
+        self.grants.put(export_id, (table, snapshot))
+        return export_id
+
+    def granted(self, table: str, params: Mapping[str, str]) -> Any:
+        """The snapshot of the `?id=` grant of `table`, consumed; LookupError when unknown or expired."""
+        export_id = params.get('id') or ''
+        entry = self.grants.get(export_id)
+        # pop: of concurrent requests with the same id only one gets it
+        if entry is None or entry[0] != table or self.grants.pop(export_id) is None:
+            raise LookupError('unknown or expired export id')
+        return entry[1]
+
+    def route(self, app: rx.App, endpoint: str = EXPORT_ENDPOINT):
+        async def _export(table: str, request: Request):
+            source = self.sources.get(table)
+            if source is None:
+                return JSONResponse({'detail': f'unknown table {table!r}'}, status_code=404)
+            fmt = request.query_params.get('format', 'csv')
+            if fmt not in FORMATS:
+                return JSONResponse({'detail': f'unknown format {fmt!r}'}, status_code=400)
+            try:
+                header, rows, total = await source(app, request.query_params)
+            except ValueError as e:
+                return JSONResponse({'detail': str(e)}, status_code=400)
+            except LookupError as e:
+                return JSONResponse({'detail': str(e)}, status_code=404)
+            if fmt == 'xlsx' and total is not None and total >= XLSX_MAX_ROWS:
+                return JSONResponse({'detail': f'{total} rows do not fit in an xlsx sheet, export csv'},
+                                    status_code=400)
+            encode, media_type = FORMATS[fmt]
+            self.exports[f'{table}.{fmt}'] += 1
+            # a sync iterator, starlette pulls it from a worker thread chunk by chunk
+            return StreamingResponse(
+                self._stream(table, encode(header, self._count(table, rows))), media_type=media_type,
+                headers={'Content-Disposition': f'attachment; filename="{table}.{fmt}"'},
+            )
+        app.api.add_api_route(f'{endpoint}/{{table}}', _export, methods=['GET'])
+
+    def _count(self, table: str, rows: Iterable[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        for row in rows:
+            self.rows[table] += 1
+            yield row
+
+    def _stream(self, table: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        self.active += 1
+        try:
+            yield from chunks
+        finally:
+            # also when the client goes away, closing the generators closes the source's cursor
+            self.active -= 1
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    def info(self) -> dict[str, Any]:
+        return dict(active=self.active, exports=dict(self.exports), rows=dict(self.rows), grants=len(self.grants))
+
+
+# the app's exports, states grant() their snapshots to it
+table_exports = TableExports()
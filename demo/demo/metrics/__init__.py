@@ -0,0 +1,2 @@
+from .histogram import Histogram
+from .instrument import HandlerMetrics, MetricsMiddleware, MetricsNamespace, instrument
@@ -0,0 +1,65 @@
+from typing import Optional
+import math
+
+
+class Histogram:
+    """HdrHistogram style log-linear buckets for non negative ints.
+
+    Every value is kept to `digits` significant decimal digits, so memory only grows with the
+    log of the value range and recording is O(1) whatever the number of samples.
+    """
+
+    __slots__ = ('sub_bits', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, digits: int = 2):
+        self.sub_bits = math.ceil(math.log2(2 * 10 ** digits))
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = max(value.bit_length() - self.sub_bits, 0)
+        return (shift << self.sub_bits) | (value >> shift)
+
+    def _value(self, index: int) -> int:
+        # highest value that falls in the bucket
+        shift = index >> self.sub_bits
+        return (((index & ((1 << self.sub_bits) - 1)) + 1) << shift) - 1
+
+    def record(self, value: int):
+        value = max(int(value), 0)
+        i = self._index(value)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(self._value(i), self.max)
+        return self.max
+
+    def summary(self, scale: float = 1) -> dict[str, float]:
+        """count, mean, min, p50/p90/p95/p99/p999 and max, values divided by `scale`."""
+        def _s(v):
+            return round(v / scale, 3)
+        return dict(
+            count=self.count,
+            mean=_s(self.total / self.count) if self.count else 0,
+            min=_s(self.min or 0),
+            p50=_s(self.percentile(50)),
+            p90=_s(self.percentile(90)),
+            p95=_s(self.percentile(95)),
+            p99=_s(self.percentile(99)),
+            p999=_s(self.percentile(99.9)),
+            max=_s(self.max),
+        )
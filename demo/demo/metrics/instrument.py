@@ -0,0 +1,285 @@
+from typing import Any, Callable, Optional, Type
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+import asyncio
+import cProfile
+import functools
+import inspect
+import random
+import threading
+import time
+
+import reflex as rx
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from reflex.app import EventNamespace
+from reflex.event import Event, EventHandler
+from reflex.middleware import Middleware
+from reflex.state import BaseState, StateUpdate
+
+from .histogram import Histogram
+
+# set when a websocket event arrives / once its handler is known, copied into background tasks
+_arrived: ContextVar[Optional[float]] = ContextVar('_arrived', default=None)
+_current: ContextVar[Optional[tuple[str, str]]] = ContextVar('_current', default=None)
+
+
+class HandlerMetrics:
+    """Histograms per handler and per (session, handler).
+
+    `*_ms` metrics are recorded in microseconds and reported in ms, the others as is (bytes).
+    Only the last `max_sessions` sessions are kept.
+    """
+
+    def __init__(self, max_sessions: int = 1000, digits: int = 2):
+        self.max_sessions = max_sessions
+        self.digits = digits
+        self.handlers: dict[str, dict[str, Histogram]] = {}
+        self.sessions: OrderedDict[str, dict[str, dict[str, Histogram]]] = OrderedDict()
+        # name -> () => json, app settings and counters reported next to the histograms
+        self.info: dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, metrics: dict[str, dict[str, Histogram]], handler: str, metric: str) -> Histogram:
+        by_metric = metrics.setdefault(handler, {})
+        h = by_metric.get(metric)
+        if h is None:
+            h = by_metric[metric] = Histogram(self.digits)
+        return h
+
+    def record(self, handler: str, session: Optional[str], metric: str, value: float):
+        value = value * 1000 if metric.endswith('_ms') else value
+        with self._lock:
+            self._histogram(self.handlers, handler, metric).record(value)
+            if session is None:
+                return
+            if session not in self.sessions:
+                self.sessions[session] = {}
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            self.sessions.move_to_end(session)
+            self._histogram(self.sessions[session], handler, metric).record(value)
+
+    @staticmethod
+    def _summaries(metrics: dict[str, dict[str, Histogram]]) -> dict[str, dict[str, Any]]:
+        return {
+            handler: {m: h.summary(1000 if m.endswith('_ms') else 1) for m, h in by_metric.items()}
+            for handler, by_metric in metrics.items()
+        }
+
+    def snapshot(self, session: Optional[str] = None) -> dict[str, Any]:
+        with self._lock:
+            if session is not None:
+                return dict(session=session, handlers=self._summaries(self.sessions.get(session, {})))
+            return dict(handlers=self._summaries(self.handlers), sessions=len(self.sessions),
+                        info={name: fn() for name, fn in self.info.items()})
+
+    def clear(self):
+        with self._lock:
+            self.handlers.clear()
+            self.sessions.clear()
+
+
+class _Profiler:
+    """cProfile for a sample of handler calls, dumped when the call was slow; one call at a time."""
+
+    def __init__(self, profile_dir: Optional[str], rate: float, slow_ms: float):
+        self.dir = Path(profile_dir) if profile_dir else None
+        self.rate = rate
+        self.slow_ms = slow_ms
+        self._busy = False
+
+    def start(self) -> Optional[cProfile.Profile]:
+        if self.dir is None or self._busy or random.random() >= self.rate:
+            return None
+        self._busy = True
+        return cProfile.Profile()
+
+    def finish(self, profile: Optional[cProfile.Profile], handler: str, wall_ms: float):
+        if profile is None:
+            return
+        self._busy = False
+        if wall_ms >= self.slow_ms:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.dir / f'{handler}-{time.time_ns()}-{wall_ms:.0f}ms.prof')
+
+
+class _Stepper:
+    """Drives a coroutine, timing (and profiling) only its own steps, not the awaits in between."""
+
+    def __init__(self, coro, profile: Optional[cProfile.Profile]):
+        self.coro = coro
+        self.profile = profile
+        self.cpu = 0.0
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            start = time.thread_time()
+            if self.profile:
+                self.profile.enable()
+            try:
+                step = self.coro.throw(error) if error is not None else self.coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if self.profile:
+                    self.profile.disable()
+                self.cpu += time.thread_time() - start
+            try:
+                value, error = (yield step), None
+            except BaseException as e:
+                value, error = None, e
+
+
+def _session(state: BaseState) -> Optional[str]:
+    try:
+        return state.router.session.client_token or None
+    except AttributeError:
+        return None
+
+
+def _wrap_handler(name: str, fn: Callable, metrics: HandlerMetrics, profiler: _Profiler) -> Callable:
+    """Record wall and cpu time of every call of an event handler function, generators until exhausted."""
+
+    def _done(state, start, cpu, profile):
+        wall_ms = (time.perf_counter() - start) * 1000
+        session = _session(state)
+        metrics.record(name, session, 'wall_ms', wall_ms)
+        metrics.record(name, session, 'cpu_ms', cpu * 1000)
+        profiler.finish(profile, name, wall_ms)
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(state, *args, **kwargs):
+            start, profile = time.perf_counter(), profiler.start()
+            stepper = _Stepper(fn(state, *args, **kwargs), profile)
+            try:
+                return await stepper
+            finally:
+                _done(state, start, stepper.cpu, profile)
+    elif inspect.isasyncgenfunction(fn):
+        # wall time covers the whole iteration (reflex sends an update per yield), cpu only the handler's steps
+        @functools.wraps(fn)
+        async def wrapper(state, *args, **kwargs):
+            start, profile = time.perf_counter(), profiler.start()
+            steps, cpu = fn(state, *args, **kwargs), 0.0
+            try:
+                while True:
+                    stepper = _Stepper(steps.__anext__(), profile)
+                    try:
+                        item = await stepper
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        cpu += stepper.cpu
+                    yield item
+            finally:
+                await steps.aclose()
+                _done(state, start, cpu, profile)
+    elif inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            start, profile = time.perf_counter(), profiler.start()
+            steps, cpu, value = fn(state, *args, **kwargs), 0.0, None
+            try:
+                while True:
+                    step = time.thread_time()
+                    if profile:
+                        profile.enable()
+                    try:
+                        item = steps.send(value)
+                    except StopIteration as stop:
+                        # reflex applies a generator's return value too
+                        return stop.value
+                    finally:
+                        if profile:
+                            profile.disable()
+                        cpu += time.thread_time() - step
+                    value = yield item
+            finally:
+                steps.close()
+                _done(state, start, cpu, profile)
+    else:
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            start, cpu, profile = time.perf_counter(), time.thread_time(), profiler.start()
+            try:
+                if profile:
+                    return profile.runcall(fn, state, *args, **kwargs)
+                return fn(state, *args, **kwargs)
+            finally:
+                _done(state, start, time.thread_time() - cpu, profile)
+    # reflex checks handler arity against the triggers with getfullargspec, which ignores __wrapped__
+    wrapper.__signature__ = inspect.signature(fn)
+    return wrapper
+
+
+class MetricsNamespace(EventNamespace):
+    """Stamps event arrival and times the serialization of every update sent back."""
+
+    metrics: HandlerMetrics
+
+    async def on_event(self, sid, data):
+        _arrived.set(time.perf_counter())
+        await super().on_event(sid, data)
+
+    async def emit_update(self, update: StateUpdate, sid: str) -> None:
+        start = time.perf_counter()
+        payload = update.json()
+        current = _current.get()
+        if current is not None:
+            handler, session = current
+            self.metrics.record(handler, session, 'serialize_ms', (time.perf_counter() - start) * 1000)
+            self.metrics.record(handler, session, 'payload_bytes', len(payload.encode()))
+        await asyncio.create_task(self.emit(str(rx.constants.SocketEvent.EVENT), payload, to=sid))
+
+
+class MetricsMiddleware(Middleware):
+    """Queue wait: from the websocket message to the handler holding the state lock."""
+
+    metrics: HandlerMetrics
+
+    async def preprocess(self, app: rx.App, state: BaseState, event: Event) -> Optional[StateUpdate]:
+        _current.set((event.name, event.token))
+        arrived = _arrived.get()
+        if arrived is not None:
+            self.metrics.record(event.name, event.token, 'queue_wait_ms', (time.perf_counter() - arrived) * 1000)
+        return None
+
+    async def postprocess(self, app: rx.App, state: BaseState, event: Event, update: StateUpdate) -> StateUpdate:
+        return update
+
+
+def instrument(app: rx.App, *states: Type[BaseState], metrics: Optional[HandlerMetrics] = None,
+               profile_dir: Optional[str] = None, profile_rate: float = 0.01, slow_ms: float = 100,
+               endpoint: str = '/metrics') -> HandlerMetrics:
+    """Record queue wait, cpu/wall time, serialize time and payload bytes of the handlers of `states`.
+
+    Serves HandlerMetrics.snapshot() at GET `endpoint` (?session=<token> for one session) to local
+    clients; with `profile_dir` a `profile_rate` sample of calls is profiled, slow ones are dumped there.
+    """
+    metrics = metrics or HandlerMetrics()
+    profiler = _Profiler(profile_dir, profile_rate, slow_ms)
+
+    for state in states:
+        for name, handler in list(state.event_handlers.items()):
+            # EventHandler is immutable, swap in a new one the way BaseState.__init_subclass__ sets them
+            handler = EventHandler(fn=_wrap_handler(f'{state.get_full_name()}.{name}', handler.fn, metrics, profiler))
+            state.event_handlers[name] = handler
+            setattr(state, name, handler)
+
+    if app.event_namespace is not None:
+        namespace = MetricsNamespace(app.event_namespace.namespace, app)
+        namespace.metrics = metrics
+        app.sio.register_namespace(namespace)
+        app.event_namespace = namespace
+    app.add_middleware(MetricsMiddleware(metrics=metrics))
+
+    async def _metrics(request: Request):
+        if request.client is None or request.client.host not in ('127.0.0.1', '::1', 'localhost'):
+            return JSONResponse({'detail': 'metrics are only served locally'}, status_code=403)
+        return JSONResponse(metrics.snapshot(request.query_params.get('session')))
+    app.api.add_api_route(endpoint, _metrics, methods=['GET'])
+    return metrics
@@ -0,0 +1,114 @@
+"""Each kind of event handler through _wrap_handler: python -m pytest demo/metrics"""
+from types import SimpleNamespace
+import asyncio
+import inspect
+
+import pytest
+
+from .instrument import HandlerMetrics, _Profiler, _wrap_handler
+
+
+class FakeState:
+    router = SimpleNamespace(session=SimpleNamespace(client_token='tok'))
+
+
+async def coroutine(self, a: int, b: str = 'x'):
+    await asyncio.sleep(0)
+    return [a, b]
+
+
+async def async_generator(self, a: int, b: str = 'x'):
+    for i in range(a):
+        await asyncio.sleep(0)
+        yield i
+    yield b
+
+
+def generator(self, a: int, b: str = 'x'):
+    sent = yield a
+    yield sent
+    return b
+
+
+def function(self, a: int, b: str = 'x'):
+    return [a, b]
+
+
+def failing(self, a: int, b: str = 'x'):
+    raise RuntimeError(a)
+
+
+def wrap(fn, tmp_path=None):
+    metrics = HandlerMetrics()
+    # every call profiled and dumped when a profile dir is given
+    profiler = _Profiler(str(tmp_path) if tmp_path else None, rate=1, slow_ms=0)
+    return _wrap_handler('state.handler', fn, metrics, profiler), metrics
+
+
+def call(fn, wrapper):
+    """The handler's results, driven the way reflex drives each kind."""
+    if inspect.iscoroutinefunction(fn):
+        return asyncio.run(wrapper(FakeState(), 2, b='y'))
+    if inspect.isasyncgenfunction(fn):
+        async def collect():
+            return [item async for item in wrapper(FakeState(), 2, b='y')]
+        return asyncio.run(collect())
+    if inspect.isgeneratorfunction(fn):
+        steps = wrapper(FakeState(), 2, b='y')
+        items = [next(steps), steps.send('sent')]
+        with pytest.raises(StopIteration) as stop:
+            next(steps)
+        return [*items, stop.value.value]
+    return wrapper(FakeState(), 2, b='y')
+
+
+@pytest.mark.parametrize('fn, expected', [
+    (coroutine, [2, 'y']),
+    (async_generator, [0, 1, 'y']),
+    (generator, [2, 'sent', 'y']),
+    (function, [2, 'y']),
+])
+@pytest.mark.parametrize('profiled', [False, True])
+def test_wrapped_handlers_keep_their_kind_results_and_signature(fn, expected, profiled, tmp_path):
+    wrapper, metrics = wrap(fn, tmp_path if profiled else None)
+    # reflex tells handlers apart by kind and checks their arity with getfullargspec
+    for kind in (inspect.iscoroutinefunction, inspect.isasyncgenfunction, inspect.isgeneratorfunction):
+        assert kind(wrapper) == kind(fn)
+    assert inspect.signature(wrapper) == inspect.signature(fn)
+    assert inspect.getfullargspec(wrapper) == inspect.getfullargspec(fn)
+    assert wrapper.__name__ == fn.__name__
+
+    assert call(fn, wrapper) == expected
+    for scope in (metrics.snapshot()['handlers'], metrics.snapshot('tok')['handlers']):
+        assert {m: s['count'] for m, s in scope['state.handler'].items()} == dict(wall_ms=1, cpu_ms=1)
+    assert len(list(tmp_path.glob('state.handler-*.prof'))) == profiled
+
+
+def test_a_failing_handler_is_still_timed():
+    wrapper, metrics = wrap(failing)
+    with pytest.raises(RuntimeError):
+        wrapper(FakeState(), 1)
+    assert metrics.snapshot()['handlers']['state.handler']['wall_ms']['count'] == 1
+
+
+def test_a_closed_async_generator_closes_the_handler():
+    closed = []
+
+    async def handler(self):
+        try:
+            yield 1
+            yield 2
+        finally:
+            closed.append(True)
+
+    wrapper, metrics = wrap(handler)
+
+    async def first():
+        steps = wrapper(FakeState())
+        item = await steps.__anext__()
+        await steps.aclose()
+        return item
+
+    assert asyncio.run(first()) == 1
+    assert closed == [True]
+    assert metrics.snapshot()['handlers']['state.handler']['cpu_ms']['count'] == 1
@@ -0,0 +1,68 @@
+from typing import Any, Callable, Optional
+import importlib
+import os
+import sys
+import time
+
+import reflex as rx
+from reflex import constants
+from reflex.page import DECORATED_PAGES
+
+
+class LazyPage:
+    """A page declared as 'module:function', the module is imported when the page is first rendered."""
+
+    def __init__(self, route: str, target: str, **kwargs):
+        self.route = route
+        self.target = target
+        self.kwargs = kwargs
+        self.import_ms: Optional[float] = None
+        self._render: Optional[Callable[[], rx.Component]] = None
+        self.__name__ = target.rpartition(':')[2]
+
+    @property
+    def module(self) -> str:
+        return self.target.partition(':')[0]
+
+    def load(self) -> Callable[[], rx.Component]:
+        if self._render is None:
+            module, _, attr = self.target.partition(':')
+            start = time.perf_counter()
+            # only what this page imports first, modules shared with earlier pages are already loaded
+            loaded = module in sys.modules
+            self._render = getattr(importlib.import_module(module), attr)
+            self.import_ms = 0.0 if loaded else (time.perf_counter() - start) * 1000
+        return self._render
+
+    def __call__(self) -> rx.Component:
+        if os.environ.get(constants.SKIP_COMPILE_ENV_VAR) == 'yes':
+            # backend only worker: pages are only rendered to compile the frontend
+            return rx.fragment()
+        return self.load()()
+
+
+class LazyRoutes:
+    """Route registry: pages are added like @rx.page, App.compile_() renders (and imports) them.
+
+    States and on_load handlers must still be imported eagerly, the backend routes events to them.
+    """
+
+    def __init__(self):
+        self.pages: dict[str, LazyPage] = {}
+
+    def add(self, route: str, target: str, **kwargs) -> LazyPage:
+        """`kwargs` are rx.page / App.add_page arguments (title, on_load, ...)."""
+        page = self.pages[route] = LazyPage(route, target, **kwargs)
+        # the app module is re-executed on hot reload, replace instead of adding the route twice
+        DECORATED_PAGES[:] = [(r, kw) for r, kw in DECORATED_PAGES if getattr(r, 'route', None) != route]
+        DECORATED_PAGES.append((page, dict(route=route, **kwargs)))
+        return page
+
+    def load(self, route: str) -> Callable[[], rx.Component]:
+        return self.pages[route].load()
+
+    def report(self) -> dict[str, Any]:
+        return {
+            route: dict(module=p.module, loaded=p.import_ms is not None, import_ms=p.import_ms)
+            for route, p in self.pages.items()
+        }
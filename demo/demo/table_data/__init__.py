@@ -0,0 +1,13 @@
+from .paging import DEFAULT_PAGE_SIZE, normalize_pagination, page_slice
+from .indexed import IndexedTable, TableView, view_params
+from .diff import diff_rows, is_full_resend, next_patch, snapshot_patch
+from .columnar import ColumnarFrame
+from .stream import stream_batches
+from .cache import LRUCache
+from .search import SEARCH_FILTER, SearchIndex, row_matches, split_search, with_search
+from .provider import IndexedProvider, TableProvider
+from .sqlite import SqliteProvider
+from .fanout import LocalBroker, Subscription, ViewFanout
+
+from .aggregates import SummaryIndex, TableAggregates, aggregate_spec, row_changes
+from .export import csv_chunks, xlsx_chunks
@@ -0,0 +1,274 @@
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+import heapq
+import math
+import threading
+
+from .indexed import sort_key, view_params
+from .provider import Filters
+from .search import row_matches, split_search
+
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+# (old row, new row): None old = inserted, None new = deleted
+RowChange = tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]
+# every finite float is an integer multiple of 2**-1074
+_FLOAT_SCALE = 1 << 1074
+
+
+class Extrema:
+    """Multiset with O(log n) add/remove and O(1) amortized min/max.
+
+    A min heap and a max heap over the same values, removals are counted and
+    dropped lazily once they reach the top of a heap.
+    """
+
+    __slots__ = ('_live', '_low', '_high', '_size')
+
+    def __init__(self, values: Iterable = ()):
+        self._live: Counter = Counter(values)
+        self._low = list(self._live)
+        self._high = [_Reversed(v) for v in self._live]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+        self._size = sum(self._live.values())
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value):
+        if len(self._low) > 2 * len(self._live) + 64:
+            # mostly removed values left in the heaps, rebuild them from the live ones
+            self._low = list(self._live)
+            self._high = [_Reversed(v) for v in self._live]
+            heapq.heapify(self._low)
+            heapq.heapify(self._high)
+        if not self._live[value]:
+            # first live copy: (re)enter the heaps, older entries of a removed value may still be there
+            heapq.heappush(self._low, value)
+            heapq.heappush(self._high, _Reversed(value))
+        self._live[value] += 1
+        self._size += 1
+
+    def remove(self, value):
+        if self._live[value] <= 0:
+            raise KeyError(value)
+        self._live[value] -= 1
+        self._size -= 1
+        if not self._live[value]:
+            del self._live[value]
+
+    def _top(self, heap: list, unwrap: Callable):
+        while heap and unwrap(heap[0]) not in self._live:
+            heapq.heappop(heap)
+        return unwrap(heap[0]) if heap else None
+
+    def min(self):
+        return self._top(self._low, lambda v: v)
+
+    def max(self):
+        return self._top(self._high, lambda v: v.value)
+
+
+class _Reversed:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: '_Reversed') -> bool:
+        return other.value < self.value
+
+
+class ColumnAggregate:
+    """count/sum/mean/min/max of one column, None values are not counted.
+
+    count counts every value, sum and mean only the numbers. The sum is exact whatever the order
+    of the adds and removes: floats are summed as integer multiples of the smallest float, so it
+    is rounded once when read. min/max follow the column's sort (sort_key): numbers before text.
+    """
+
+    __slots__ = ('field', 'ops', 'count', 'numbers', '_ints', '_floats', '_float_count', '_special', '_extrema')
+
+    def __init__(self, field: str, ops: Sequence[str], values: Iterable = ()):
+        unknown = set(ops) - set(AGGREGATES)
+        if unknown:
+            raise ValueError(f'unknown aggregates {sorted(unknown)} for {field!r}')
+        self.field = field
+        self.ops = tuple(ops)
+        self.count = 0
+        self.numbers = 0
+        self._ints = 0
+        self._floats = 0
+        self._float_count = 0
+        # inf/-inf/nan, they have no exact sum
+        self._special: Counter = Counter()
+        self._extrema = Extrema() if {'min', 'max'} & set(ops) else None
+        for v in values:
+            self.add(v)
+
+    def _number(self, value, sign: int):
+        if isinstance(value, float):
+            self._float_count += sign
+            if math.isfinite(value):
+                n, d = value.as_integer_ratio()
+                self._floats += sign * n * (_FLOAT_SCALE // d)
+            else:
+                self._special[str(value)] += sign
+        else:
+            self._ints += sign * value
+        self.numbers += sign
+
+    def add(self, value):
+        if value is None:
+            return
+        self.count += 1
+        if isinstance(value, (int, float)):
+            self._number(value, 1)
+        if self._extrema is not None:
+            self._extrema.add(sort_key(value))
+
+    def remove(self, value):
+        if value is None:
+            return
+        self.count -= 1
+        if isinstance(value, (int, float)):
+            self._number(value, -1)
+        if self._extrema is not None:
+            self._extrema.remove(sort_key(value))
+
+    @property
+    def sum(self):
+        # an int while there are no floats
+        return self._ints if not self._float_count else self._divide(1)
+
+    def _divide(self, n: int) -> float:
+        special = {k for k, c in self._special.items() if c > 0}
+        if 'nan' in special or {'inf', '-inf'} <= special:
+            return math.nan
+        if special:
+            return float(special.pop())
+        # int / int is correctly rounded
+        return (self._ints * _FLOAT_SCALE + self._floats) / (_FLOAT_SCALE * n)
+
+    def result(self) -> dict[str, Any]:
+        values = dict(
+            count=self.count,
+            sum=self.sum,
+            mean=self._divide(self.numbers) if self.numbers else None,
+            min=_sorted_value(self._extrema.min()) if self._extrema is not None else None,
+            max=_sorted_value(self._extrema.max()) if self._extrema is not None else None,
+        )
+        return {op: values[op] for op in self.ops}
+
+
+def _sorted_value(key: Optional[tuple]) -> Any:
+    return None if key is None else key[1]
+
+
+class TableAggregates:
+    """The aggregates of a spec ({field: ops}) over the rows matching `filters`, kept up to date per row change.
+
+    A SEARCH_FILTER text is matched against `search_fields` like SearchIndex does.
+    """
+
+    def __init__(self, spec: dict[str, Sequence[str]], rows: Iterable[dict[str, Any]] = (), filters: Filters = None,
+                 search_fields: Sequence[str] = ()):
+        filters, self.search = split_search(filters)
+        self.search_fields = tuple(search_fields)
+        self.filters = {f: set(v) for f, v in (filters or {}).items() if v}
+        rows = [r for r in rows if self.matches(r)]
+        self.columns = [ColumnAggregate(field, ops, (r.get(field) for r in rows)) for field, ops in spec.items()]
+
+    def matches(self, row: Optional[dict[str, Any]]) -> bool:
+        return row is not None and all(row.get(f) in values for f, values in self.filters.items()) and (
+            self.search is None or row_matches(row, self.search, self.search_fields))
+
+    def apply(self, old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]):
+        """A row was inserted (old None), deleted (new None) or updated, which may filter it in or out."""
+        was, now = self.matches(old), self.matches(new)
+        for column in self.columns:
+            before = old.get(column.field) if was else None
+            after = new.get(column.field) if now else None
+            if was and now and before == after:
+                continue
+            if was:
+                column.remove(before)
+            if now:
+                column.add(after)
+
+    def result(self) -> dict[str, dict[str, Any]]:
+        return {c.field: c.result() for c in self.columns}
+
+
+def aggregate_spec(columns: Sequence[dict[str, Any]]) -> dict[str, list[str]]:
+    """{dataIndex: ops} of the antd columns declaring an `aggregate` list."""
+    return {c['dataIndex']: list(c['aggregate']) for c in columns if c.get('aggregate')}
+
+
+def row_changes(old: Sequence[dict[str, Any]], new: Sequence[dict[str, Any]], key: str = 'key') -> list[RowChange]:
+    """(old, new) pairs of the rows inserted, deleted or changed between two row lists."""
+    before = {r[key]: r for r in old}
+    after = {r[key]: r for r in new}
+    return [
+        (before.get(k), after.get(k))
+        for k in dict.fromkeys([*before, *after])
+        if before.get(k) != after.get(k)
+    ]
+
+
+class SummaryIndex:
+    """TableAggregates per filter, shared between sessions like the provider's views.
+
+    A filter's aggregates are built from its rows on first use, then updated per changed row
+    with apply(), O(log n) each, instead of recomputed over the table. result() may run in worker
+    threads: the views are only touched under a lock, the rows are read outside of it, and a build
+    that overlaps a refresh() is returned but not kept, it may have read the rows before the swap.
+    """
+
+    def __init__(self, spec: dict[str, Sequence[str]], max_views: int = 64, search_fields: Sequence[str] = ()):
+        self.spec = spec
+        self.max_views = max_views
+        self.search_fields = tuple(search_fields)
+        self._views: OrderedDict[str, TableAggregates] = OrderedDict()
+        # bumped when a refresh starts and ends, odd while one is running
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def result(self, filters: Filters, rows: Callable[[Filters], Iterable[dict[str, Any]]]) -> dict[str, dict[str, Any]]:
+        """The summary of `filters`, `rows(filters)` gives the matching rows when it is not kept yet."""
+        key = view_params(filters, None)
+        with self._lock:
+            aggregates = self._views.get(key)
+            if aggregates is not None:
+                self._views.move_to_end(key)
+                return aggregates.result()
+            version = self.version
+        aggregates = TableAggregates(self.spec, rows(filters), filters, self.search_fields)
+        with self._lock:
+            if version == self.version and not version % 2:
+                self._views[key] = aggregates
+                if len(self._views) > self.max_views:
+                    self._views.popitem(last=False)
+            return aggregates.result()
+
+    @contextmanager
+    def refresh(self) -> Iterator[None]:
+        """Around swapping the rows in the provider and apply()ing their changes."""
+        with self._lock:
+            self.version += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.version += 1
+
+    def apply(self, changes: Iterable[RowChange]):
+        with self._lock:
+            for old, new in changes:
+                for aggregates in self._views.values():
+                    aggregates.apply(old, new)
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
@@ -0,0 +1,42 @@
+import base64
+from typing import Any
+
+# numpy dtype kind + itemsize -> JS typed array the client decodes the buffer into
+TYPED_ARRAYS = {
+    'i1': 'Int8Array', 'u1': 'Uint8Array', 'b1': 'Uint8Array',
+    'i2': 'Int16Array', 'u2': 'Uint16Array',
+    'i4': 'Int32Array', 'u4': 'Uint32Array',
+    'i8': 'BigInt64Array', 'u8': 'BigUint64Array',
+    'f4': 'Float32Array', 'f8': 'Float64Array',
+}
+
+
+class ColumnarFrame:
+    """NumPy-backed columns sent as base64 little-endian typed arrays instead of list-of-lists.
+
+    Non numeric columns fall back to a plain JSON list.
+    """
+
+    def __init__(self, columns: dict[str, Any]):
+        self.columns = columns
+
+    @classmethod
+    def from_dataframe(cls, df) -> 'ColumnarFrame':
+        return cls({str(name): df[name].to_numpy() for name in df.columns})
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def encode(self) -> dict[str, Any]:
+        dtypes, buffers = [], []
+        for values in self.columns.values():
+            dtype = values.dtype
+            typed = TYPED_ARRAYS.get(f'{dtype.kind}{dtype.itemsize}')
+            if typed is None:
+                dtypes.append('json')
+                buffers.append(values.tolist() if dtype.kind in 'OUS' else values.astype(str).tolist())
+                continue
+            dtypes.append(typed)
+            le = values.astype('<u1' if dtype.kind == 'b' else dtype.newbyteorder('<'), copy=False)
+            buffers.append(base64.b64encode(le.tobytes()).decode('ascii'))
+        return dict(columns=list(self.columns), length=len(self), dtypes=dtypes, buffers=buffers)
@@ -0,0 +1,53 @@
+from typing import Any, Optional, Sequence
+
+# above this many ops per row a full resend is cheaper than a patch
+FULL_RESEND_RATIO = 0.5
+
+
+def diff_rows(old: Sequence[dict[str, Any]], new: Sequence[dict[str, Any]],
+              key: Optional[str] = 'key') -> list[list]:
+    """Row ops turning `old` into `new`.
+
+    Rows are matched by `key` (antd's row key) or by position when `key` is None (gridjs).
+    ops: ['i', index, row] insert, ['u', id, row] update, ['d', id] delete, ['o', [keys]] reorder.
+    """
+    if key is None:
+        ops = [['u', i, r] for i, (o, r) in enumerate(zip(old, new)) if o != r]
+        ops.extend(['i', i, new[i]] for i in range(len(old), len(new)))
+        ops.extend(['d', i] for i in range(len(old) - 1, len(new) - 1, -1))
+        return ops
+
+    old_by_key = {r[key]: r for r in old}
+    new_keys = [r[key] for r in new]
+    new_key_set = set(new_keys)
+    ops = [['d', k] for k in old_by_key if k not in new_key_set]
+    for i, r in enumerate(new):
+        prev = old_by_key.get(r[key])
+        if prev is None:
+            ops.append(['i', i, r])
+        elif prev != r:
+            ops.append(['u', r[key], r])
+    kept = [r[key] for r in old if r[key] in new_key_set]
+    if kept != [k for k in new_keys if k in old_by_key]:
+        ops.append(['o', new_keys])
+    return ops
+
+
+def next_patch(patch: dict[str, Any], ops: list[list]) -> dict[str, Any]:
+    """Next versioned patch, applying to the rows of version `base` (the previous patch).
+
+    Every patch also names the version of the last full rows (`snapshot`), so a client that
+    (re)loads them with a later patch, or sees a patch whose base it has not applied, resyncs.
+    """
+    v = patch.get('v', 0)
+    return dict(v=v + 1, base=v, snapshot=patch.get('snapshot', 0), ops=ops)
+
+
+def snapshot_patch(patch: dict[str, Any]) -> dict[str, Any]:
+    """Patch sent along with a full resend of the rows, they are its version."""
+    v = patch.get('v', 0) + 1
+    return dict(v=v, base=v, snapshot=v, ops=[])
+
+
+def is_full_resend(ops: list[list], rows: Sequence) -> bool:
+    return len(ops) > max(len(rows) * FULL_RESEND_RATIO, 1)
@@ -0,0 +1,155 @@
+from typing import Any, Iterable, Iterator, Optional, Sequence
+from xml.sax.saxutils import escape
+import csv
+import io
+import math
+import re
+import zipfile
+
+# bytes buffered before a chunk goes out, the encoders never hold more than about this much output
+EXPORT_CHUNK_BYTES = 64 * 1024
+# rows per provider query
+EXPORT_BATCH = 1000
+# an xlsx sheet holds at most this many rows, the header included
+XLSX_MAX_ROWS = 1_048_576
+XLSX_MAX_CELL = 32_767
+
+CSV_MEDIA_TYPE = 'text/csv; charset=utf-8'
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# control characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+def csv_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]],
+               chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """CSV of `rows` as utf-8 chunks of about `chunk_bytes`, the first one as soon as it is full."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable file for zipfile: what it writes is taken out in chunks.
+
+    zipfile then streams: entries get a data descriptor after their data instead of a
+    header rewritten once the sizes are known.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f'<c><v>{value!r}</v></c>'
+    text = _XML_ILLEGAL.sub('', str(value))[:XLSX_MAX_CELL]
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f'<c t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable[Any]) -> str:
+    return '<row>' + ''.join(map(_xlsx_cell, values)) + '</row>'
+
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+def xlsx_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]], sheet: str = 'Sheet1',
+                chunk_bytes: int = EXPORT_CHUNK_BYTES, compresslevel: Optional[int] = 1) -> Iterator[bytes]:
+    """A one sheet xlsx of `rows` in constant memory, zipped as it is generated.
+
+    Strings are written inline instead of to a shared string table, so nothing is kept per row.
+    Rows past the sheet's XLSX_MAX_ROWS are dropped, check the count before streaming.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for name, xml in _XLSX_PARTS.items():
+            zf.writestr(name, xml)
+        zf.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet[:31], {'"': '&quot;'})))
+        # the download starts now, deflate holds back the sheet's first bytes for a while
+        yield sink.take()
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as part:
+            pending = [_XLSX_SHEET_START, _xlsx_row(header)]
+            size = 0
+            for i, row in enumerate(rows, 2):
+                if i > XLSX_MAX_ROWS:
+                    break
+                line = _xlsx_row(row)
+                pending.append(line)
+                size += len(line)
+                if size >= chunk_bytes:
+                    part.write(''.join(pending).encode())
+                    pending.clear()
+                    size = 0
+                    if len(sink) >= chunk_bytes:
+                        yield sink.take()
+            pending.append(_XLSX_SHEET_END)
+            part.write(''.join(pending).encode())
+    yield sink.take()
@@ -0,0 +1,185 @@
+from typing import Any, Awaitable, Callable, Optional
+from collections import defaultdict
+import asyncio
+import time
+
+from .indexed import view_params
+from .paging import DEFAULT_PAGE_SIZE
+from .provider import Filters, Sorter, TableProvider
+
+Page = tuple[dict[str, int], list[dict[str, Any]]]
+
+
+class LocalBroker:
+    """In-process pub/sub of table change notices.
+
+    Stands in for a shared broker (Redis pub/sub, ...) when every session is served by one process:
+    a multi-process deployment plugs in an object with the same subscribe()/publish() whose
+    listener calls the local callbacks, every process then refreshes the views of its own sessions.
+    """
+
+    def __init__(self):
+        self._callbacks: dict[str, list[Callable[[Any], Awaitable]]] = defaultdict(list)
+
+    def subscribe(self, channel: str, callback: Callable[[Any], Awaitable]):
+        self._callbacks[channel].append(callback)
+
+    async def publish(self, channel: str, message: Any = None):
+        await asyncio.gather(*(cb(message) for cb in self._callbacks.get(channel, ())))
+
+
+class Subscription:
+    """A session's current view; the latest page pushed for it waits in `page` until taken."""
+
+    __slots__ = ('token', 'sid', 'key', 'query', 'page', 'seen', 'closed', '_event')
+
+    def __init__(self, token: str, sid: str = ''):
+        self.token = token
+        # the session's socket, see ViewFanout.disconnect
+        self.sid = sid
+        self.key = ''
+        self.query: tuple = ()
+        self.page: Optional[Page] = None
+        self.seen = 0.0
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def push(self, key: str, page: Page):
+        if key != self.key:
+            # the session moved to another view while this one was fetched
+            return
+        # only the latest page matters, an unread one is replaced
+        self.page = page
+        self._event.set()
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+
+    async def _next(self, timeout: float) -> Optional[Page]:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        page, self.page = self.page, None
+        return page
+
+
+class ViewFanout:
+    """Pushes fresh pages to every subscribed session when the table's rows change.
+
+    Sessions subscribe with their (filters, sorter, page); on a change each distinct view is
+    fetched once and the page is pushed to all of its sessions, so a refresh costs one query per
+    distinct view, not one per session.
+
+    A subscription ends when its socket disconnects (disconnect()) or after `max_idle` seconds
+    without the session fetching or changing its view (update(), touch()). With `connected`
+    (sid -> bool) a session whose socket is still open is never idle, that is its heartbeat.
+    """
+
+    def __init__(self, provider: TableProvider, channel: str = 'table', broker: Optional[LocalBroker] = None,
+                 max_idle: float = 3600, timer: Callable[[], float] = time.monotonic,
+                 connected: Optional[Callable[[str], bool]] = None):
+        self.provider = provider
+        self.channel = channel
+        self.broker = broker or LocalBroker()
+        self.max_idle = max_idle
+        self.timer = timer
+        self.connected = connected
+        self._subscriptions: dict[str, Subscription] = {}
+        self.refreshes = 0
+        self.views_computed = 0
+        self.pushes = 0
+        self.broker.subscribe(channel, self._on_message)
+
+    def subscribe(self, token: str, pagination: Optional[dict[str, Any]], filters: Filters, sorter: Sorter,
+                  page_size: int = DEFAULT_PAGE_SIZE, sid: str = '') -> Subscription:
+        """A new subscription for the session, closing the one it had (e.g. from a previous page load)."""
+        old = self._subscriptions.pop(token, None)
+        if old is not None:
+            old.close()
+        sub = self._subscriptions[token] = Subscription(token, sid)
+        self.update(token, pagination, filters, sorter, page_size)
+        return sub
+
+    def update(self, token: str, pagination: Optional[dict[str, Any]], filters: Filters, sorter: Sorter,
+               page_size: int = DEFAULT_PAGE_SIZE) -> bool:
+        """The session now shows this view, False when it has no subscription (left or idled out) to update."""
+        sub = self._subscriptions.get(token)
+        if sub is None:
+            return False
+        pagination = pagination or {}
+        current, size = pagination.get('current') or 1, pagination.get('pageSize') or page_size
+        sub.key = f'{view_params(filters, sorter)}:{current}:{size}'
+        sub.query = (dict(current=current, pageSize=size), filters, sorter, page_size)
+        sub.seen = self.timer()
+        return True
+
+    def touch(self, token: str):
+        """The session fetched rows of its view, it is still watching."""
+        sub = self._subscriptions.get(token)
+        if sub is not None:
+            sub.seen = self.timer()
+
+    def unsubscribe(self, token: str):
+        sub = self._subscriptions.pop(token, None)
+        if sub is not None:
+            sub.close()
+
+    def disconnect(self, sid: str):
+        """End the subscriptions of a closed socket, their next_page() returns None."""
+        for token, sub in list(self._subscriptions.items()):
+            if sub.sid and sub.sid == sid:
+                self.unsubscribe(token)
+
+    def _idle(self, sub: Subscription, now: float) -> bool:
+        if now - sub.seen <= self.max_idle:
+            return False
+        if sub.sid and self.connected is not None and self.connected(sub.sid):
+            sub.seen = now
+            return False
+        return True
+
+    def subscription(self, token: str) -> Optional[Subscription]:
+        return self._subscriptions.get(token)
+
+    async def next_page(self, sub: Subscription) -> Optional[Page]:
+        """The next page pushed to `sub`, None once it is closed or was idle for max_idle."""
+        while not sub.closed:
+            page = await sub._next(self.max_idle)
+            if page is not None:
+                return page
+            if self._subscriptions.get(sub.token) is sub and self._idle(sub, self.timer()):
+                self.unsubscribe(sub.token)
+        return None
+
+    async def publish(self, message: Any = None):
+        """Announce a change of the rows to every process subscribed to the channel."""
+        await self.broker.publish(self.channel, message)
+
+    async def _on_message(self, message: Any):
+        await self.refresh()
+
+    async def refresh(self) -> int:
+        """Fetch each subscribed view once and push it to its sessions, returns the number of views."""
+        now = self.timer()
+        views: dict[str, list[Subscription]] = defaultdict(list)
+        for token, sub in list(self._subscriptions.items()):
+            if self._idle(sub, now):
+                self.unsubscribe(token)
+            else:
+                views[sub.key].append(sub)
+        for key, subs in views.items():
+            pagination, rows = await self.provider.fetch(*subs[0].query)
+            for sub in subs:
+                # sessions keep and edit their own list, the row dicts are shared
+                sub.push(key, (dict(pagination), list(rows)))
+            self.pushes += len(subs)
+        self.refreshes += 1
+        self.views_computed += len(views)
+        return len(views)
+
+    def info(self) -> dict[str, Any]:
+        return dict(sessions=len(self._subscriptions), views=len({s.key for s in self._subscriptions.values()}),
+                    refreshes=self.refreshes, views_computed=self.views_computed, pushes=self.pushes)
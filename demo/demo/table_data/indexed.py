@@ -0,0 +1,243 @@
+from typing import Any, Iterable, Optional, Sequence, Union
+from array import array
+from itertools import compress
+import json
+from operator import itemgetter
+
+# byte -> 8 flag bytes (lsb first), expands an int bitmap into one byte per row
+_BIT_FLAGS = [bytes((b >> i) & 1 for i in range(8)) for b in range(256)]
+# byte -> positions of its set bits
+_BIT_IDS = [tuple(i for i in range(8) if (b >> i) & 1) for b in range(256)]
+# rows a slice of a filtered view walks before all of its ids are built at once instead
+WALK_LIMIT = 1 << 15
+# bitmap bytes counted at once when skipping to the start of a slice
+_SKIP_BYTES = 4096
+
+
+def sort_key(value: Any) -> tuple:
+    """Order of a sortable column, SQLite's and the local mode tables' (compareValues) too:
+    None, then numbers, then text by code point."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def _flags(mask: int, size: int) -> bytes:
+    """One 0/1 byte per row of a `size` rows bitmap."""
+    return b''.join(map(_BIT_FLAGS.__getitem__, mask.to_bytes((size + 7) // 8, 'little')))
+
+
+class TableView:
+    """A session's view of a shared table: the filter/sort params and the matching row ids.
+
+    `ids` is None for the unfiltered natural order, otherwise a compact array('I'). A filtered
+    view starts from its row bitmap (`mask`) and sort `order` instead and builds no ids: a slice
+    walks them only until it is filled, so a page near the top costs the rows above it, not the
+    table. Its ids are built whole (and kept) once a slice would walk more than WALK_LIMIT rows.
+    """
+
+    __slots__ = ('ids', 'size', 'params', 'mask', 'order', '_bits')
+
+    def __init__(self, ids: Optional[array], size: int, params: str = '', mask: Optional[int] = None,
+                 order: Optional[array] = None):
+        self.ids = ids
+        self.params = params
+        self.mask = mask
+        self.order = order
+        self._bits: Optional[bytes] = None
+        if mask is not None:
+            self.size = mask.bit_count()
+        else:
+            self.size = size if ids is None else len(ids)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, item: slice) -> Union[range, array]:
+        if self.mask is not None and self.ids is None:
+            start, stop, step = item.indices(self.size)
+            ids = self._walk(start, stop) if step == 1 else None
+            if ids is not None:
+                return ids
+            self.ids = self._build()
+        return range(self.size)[item] if self.ids is None else self.ids[item]
+
+    def _walk(self, start: int, stop: int) -> Optional[array]:
+        """ids[start:stop] read off the bitmap, None when that walks more than WALK_LIMIT rows."""
+        ids = array('I')
+        want = stop - start
+        if want <= 0:
+            return ids
+        if want > WALK_LIMIT:
+            return None
+        if self._bits is None:
+            self._bits = self.mask.to_bytes((self.mask.bit_length() + 7) // 8, 'little')
+        bits = self._bits
+        if self.order is None:
+            # whole chunks before the start are only counted, the rest is read set bit by set bit
+            pos = 0
+            while pos < len(bits):
+                n = int.from_bytes(bits[pos:pos + _SKIP_BYTES], 'little').bit_count()
+                if n > start:
+                    break
+                start -= n
+                pos += _SKIP_BYTES
+            for k in range(pos, len(bits)):
+                for bit in _BIT_IDS[bits[k]]:
+                    if start:
+                        start -= 1
+                        continue
+                    ids.append(k << 3 | bit)
+                    if len(ids) == want:
+                        return ids
+            return ids
+        seen = 0
+        for walked, i in enumerate(self.order):
+            if walked == WALK_LIMIT:
+                return None
+            if (i >> 3) < len(bits) and (bits[i >> 3] >> (i & 7)) & 1:
+                if seen >= start:
+                    ids.append(i)
+                    if len(ids) == want:
+                        return ids
+                seen += 1
+        return ids
+
+    def _build(self) -> array:
+        if self.order is None:
+            size = self.mask.bit_length()
+            ids = array('I', compress(range(size), _flags(self.mask, size)))
+        else:
+            flags = _flags(self.mask, len(self.order))
+            ids = array('I', compress(self.order, map(flags.__getitem__, self.order)))
+        return ids
+
+
+def view_params(filters: Optional[dict], sorter: Optional[dict]) -> str:
+    """Canonical key of antd's onChange filters/sorter, fields without values (no filter) left out."""
+    sort = sorter and sorter.get('column') is not None and [sorter.get('field'), sorter.get('order')]
+    return json.dumps([{f: v for f, v in (filters or {}).items() if v}, sort or None], sort_keys=True)
+
+
+class IndexedTable:
+    """Shared read-only rows plus a sorted permutation per sortable column and a bitmap per filter value.
+
+    Build one per process and share it between sessions, sessions only keep a TableView.
+    sort + filter is then an AND/OR over bitmaps and one walk of the permutation,
+    instead of a list comprehension and a full sort per event. Only the `sortable` and
+    `filterable` fields are indexed, sorts and filters on other fields are ignored.
+    """
+
+    def __init__(self, rows: Sequence[dict[str, Any]], sortable: Iterable[str] = (),
+                 filterable: Iterable[str] = ()):
+        self.rows = tuple(rows)
+        self._orders: dict[str, array] = {}
+        self._desc_orders: dict[str, array] = {}
+        self._bitmaps: dict[str, dict[Any, int]] = {}
+        for field in sortable:
+            self._build_order(field)
+        for field in filterable:
+            self._build_bitmaps(field)
+
+    @classmethod
+    def from_columns(cls, rows: Sequence[dict[str, Any]], columns: list[dict[str, Any]]) -> 'IndexedTable':
+        """Index the columns antd marks as sortable (`sorter`) or filterable (`filters`)."""
+        field = itemgetter('dataIndex')
+        return cls(
+            rows,
+            sortable=[field(c) for c in columns if c.get('sorter')],
+            filterable=[field(c) for c in columns if 'filters' in c],
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def sortable(self) -> list[str]:
+        return list(self._orders)
+
+    @property
+    def filterable(self) -> list[str]:
+        return list(self._bitmaps)
+
+    def _build_order(self, field: str):
+        keys = [sort_key(r[field]) for r in self.rows]
+        ids = range(len(keys))
+        self._orders[field] = array('I', sorted(ids, key=keys.__getitem__))
+        # not the ascending order reversed: ties keep the row order both ways, like antd's stable sort
+        self._desc_orders[field] = array('I', sorted(ids, key=keys.__getitem__, reverse=True))
+
+    def _build_bitmaps(self, field: str) -> dict[Any, int]:
+        postings: dict[Any, list[int]] = {}
+        for i, r in enumerate(self.rows):
+            postings.setdefault(r[field], []).append(i)
+        size = (len(self.rows) + 7) // 8
+        bitmaps = self._bitmaps[field] = {}
+        for value, ids in postings.items():
+            buf = bytearray(size)
+            for i in ids:
+                buf[i >> 3] |= 1 << (i & 7)
+            bitmaps[value] = int.from_bytes(buf, 'little')
+        return bitmaps
+
+    def mask(self, filters: Optional[dict[str, Optional[list]]]) -> Optional[int]:
+        """Bitmap of the rows passing `filters` (antd's onChange shape), None means every row.
+
+        A field with no values (None or []) does not filter, like antd's cleared filters.
+        """
+        mask = None
+        for field, values in (filters or {}).items():
+            bitmaps = self._bitmaps.get(field)
+            if not values or bitmaps is None:
+                continue
+            selected = 0
+            for v in values:
+                selected |= bitmaps.get(v, 0)
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def query(self, filters: Optional[dict[str, Optional[list]]] = None,
+              field: Optional[str] = None, order: Optional[str] = None, search: Optional[int] = None) -> array:
+        """Row ids passing `filters` and the `search` bitmap (SearchIndex), ordered by `field` ('ascend'/'descend')."""
+        mask = self._search_mask(filters, search)
+        ids = (self._desc_orders if order == 'descend' else self._orders).get(field, range(len(self.rows)))
+        if mask is None:
+            return array('I', ids)
+        flags = _flags(mask, len(self.rows))
+        if field not in self._orders:
+            return array('I', compress(ids, flags))
+        return array('I', compress(ids, map(flags.__getitem__, ids)))
+
+    def _search_mask(self, filters: Optional[dict[str, Optional[list]]], search: Optional[int]) -> Optional[int]:
+        mask = self.mask(filters)
+        if search is not None:
+            mask = search if mask is None else mask & search
+        return mask
+
+    def select(self, filters: Optional[dict[str, Optional[list]]], sorter: Optional[dict[str, Any]],
+               search: Optional[int] = None) -> array:
+        """query() from antd's onChange filters/sorter payload."""
+        if sorter and sorter.get('column') is not None:
+            return self.query(filters, sorter['field'], sorter['order'], search)
+        return self.query(filters, search=search)
+
+    def view(self, filters: Optional[dict[str, Optional[list]]] = None,
+             sorter: Optional[dict[str, Any]] = None, search: Optional[int] = None) -> TableView:
+        """The rows passing `filters` and `search`, sorted by antd's `sorter`; filtered views are walked lazily."""
+        params = view_params(filters, sorter)
+        mask = self._search_mask(filters, search)
+        order = None
+        if sorter and sorter.get('column') is not None:
+            orders = self._desc_orders if sorter.get('order') == 'descend' else self._orders
+            order = orders.get(sorter.get('field'))
+        if mask is not None:
+            return TableView(None, len(self.rows), params, mask=mask, order=order)
+        # the shared permutation itself, views never change their ids
+        return TableView(order, len(self.rows), params)
+
+    def materialize(self, ids: Iterable[int]) -> list[dict[str, Any]]:
+        """Copies of the rows at `ids`, so session state never aliases the shared rows."""
+        rows = self.rows
+        return [dict(rows[i]) for i in ids]
@@ -0,0 +1,19 @@
+from typing import Any, Optional, Sequence
+
+DEFAULT_PAGE_SIZE = 10
+
+
+def normalize_pagination(pagination: Optional[dict[str, Any]], total: int,
+                         page_size: int = DEFAULT_PAGE_SIZE) -> dict[str, int]:
+    """Clamp antd's pagination payload (current/pageSize) against the result size."""
+    pagination = pagination or {}
+    page_size = max(int(pagination.get('pageSize') or page_size), 1)
+    pages = max((total + page_size - 1) // page_size, 1)
+    current = min(max(int(pagination.get('current') or 1), 1), pages)
+    return dict(current=current, pageSize=page_size, total=total)
+
+
+def page_slice(rows: Sequence, pagination: dict[str, int]) -> list:
+    """Return only the rows of the current page, O(page size)."""
+    start = (pagination['current'] - 1) * pagination['pageSize']
+    return list(rows[start:start + pagination['pageSize']])
@@ -0,0 +1,118 @@
+from typing import Any, Iterator, Optional, Sequence
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import asyncio
+
+from .indexed import IndexedTable, TableView, view_params
+from .paging import DEFAULT_PAGE_SIZE, normalize_pagination
+from .search import SearchIndex, split_search
+
+Filters = Optional[dict[str, Optional[list]]]
+Sorter = Optional[dict[str, Any]]
+
+
+class TableProvider(ABC):
+    """Answers antd's onChange payload (pagination/filters/sorter) with a total and one page of rows.
+
+    One provider is shared by every session, so implementations must not keep per-session state.
+    """
+
+    # True when queries block (I/O), fetch() then runs them in a worker thread
+    blocking = True
+
+    @abstractmethod
+    def count(self, filters: Filters) -> int:
+        ...
+
+    @abstractmethod
+    def rows(self, filters: Filters, sorter: Sorter, offset: int, limit: int) -> list[dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def replace_rows(self, rows: list[dict[str, Any]]):
+        """Swap in new rows, e.g. from a background refresh."""
+
+    def iter_rows(self, filters: Filters, sorter: Sorter, batch: int = 1000) -> Iterator[list[dict[str, Any]]]:
+        """Every row of the view in batches, for exports: only one batch is loaded at a time.
+
+        Call it where the provider is queried, the returned iterator may then be read from another thread.
+        """
+        offset = 0
+        while True:
+            rows = self.rows(filters, sorter, offset, batch)
+            if rows:
+                yield rows
+            if len(rows) < batch:
+                return
+            offset += batch
+
+    def fetch_page(self, pagination: Optional[dict[str, Any]], filters: Filters, sorter: Sorter,
+                   page_size: int = DEFAULT_PAGE_SIZE) -> tuple[dict[str, int], list[dict[str, Any]]]:
+        pagination = normalize_pagination(pagination, self.count(filters), page_size)
+        offset = (pagination['current'] - 1) * pagination['pageSize']
+        return pagination, self.rows(filters, sorter, offset, pagination['pageSize'])
+
+    async def fetch(self, pagination: Optional[dict[str, Any]], filters: Filters, sorter: Sorter,
+                    page_size: int = DEFAULT_PAGE_SIZE) -> tuple[dict[str, int], list[dict[str, Any]]]:
+        """fetch_page() without blocking the event loop."""
+        if not self.blocking:
+            return self.fetch_page(pagination, filters, sorter, page_size)
+        return await asyncio.to_thread(self.fetch_page, pagination, filters, sorter, page_size)
+
+
+class IndexedProvider(TableProvider):
+    """In-memory provider over an IndexedTable, the last views are shared between sessions.
+
+    With `search_fields` a SearchIndex answers the SEARCH_FILTER entry of the filters.
+    """
+
+    blocking = False
+
+    def __init__(self, table: IndexedTable, max_views: int = 64, search_fields: Sequence[str] = ()):
+        self.table = table
+        self.max_views = max_views
+        self._views: OrderedDict[str, TableView] = OrderedDict()
+        self.search = SearchIndex(table.rows, search_fields) if search_fields else None
+
+    def _select(self, filters: Filters, sorter: Sorter) -> TableView:
+        filters, text = split_search(filters)
+        if text is None:
+            return self.table.view(filters, sorter)
+        if self.search is None:
+            raise ValueError('the table has no search fields')
+        return self.table.view(filters, sorter, self.search.search(text))
+
+    def view(self, filters: Filters, sorter: Sorter) -> TableView:
+        key = view_params(filters, sorter)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = self._select(filters, sorter)
+            if len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(key)
+        return view
+
+    def replace_rows(self, rows: list[dict[str, Any]]):
+        self.table = IndexedTable(rows, self.table.sortable, self.table.filterable)
+        if self.search is not None:
+            # only the rows that changed are re-indexed
+            self.search.replace_rows(self.table.rows)
+        self._views.clear()
+
+    def count(self, filters: Filters) -> int:
+        return len(self.view(filters, None))
+
+    def iter_rows(self, filters: Filters, sorter: Sorter, batch: int = 1000) -> Iterator[list[dict[str, Any]]]:
+        # not a generator: the table and view are resolved now, by the caller (the event loop) and not
+        # by the thread reading the batches, and a replace_rows() during the export does not mix in new rows
+        return self._batches(self.table.rows, self.view(filters, sorter), batch)
+
+    @staticmethod
+    def _batches(rows: Sequence[dict[str, Any]], view: TableView, batch: int) -> Iterator[list[dict[str, Any]]]:
+        for start in range(0, len(view), batch):
+            # read only, no copies
+            yield [rows[i] for i in view[start:start + batch]]
+
+    def rows(self, filters: Filters, sorter: Sorter, offset: int, limit: int) -> list[dict[str, Any]]:
+        return self.table.materialize(self.view(filters, sorter)[offset:offset + limit])
@@ -0,0 +1,261 @@
+from typing import Any, Iterable, Optional, Sequence, Union
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from itertools import compress
+import re
+import sys
+
+from .indexed import _BIT_FLAGS
+
+Filters = Optional[dict[str, Optional[list]]]
+
+# filters key of the search box text, it rides along antd's column filters through the
+# view caches, fanout keys, summaries and exports: {'gender': ['male'], SEARCH_FILTER: ['down']}
+SEARCH_FILTER = '_search'
+# terms of at least GRAM characters match anywhere inside a token, shorter ones match token prefixes
+GRAM = 3
+# index key of a token's 1..GRAM-1 character prefixes, tokens are \w+ so it never collides with one
+_PREFIX = '^'
+
+_TOKEN = re.compile(r'\w+')
+
+Posting = Union[array, int]
+
+
+def tokenize(value: Any) -> list[str]:
+    return [] if value is None else _TOKEN.findall(str(value).lower())
+
+
+@lru_cache(maxsize=256)
+def query_terms(text: str) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(tokenize(text)))
+
+
+def _grams(token: str) -> set[str]:
+    return {token[i:i + GRAM] for i in range(len(token) - GRAM + 1)}
+
+
+def _value(row: Any, field: Any) -> Any:
+    # dict rows (antd) by key, list rows (gridjs) by column index
+    return row.get(field) if isinstance(row, dict) else row[field]
+
+
+@lru_cache(maxsize=1 << 16)
+def _value_keys(value: Optional[str]) -> frozenset[str]:
+    """The index keys of a cell: its tokens and their 1..GRAM-1 character prefixes."""
+    tokens = frozenset(tokenize(value))
+    return tokens.union(*({_PREFIX + t[:k] for t in tokens} for k in range(1, GRAM)))
+
+
+def term_matches(term: str, token: str) -> bool:
+    return term in token if len(term) >= GRAM else token.startswith(term)
+
+
+def values_match(values: Iterable[Any], text: str) -> bool:
+    """The search semantics: every term of `text` matches one of the tokens of `values`."""
+    tokens = {t for v in values for t in tokenize(v)}
+    return all(any(term_matches(term, t) for t in tokens) for term in query_terms(text))
+
+
+def row_matches(row: Any, text: str, fields: Sequence[Any]) -> bool:
+    return values_match((_value(row, f) for f in fields), text)
+
+
+def split_search(filters: Filters) -> tuple[Filters, Optional[str]]:
+    """(the column filters, the search text or None) of a filters dict."""
+    if not filters or not filters.get(SEARCH_FILTER):
+        return filters, None
+    return {f: v for f, v in filters.items() if f != SEARCH_FILTER}, ' '.join(map(str, filters[SEARCH_FILTER]))
+
+
+def with_search(filters: Filters, text: Optional[str]) -> dict[str, Any]:
+    filters = {f: v for f, v in (filters or {}).items() if f != SEARCH_FILTER}
+    if text and query_terms(text):
+        filters[SEARCH_FILTER] = [text]
+    return filters
+
+
+def ids_bitmap(ids: Iterable[int], size: int) -> int:
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def bitmap_ids(bitmap: int, size: int) -> array:
+    """The set bits of `bitmap`, ascending."""
+    flags = b''.join(map(_BIT_FLAGS.__getitem__, bitmap.to_bytes((size + 7) // 8, 'little')))
+    return array('I', compress(range(size), flags))
+
+
+class SearchIndex:
+    """Inverted index of the rows' text for SEARCH_FILTER: token -> ids (row positions).
+
+    Postings are sorted array('I') ids; a token in at least 1/`dense_ratio` of the rows keeps an
+    int bitmap instead, like IndexedTable's filter bitmaps. Terms of GRAM+ characters find their
+    tokens through a trigram index of the vocabulary; the shorter prefixes of every token are
+    indexed like tokens, so a short term is one posting. A search ANDs one bitmap per term, each
+    cached until the rows change; replace_rows() only re-indexes the positions whose row changed,
+    append_rows() only the new ones.
+    """
+
+    def __init__(self, rows: Sequence[Any], fields: Sequence[Any], dense_ratio: int = 128, max_terms: int = 64):
+        self.fields = tuple(fields)
+        self.dense_ratio = dense_ratio
+        self.max_terms = max_terms
+        self.rows: list[Any] = []
+        self._postings: dict[str, Posting] = {}
+        self._df: dict[str, int] = {}
+        self._grams: dict[str, set[str]] = defaultdict(set)
+        self._terms: OrderedDict[str, int] = OrderedDict()
+        self.version = 0
+        self.replace_rows(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def replace_rows(self, rows: Sequence[Any]) -> int:
+        """Index the rows now at each position, returns the number of positions re-indexed."""
+        old_rows, rows = self.rows, list(rows)
+        adds: dict[str, list[int]] = defaultdict(list)
+        removes: dict[str, list[int]] = defaultdict(list)
+        common = min(len(old_rows), len(rows))
+        changed = [i for i, old, new in zip(range(common), old_rows, rows) if old is not new and old != new]
+        changed.extend(range(common, max(len(old_rows), len(rows))))
+        for i in changed:
+            old = old_rows[i] if i < len(old_rows) else None
+            new = rows[i] if i < len(rows) else None
+            if old is None:
+                for t in self._keys(new):
+                    adds[t].append(i)
+                continue
+            before = self._keys(old)
+            after = self._keys(new) if new is not None else set()
+            for t in before - after:
+                removes[t].append(i)
+            for t in after - before:
+                adds[t].append(i)
+        self.rows = rows
+        if changed:
+            self._apply(adds, removes, max(len(old_rows), len(rows)))
+            self._terms.clear()
+            self.version += 1
+        return len(changed)
+
+    def append_rows(self, rows: Sequence[Any]) -> int:
+        """Index `rows` after the current ones without comparing those, returns the position of the first."""
+        start = len(self.rows)
+        adds: dict[str, list[int]] = defaultdict(list)
+        for i, row in enumerate(rows, start):
+            for t in self._keys(row):
+                adds[t].append(i)
+        self.rows.extend(rows)
+        if rows:
+            self._apply(adds, {}, len(self.rows))
+            self._terms.clear()
+            self.version += 1
+        return start
+
+    def _apply(self, adds: dict[str, list[int]], removes: dict[str, list[int]], span: int):
+        # `span` covers the old positions too, the removed ones may be past the new end
+        size = len(self.rows)
+        new, gone = [], []
+        for token in adds.keys() | removes.keys():
+            added, removed = adds.get(token, ()), removes.get(token, ())
+            posting = self._postings.get(token)
+            df = self._df.get(token, 0) + len(added) - len(removed)
+            if df <= 0:
+                if posting is not None:
+                    del self._postings[token], self._df[token]
+                    gone.append(token)
+                continue
+            if posting is None:
+                token = sys.intern(token)
+                posting = array('I')
+                new.append(token)
+            if isinstance(posting, int):
+                posting = (posting & ~ids_bitmap(removed, span)) | ids_bitmap(added, span)
+                if df * self.dense_ratio * 2 < size:
+                    posting = bitmap_ids(posting, size)
+            else:
+                if len(added) + len(removed) <= 32:
+                    for i in removed:
+                        del posting[bisect_left(posting, i)]
+                    for i in added:
+                        insort(posting, i)
+                else:
+                    drop = set(removed)
+                    posting = array('I', sorted([*(i for i in posting if i not in drop), *added]))
+                if df * self.dense_ratio >= size:
+                    posting = ids_bitmap(posting, span)
+            self._postings[token] = posting
+            self._df[token] = df
+        # the trigrams of the vocabulary, prefix keys are looked up directly
+        for token in gone:
+            for gram in _grams(token) if token[0] != _PREFIX else ():
+                self._grams[gram].discard(token)
+                if not self._grams[gram]:
+                    del self._grams[gram]
+        for token in new:
+            for gram in _grams(token) if token[0] != _PREFIX else ():
+                self._grams[gram].add(token)
+
+    def _keys(self, row: Any) -> set[str]:
+        return set().union(*(_value_keys(None if v is None else str(v)) for v in (_value(row, f) for f in self.fields)))
+
+    def tokens(self, term: str) -> list[str]:
+        """The index keys whose postings hold the rows `term` matches."""
+        if len(term) < GRAM:
+            key = _PREFIX + term
+            return [key] if key in self._postings else []
+        sets = sorted((self._grams.get(g, ()) for g in _grams(term)), key=len)
+        return [t for t in sets[0] if term in t] if sets[0] else []
+
+    def _term(self, term: str) -> int:
+        bitmap = self._terms.get(term)
+        if bitmap is not None:
+            self._terms.move_to_end(term)
+            return bitmap
+        bitmap, sparse = 0, []
+        for token in self.tokens(term):
+            posting = self._postings[token]
+            if isinstance(posting, int):
+                bitmap |= posting
+            else:
+                sparse.append(posting)
+        if sparse:
+            bitmap |= ids_bitmap((i for posting in sparse for i in posting), len(self.rows))
+        self._terms[term] = bitmap
+        if len(self._terms) > self.max_terms:
+            self._terms.popitem(last=False)
+        return bitmap
+
+    def search(self, text: str) -> Optional[int]:
+        """Bitmap of the rows matching every term of `text`, None when it has no terms (every row)."""
+        terms = query_terms(text)
+        if not terms:
+            return None
+        bitmap = self._term(terms[0])
+        for term in terms[1:]:
+            if not bitmap:
+                break
+            bitmap &= self._term(term)
+        return bitmap
+
+    def ids(self, text: str, start: int = 0) -> array:
+        """Positions of the rows matching `text`, from `start` on."""
+        bitmap = self.search(text)
+        if bitmap is None:
+            return array('I', range(start, len(self.rows)))
+        return array('I', (start + i for i in bitmap_ids(bitmap >> start, max(0, len(self.rows) - start))))
+
+    def count(self, text: str, stop: int) -> int:
+        """Number of the rows before position `stop` matching `text`."""
+        bitmap = self.search(text)
+        return min(stop, len(self.rows)) if bitmap is None else (bitmap & ((1 << stop) - 1)).bit_count()
+
+    def info(self) -> dict[str, int]:
+        return dict(rows=len(self.rows), tokens=len(self._postings), grams=len(self._grams),
+                    dense=sum(isinstance(p, int) for p in self._postings.values()), version=self.version)
@@ -0,0 +1,178 @@
+from typing import Any, Iterable, Iterator, Optional, Sequence
+from contextlib import contextmanager
+import queue
+import sqlite3
+import threading
+
+from .paging import DEFAULT_PAGE_SIZE, normalize_pagination
+from .provider import Filters, Sorter, TableProvider
+from .search import split_search, values_match
+
+# search_fields..., text -> 1 when the row matches the search, the SearchIndex semantics row by row
+SEARCH_FUNCTION = 'table_search'
+
+
+def _search(*args) -> bool:
+    return values_match(args[:-1], args[-1])
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteProvider(TableProvider):
+    """Pushes sort/filter/pagination down to SQLite: WHERE col IN (...) ORDER BY col LIMIT ? OFFSET ?.
+
+    Connections come from a bounded pool and keep their own prepared statement cache; only
+    whitelisted `columns` are ever put in the SQL text, values are always bound parameters.
+    The SEARCH_FILTER text is matched against `search_fields` by a Python function, a full scan.
+    """
+
+    def __init__(self, path: str, table: str, columns: Sequence[str], pool_size: int = 4,
+                 timeout: float = 10.0, cached_statements: int = 256, search_fields: Sequence[str] = ()):
+        self.path = path
+        self.table = _quote(table)
+        self.columns = {c: _quote(c) for c in columns}
+        self.search_fields = [self._column(f) for f in search_fields]
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_rows(cls, path: str, table: str, rows: Sequence[dict[str, Any]], sortable: Iterable[str] = (),
+                  filterable: Iterable[str] = (), columns: Optional[Sequence[str]] = None,
+                  **kwargs) -> 'SqliteProvider':
+        """(Re)create `table` from `rows`, with an index per sortable/filterable column.
+
+        The columns are the first row's keys unless given, so an empty table needs `columns`.
+        Rows a previous run left in the file are dropped, in the same transaction, so the table
+        always starts from `rows` (which the caller keeps diffing refreshes against).
+        """
+        columns = list(columns if columns is not None else rows[0] if rows else ())
+        if not columns:
+            raise ValueError('no columns for the table, pass columns when there are no rows')
+        provider = cls(path, table, columns, **kwargs)
+        with provider.connection() as conn, conn:
+            # explicit, sqlite3 would otherwise run the DDL outside of the insert's transaction
+            conn.execute('BEGIN')
+            conn.execute(f'DROP TABLE IF EXISTS {provider.table}')
+            cols = ', '.join(provider.columns.values())
+            conn.execute(f'CREATE TABLE {provider.table} ({cols})')
+            conn.executemany(
+                f'INSERT INTO {provider.table} ({cols}) VALUES ({", ".join("?" * len(columns))})',
+                ([r.get(c) for c in columns] for r in rows),
+            )
+            for field in dict.fromkeys([*sortable, *filterable]):
+                conn.execute(
+                    f'CREATE INDEX {_quote(f"ix_{table}_{field}")} ON {provider.table} ({provider._column(field)})'
+                )
+        return provider
+
+    def replace_rows(self, rows: list[dict[str, Any]]):
+        cols = ', '.join(self.columns.values())
+        with self.connection() as conn, conn:
+            conn.execute(f'DELETE FROM {self.table}')
+            conn.executemany(
+                f'INSERT INTO {self.table} ({cols}) VALUES ({", ".join("?" * len(self.columns))})',
+                ([r.get(c) for c in self.columns] for r in rows),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.create_function(SEARCH_FUNCTION, -1, _search, deterministic=True)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = self._connect() if self._created < self.pool_size else None
+                self._created += conn is not None
+            if conn is None:
+                conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+    def _column(self, field: str) -> str:
+        try:
+            return self.columns[field]
+        except KeyError:
+            raise ValueError(f'unknown column {field!r}') from None
+
+    def _where(self, filters: Filters) -> tuple[str, list]:
+        filters, text = split_search(filters)
+        clauses, params = [], []
+        if text is not None:
+            if not self.search_fields:
+                raise ValueError('the table has no search fields')
+            clauses.append(f'{SEARCH_FUNCTION}({", ".join(self.search_fields)}, ?)')
+            params.append(text)
+        for field, values in (filters or {}).items():
+            if not values:
+                continue
+            clauses.append(f'{self._column(field)} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def _order(self, sorter: Sorter) -> str:
+        if not sorter or sorter.get('column') is None:
+            return ' ORDER BY rowid'
+        direction = 'DESC' if sorter.get('order') == 'descend' else 'ASC'
+        # ties in row order both ways, like IndexedTable and antd's local sort
+        return f' ORDER BY {self._column(sorter["field"])} {direction}, rowid'
+
+    def _count(self, conn: sqlite3.Connection, filters: Filters) -> int:
+        where, params = self._where(filters)
+        return conn.execute(f'SELECT COUNT(*) FROM {self.table}{where}', params).fetchone()[0]
+
+    def _rows(self, conn: sqlite3.Connection, filters: Filters, sorter: Sorter,
+              offset: int, limit: int) -> list[dict[str, Any]]:
+        where, params = self._where(filters)
+        sql = f'SELECT {", ".join(self.columns.values())} FROM {self.table}{where}{self._order(sorter)} LIMIT ? OFFSET ?'
+        return [dict(r) for r in conn.execute(sql, [*params, limit, offset])]
+
+    def iter_rows(self, filters: Filters, sorter: Sorter, batch: int = 1000) -> Iterator[list[dict[str, Any]]]:
+        # one query read with fetchmany() instead of LIMIT/OFFSET pages, each rescanning the skipped rows;
+        # on its own connection, an export must not hold a pooled one for its whole download
+        where, params = self._where(filters)
+        sql = f'SELECT {", ".join(self.columns.values())} FROM {self.table}{where}{self._order(sorter)}'
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while rows := cursor.fetchmany(batch):
+                yield [dict(r) for r in rows]
+        finally:
+            conn.close()
+
+    def count(self, filters: Filters) -> int:
+        with self.connection() as conn:
+            return self._count(conn, filters)
+
+    def rows(self, filters: Filters, sorter: Sorter, offset: int, limit: int) -> list[dict[str, Any]]:
+        with self.connection() as conn:
+            return self._rows(conn, filters, sorter, offset, limit)
+
+    def fetch_page(self, pagination: Optional[dict[str, Any]], filters: Filters, sorter: Sorter,
+                   page_size: int = DEFAULT_PAGE_SIZE) -> tuple[dict[str, int], list[dict[str, Any]]]:
+        # count + page on one pooled connection
+        with self.connection() as conn:
+            pagination = normalize_pagination(pagination, self._count(conn, filters), page_size)
+            offset = (pagination['current'] - 1) * pagination['pageSize']
+            return pagination, self._rows(conn, filters, sorter, offset, pagination['pageSize'])
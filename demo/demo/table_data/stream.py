@@ -0,0 +1,37 @@
+from typing import Any, AsyncIterator, Callable, Optional
+
+
+async def stream_batches(state: Any, batches: AsyncIterator[list], append: Callable[[list], None],
+                         total: Optional[int] = None, reset: Optional[Callable[[], None]] = None):
+    """Feed row batches from an async generator into a table from a background event handler.
+
+    `state` is the background task's state proxy, it needs `streaming`, `_stream_id`,
+    `stream_loaded` and `stream_total` vars. Every batch is applied under the state lock and sent
+    when the lock is released, before the next batch is pulled, so at most one batch is pending
+    per session. Clearing `streaming` from another event cancels the load; each load gets its own
+    `_stream_id`, so a cancelled load still waiting on a batch leaves the next load alone.
+    """
+    async with state:
+        if state.streaming:
+            return
+        state._stream_id += 1
+        load_id = state._stream_id
+        state.streaming = True
+        state.stream_loaded = 0
+        state.stream_total = total or 0
+        if reset is not None:
+            reset()
+    try:
+        async for batch in batches:
+            async with state:
+                if not state.streaming or state._stream_id != load_id:
+                    break
+                append(batch)
+                state.stream_loaded += len(batch)
+    finally:
+        aclose = getattr(batches, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+        async with state:
+            if state._stream_id == load_id:
+                state.streaming = False
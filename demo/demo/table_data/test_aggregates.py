@@ -0,0 +1,130 @@
+"""Randomized checks of the incremental aggregates against recomputing them: python -m pytest demo/table_data"""
+from collections import Counter
+from fractions import Fraction
+import math
+import random
+
+import pytest
+
+from .aggregates import AGGREGATES, ColumnAggregate, Extrema, SummaryIndex, TableAggregates, row_changes
+from .indexed import sort_key
+from .search import SEARCH_FILTER
+
+SPEC = {'key': ['count'], 'age': ['count', 'sum', 'mean', 'min', 'max'], 'name': ['min', 'max']}
+FILTERS = [
+    None,
+    {'gender': ['male']},
+    {'gender': ['male', 'female'], 'name': ['Ann', 'Bob']},
+    {'gender': []},
+    {SEARCH_FILTER: ['an']},
+    {'gender': ['female'], SEARCH_FILTER: ['street 1']},
+]
+
+
+def make_row(rnd: random.Random, key: int) -> dict:
+    return dict(
+        key=str(key), name=rnd.choice(['Ann', 'Bob', 'Cid', 'Dan Lee']), age=rnd.choice([None, *range(18, 30)]),
+        gender=rnd.choice(['male', 'female']), address=f'{rnd.randint(1, 20)} Street',
+    )
+
+
+def test_extrema_matches_a_recount():
+    rnd = random.Random(0)
+    extrema, live = Extrema(), Counter()
+    for _ in range(5000):
+        if live and rnd.random() < 0.45:
+            value = rnd.choice(list(live.elements()))
+            extrema.remove(value)
+            live[value] -= 1
+            live += Counter()
+        else:
+            value = rnd.randint(-20, 20)
+            extrema.add(value)
+            live[value] += 1
+        assert len(extrema) == sum(live.values())
+        assert extrema.min() == (min(live) if live else None)
+        assert extrema.max() == (max(live) if live else None)
+    with pytest.raises(KeyError):
+        extrema.remove(100)
+
+
+def test_column_aggregate_sum_stays_exact():
+    rnd = random.Random(3)
+    column, live, exact = ColumnAggregate('v', AGGREGATES), [], Fraction(0)
+    for _ in range(5000):
+        if live and rnd.random() < 0.45:
+            value = live.pop(rnd.randrange(len(live)))
+            column.remove(value)
+            exact -= Fraction(value)
+        else:
+            value = rnd.choice([0.1, 1e16, -1e16, 1e-300, rnd.uniform(-1e6, 1e6), rnd.randint(-10 ** 20, 10 ** 20)])
+            column.add(value)
+            live.append(value)
+            exact += Fraction(value)
+        result = column.result()
+        # rounded once: the float nearest to the exact sum, an int while there are no floats
+        assert result['sum'] == (float(exact) if any(isinstance(v, float) for v in live) else exact)
+        assert result['mean'] == (float(exact / len(live)) if live else None)
+    while live:
+        column.remove(live.pop())
+    column.add(3)
+    assert column.result() == dict(count=1, sum=3, mean=3.0, min=3, max=3)
+
+
+def test_column_aggregate_mixed_values():
+    values = [3, 'b', None, 1.5, 'a', True, '10']
+    column = ColumnAggregate('v', AGGREGATES, values)
+    # every value is counted, only the numbers are summed and averaged
+    assert column.result() == dict(count=6, sum=5.5, mean=5.5 / 3, min=True, max='b')
+    ordered = sorted([v for v in values if v is not None], key=sort_key)
+    assert (column.result()['min'], column.result()['max']) == (ordered[0], ordered[-1])
+    for v in (3, 1.5, True):
+        column.remove(v)
+    assert column.result() == dict(count=3, sum=0, mean=None, min='10', max='b')
+    column.add(float('inf'))
+    assert column.result()['sum'] == math.inf
+    column.add(float('-inf'))
+    assert math.isnan(column.result()['sum'])
+    column.remove(float('-inf'))
+    column.remove(float('inf'))
+    assert column.result()['sum'] == 0
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_table_aggregates_apply_matches_a_rebuild(filters):
+    rnd = random.Random(1)
+    rows = {i: make_row(rnd, i) for i in range(200)}
+    fields = ('name', 'age', 'gender', 'address')
+    aggregates = TableAggregates(SPEC, rows.values(), filters, fields)
+    for step in range(300):
+        key = rnd.randrange(260)
+        old = rows.get(key)
+        new = None if old is not None and rnd.random() < 0.3 else make_row(rnd, key)
+        if new is None:
+            del rows[key]
+        else:
+            rows[key] = new
+        aggregates.apply(old, new)
+        if step % 10 == 0:
+            assert aggregates.result() == TableAggregates(SPEC, rows.values(), filters, fields).result()
+
+
+def test_summary_index_applies_changes_and_skips_builds_during_a_refresh():
+    rnd = random.Random(2)
+    rows = [make_row(rnd, i) for i in range(100)]
+    summaries = SummaryIndex(SPEC, search_fields=('name', 'address'))
+
+    def matching(filters):
+        return [r for r in rows if TableAggregates(SPEC, (), filters, summaries.search_fields).matches(r)]
+
+    for filters in FILTERS:
+        summaries.result(filters, matching)
+    new = [dict(r, age=rnd.choice([None, 40, 41])) for r in rows[:80]] + [make_row(rnd, 100 + i) for i in range(10)]
+    with summaries.refresh():
+        old, rows = rows, new
+        # read the new rows before the changes are applied: returned, not kept
+        assert summaries.result({'name': ['Cid']}, matching) == TableAggregates(SPEC, matching({'name': ['Cid']})).result()
+        summaries.apply(row_changes(old, rows))
+    for filters in [*FILTERS, {'name': ['Cid']}]:
+        expected = TableAggregates(SPEC, rows, filters, summaries.search_fields).result()
+        assert summaries.result(filters, matching) == expected
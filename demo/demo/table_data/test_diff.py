@@ -0,0 +1,148 @@
+"""diff_rows/next_patch against the client's applyRowPatch/useRowPatch (run with node): python -m pytest demo/table_data"""
+import json
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from ..components.row_patch import row_patch_code
+from .diff import FULL_RESEND_RATIO, diff_rows, is_full_resend, next_patch, snapshot_patch
+
+# just enough of React for one component calling useRowPatch: state, refs and effects by call order
+HOOKS_JS = """
+const slots = [];
+let slot = 0;
+const useState = (init) => {
+    const i = slot++;
+    if (!(i in slots)) slots[i] = init;
+    return [slots[i], (v) => { slots[i] = typeof v === 'function' ? v(slots[i]) : v; }];
+};
+const useRef = (init) => {
+    const i = slot++;
+    if (!(i in slots)) slots[i] = {current: init};
+    return slots[i];
+};
+let effects = [];
+const useEffect = (fn, deps) => {
+    const i = slot++;
+    const prev = slots[i];
+    if (!prev || deps.some((d, k) => d !== prev[k])) effects.push(fn);
+    slots[i] = deps;
+};
+const render = (props) => {
+    slot = 0;
+    effects = [];
+    useRowPatch(props.rows, props.patch, props.keyField, props.onGap);
+    effects.forEach((fn) => fn());
+    slot = 0;
+    return useRowPatch(props.rows, props.patch, props.keyField, props.onGap);
+};
+"""
+
+APPLY_JS = """
+const cases = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+console.log(JSON.stringify(cases.map(([old, ops, key]) => applyRowPatch(old, ops, key))));
+"""
+
+# renders: [rows index, patch] in order, prints the rows after each and whether it asked to resync
+RENDER_JS = """
+const [rowsList, renders] = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const out = [];
+for (const [r, patch] of renders) {
+    let gap = false;
+    const rows = render({rows: rowsList[r], patch, keyField: 'key', onGap: () => { gap = true; }});
+    out.push([rows, gap]);
+}
+console.log(JSON.stringify(out));
+"""
+
+needs_node = pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+
+
+def node(code: str, arg) -> list:
+    return json.loads(subprocess.run(['node', '-e', row_patch_code + code], input=json.dumps(arg),
+                                     check=True, capture_output=True, text=True).stdout)
+
+
+def make_rows(rnd: random.Random, keys) -> list[dict]:
+    return [dict(key=k, name=rnd.choice(['Ann', 'Bob']), age=rnd.randint(1, 3)) for k in keys]
+
+
+def edit(rnd: random.Random, rows: list[dict]) -> list[dict]:
+    """Random deletes, inserts, updates and sometimes a shuffle of `rows`."""
+    rows = [r if rnd.random() < 0.8 else dict(r, age=r['age'] + 1) for r in rows if rnd.random() < 0.85]
+    for _ in range(rnd.randint(0, 4)):
+        rows.insert(rnd.randint(0, len(rows)), make_rows(rnd, [f'n{rnd.randrange(10 ** 6)}'])[0])
+    if rnd.random() < 0.3:
+        rnd.shuffle(rows)
+    return rows
+
+
+@needs_node
+def test_client_applies_the_ops_to_the_new_rows():
+    rnd = random.Random(0)
+    cases, expected = [], []
+    for _ in range(200):
+        old = make_rows(rnd, rnd.sample(range(100), rnd.randint(0, 20)))
+        new = edit(rnd, old)
+        cases.append([old, diff_rows(old, new), 'key'])
+        # gridjs rows: positional
+        cases.append([old, diff_rows(old, new, key=None), None])
+        expected.extend([new, new])
+    assert node(APPLY_JS, cases) == expected
+
+
+def test_unchanged_rows_have_no_ops():
+    rows = make_rows(random.Random(1), range(10))
+    assert diff_rows(rows, [dict(r) for r in rows]) == []
+    assert diff_rows(rows, rows, key=None) == []
+    assert diff_rows(rows, rows[::-1]) == [['o', [r['key'] for r in rows[::-1]]]]
+
+
+def test_patch_versions_chain():
+    first = snapshot_patch({})
+    assert first == dict(v=1, base=1, snapshot=1, ops=[])
+    patch = next_patch(first, [['d', '1']])
+    assert patch == dict(v=2, base=1, snapshot=1, ops=[['d', '1']])
+    patch = next_patch(patch, [])
+    assert (patch['v'], patch['base'], patch['snapshot']) == (3, 2, 1)
+    assert snapshot_patch(patch) == dict(v=4, base=4, snapshot=4, ops=[])
+
+
+def test_full_resend_over_the_ratio():
+    rows = list(range(10))
+    limit = int(len(rows) * FULL_RESEND_RATIO)
+    assert not is_full_resend([['u']] * limit, rows)
+    assert is_full_resend([['u']] * (limit + 1), rows)
+    # a one row table still takes a one op patch
+    assert not is_full_resend([['u']], [0])
+
+
+@needs_node
+def test_client_resyncs_on_a_gap():
+    rnd = random.Random(2)
+    v1 = make_rows(rnd, range(5))
+    v2 = edit(rnd, v1)
+    v3 = edit(rnd, v2)
+    snap = snapshot_patch({})
+    p2 = next_patch(snap, diff_rows(v1, v2))
+    p3 = next_patch(p2, diff_rows(v2, v3))
+    resync = snapshot_patch(p3)
+    out = node(HOOKS_JS + RENDER_JS, [[v1, v3], [
+        [0, snap], [0, p2], [0, p3],
+        # missed p4: no apply, ask for the rows
+        [0, next_patch(next_patch(p3, []), [])],
+        # the resent rows and their snapshot
+        [1, resync],
+    ]])
+    assert out == [[v1, False], [v2, False], [v3, False], [v3, True], [v3, False]]
+
+
+@needs_node
+def test_rows_reloaded_older_than_the_patch_resync():
+    rows = make_rows(random.Random(3), range(3))
+    # a page (re)load hands the hydrated rows of snapshot 1 together with patch 5
+    stale = dict(v=5, base=4, snapshot=1, ops=[['d', '0']])
+    out = node(HOOKS_JS + RENDER_JS, [[rows], [[0, stale]]])
+    assert out == [[rows, True]]
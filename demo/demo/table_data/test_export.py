@@ -0,0 +1,70 @@
+"""Checks of the streaming CSV/XLSX encoders: python -m pytest demo/table_data"""
+import csv
+import hashlib
+import io
+import xml.etree.ElementTree as ET
+import zipfile
+
+from .export import XLSX_MAX_CELL, csv_chunks, xlsx_chunks
+
+HEADER = ['Id', 'Name', 'Age']
+ROWS = [('1', 'Ann, "the" first', 32), ('2', 'Bob\nLee', None), ('3', ' padded ', 2.5), ('4', True, -1)]
+NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def sheet_rows(data: bytes) -> list[list]:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert {'[Content_Types].xml', 'xl/workbook.xml', 'xl/worksheets/sheet1.xml'} <= set(zf.namelist())
+        root = ET.fromstring(zf.read('xl/worksheets/sheet1.xml'))
+    rows = []
+    for row in root.iterfind('s:sheetData/s:row', NS):
+        cells = []
+        for c in row.iterfind('s:c', NS):
+            kind = c.get('t')
+            if kind == 'inlineStr':
+                cells.append(c.find('s:is/s:t', NS).text or '')
+            elif kind == 'b':
+                cells.append(c.find('s:v', NS).text == '1')
+            elif c.find('s:v', NS) is None:
+                cells.append(None)
+            else:
+                cells.append(float(c.find('s:v', NS).text))
+        rows.append(cells)
+    return rows
+
+
+def test_csv_round_trips_in_bounded_chunks():
+    rows = [(str(i), f'name {i}', i) for i in range(2000)]
+    chunks = list(csv_chunks(HEADER, rows, chunk_bytes=1024))
+    assert len(chunks) > 10
+    assert all(len(c) < 1024 + 64 for c in chunks)
+    parsed = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+    assert parsed == [HEADER, *[[a, b, str(c)] for a, b, c in rows]]
+
+
+def test_csv_quotes_values():
+    parsed = list(csv.reader(io.StringIO(b''.join(csv_chunks(HEADER, ROWS)).decode())))
+    assert parsed[1] == ['1', 'Ann, "the" first', '32']
+    assert parsed[2] == ['2', 'Bob\nLee', '']
+
+
+def test_xlsx_opens_with_the_cell_types():
+    rows = sheet_rows(b''.join(xlsx_chunks(HEADER, ROWS)))
+    assert rows == [HEADER, ['1', 'Ann, "the" first', 32.0], ['2', 'Bob\nLee', None],
+                    ['3', ' padded ', 2.5], ['4', True, -1.0]]
+
+
+def test_xlsx_drops_what_a_sheet_cannot_hold():
+    rows = sheet_rows(b''.join(xlsx_chunks(['a'], [('bell\x07 ok',), ('x' * (XLSX_MAX_CELL + 10),)])))
+    assert rows[1] == ['bell ok']
+    assert len(rows[2][0]) == XLSX_MAX_CELL
+
+
+def test_xlsx_streams_in_chunks():
+    rows = [(str(i), hashlib.sha256(str(i).encode()).hexdigest(), i) for i in range(5000)]
+    chunks = list(xlsx_chunks(HEADER, rows, chunk_bytes=4096))
+    # deflate hands out its output a block (about 32k) at a time
+    assert len(chunks) > 5
+    assert max(map(len, chunks)) < 64 * 1024
+    assert len(sheet_rows(b''.join(chunks))) == len(rows) + 1
@@ -0,0 +1,107 @@
+"""Checks of ViewFanout's per-view refresh and its subscription lifetime: python -m pytest demo/table_data"""
+import asyncio
+
+from .fanout import ViewFanout
+from .indexed import IndexedTable
+from .provider import IndexedProvider
+
+COLUMNS = [dict(dataIndex='key', sorter='true'), dict(dataIndex='gender', filters=[])]
+ROWS = [dict(key=f'{i:02}', gender=('male', 'female')[i % 2]) for i in range(30)]
+MALE = {'gender': ['male']}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_fanout(**kwargs) -> tuple[ViewFanout, Clock]:
+    clock = Clock()
+    provider = IndexedProvider(IndexedTable.from_columns(ROWS, COLUMNS))
+    return ViewFanout(provider, max_idle=10, timer=clock, **kwargs), clock
+
+
+def test_refresh_fetches_each_view_once():
+    async def run():
+        fanout, _ = make_fanout()
+        subs = [fanout.subscribe(f't{i}', dict(current=1, pageSize=5), MALE if i % 2 else None, None) for i in range(6)]
+        assert await fanout.refresh() == 2
+        pages = [await fanout.next_page(s) for s in subs]
+        assert [r['key'] for r in pages[1][1]] == ['00', '02', '04', '06', '08']
+        assert pages[0][0] == dict(current=1, pageSize=5, total=30)
+        assert all(p == pages[i % 2] for i, p in enumerate(pages))
+        # a session on another page gets that page
+        assert fanout.update('t0', dict(current=2, pageSize=5), None, None)
+        await fanout.refresh()
+        assert [r['key'] for r in (await fanout.next_page(subs[0]))[1]] == ['05', '06', '07', '08', '09']
+        assert fanout.info() == dict(sessions=6, views=3, refreshes=2, views_computed=5, pushes=12)
+    asyncio.run(run())
+
+
+def test_a_fetching_session_is_not_idle():
+    async def run():
+        fanout, clock = make_fanout()
+        fetching = fanout.subscribe('fetching', None, None, None)
+        changing = fanout.subscribe('changing', None, None, None)
+        fanout.subscribe('quiet', None, None, None)
+        for _ in range(3):
+            clock.now += 6
+            fanout.touch('fetching')
+            fanout.update('changing', dict(current=2), None, None)
+            await fanout.refresh()
+        assert fanout.subscription('quiet') is None
+        assert fanout.subscription('fetching') is fetching and fanout.subscription('changing') is changing
+        assert not fanout.update('quiet', None, None, None)
+    asyncio.run(run())
+
+
+def test_an_open_socket_keeps_a_quiet_session():
+    async def run():
+        open_sids = {'a'}
+        fanout, clock = make_fanout(connected=open_sids.__contains__)
+        sub = fanout.subscribe('t', None, None, None, sid='a')
+        watch = asyncio.create_task(fanout.next_page(sub))
+        clock.now += 100
+        await fanout.refresh()
+        assert (await watch)[0]['total'] == 30
+        open_sids.clear()
+        clock.now += 100
+        await fanout.refresh()
+        assert fanout.subscription('t') is None
+    asyncio.run(run())
+
+
+def test_disconnect_ends_the_watch():
+    async def run():
+        fanout, _ = make_fanout()
+        sub = fanout.subscribe('t', None, None, None, sid='a')
+        other = fanout.subscribe('u', None, None, None, sid='b')
+        watch = asyncio.create_task(fanout.next_page(sub))
+        await asyncio.sleep(0)
+        fanout.disconnect('a')
+        assert await watch is None
+        assert sub.closed and fanout.subscription('t') is None
+        assert fanout.subscription('u') is other
+        # the reconnected socket subscribes again
+        assert not fanout.update('t', None, None, None)
+        again = fanout.subscribe('t', None, None, None, sid='c')
+        await fanout.refresh()
+        assert (await fanout.next_page(again))[0]['total'] == 30
+    asyncio.run(run())
+
+
+def test_a_page_of_the_previous_view_is_dropped():
+    async def run():
+        fanout, _ = make_fanout()
+        sub = fanout.subscribe('t', None, None, None)
+        key = sub.key
+        fanout.update('t', None, MALE, None)
+        sub.push(key, (dict(total=30), []))
+        assert sub.page is None
+        old = sub
+        sub = fanout.subscribe('t', None, None, None)
+        assert old.closed and await fanout.next_page(old) is None
+    asyncio.run(run())
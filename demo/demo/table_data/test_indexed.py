@@ -0,0 +1,110 @@
+"""Randomized checks of IndexedTable views against a list comprehension + sort: python -m pytest demo/table_data"""
+import pickle
+import random
+
+import pytest
+
+from . import indexed
+from .indexed import IndexedTable, sort_key, view_params
+
+COLUMNS = [
+    dict(dataIndex='key', sorter='true'),
+    dict(dataIndex='name', sorter='true'),
+    dict(dataIndex='gender', filters=[]),
+    dict(dataIndex='age', filters=[]),
+]
+FILTERS = [
+    None,
+    {},
+    {'gender': ['female']},
+    {'gender': ['male', 'female'], 'age': [1, 2, 3]},
+    {'gender': None, 'age': []},
+    {'gender': ['nobody']},
+    # not indexed: ignored
+    {'address': ['x']},
+]
+SORTERS = [
+    None,
+    dict(column={}, field='name', order='ascend'),
+    dict(column={}, field='name', order='descend'),
+    dict(column=None, field='name', order='ascend'),
+    dict(column={}, field='address', order='ascend'),
+]
+
+
+def make_rows(rnd: random.Random, n: int) -> list[dict]:
+    return [dict(key=f'{i:06}', name=rnd.choice(['Ann', 'Bob', 'Cid', 'Dee']), gender=rnd.choice(['male', 'female']),
+                 age=rnd.randint(1, 9), address='x') for i in range(n)]
+
+
+def baseline(rows: list[dict], filters, sorter) -> list[int]:
+    ids = [i for i, r in enumerate(rows)
+           if all(r[f] in v for f, v in (filters or {}).items() if v and f in ('gender', 'age'))]
+    if sorter and sorter.get('column') is not None and sorter['field'] in ('key', 'name'):
+        # stable both ways: ties keep the row order
+        ids.sort(key=lambda i: sort_key(rows[i][sorter['field']]), reverse=sorter['order'] == 'descend')
+    return ids
+
+
+@pytest.mark.parametrize('walk_limit', [indexed.WALK_LIMIT, 7])
+def test_view_slices_match_the_baseline(walk_limit, monkeypatch):
+    monkeypatch.setattr(indexed, 'WALK_LIMIT', walk_limit)
+    rnd = random.Random(walk_limit)
+    rows = make_rows(rnd, 3000)
+    table = IndexedTable.from_columns(rows, COLUMNS)
+    for filters in FILTERS:
+        for sorter in SORTERS:
+            expected = baseline(rows, filters, sorter)
+            view = table.view(filters, sorter)
+            assert len(view) == len(expected)
+            assert view.params == view_params(filters, sorter)
+            for _ in range(8):
+                start = rnd.randrange(len(expected) + 2)
+                stop = start + rnd.choice([0, 1, 10, 50, 1000])
+                assert list(view[start:stop]) == expected[start:stop], (filters, sorter, start, stop)
+            assert list(view[:]) == expected
+            args = (filters, sorter['field'], sorter['order']) if sorter and sorter['column'] is not None else (filters,)
+            assert list(table.query(*args)) == expected
+
+
+def test_search_bitmap_narrows_the_view():
+    rows = make_rows(random.Random(1), 500)
+    table = IndexedTable.from_columns(rows, COLUMNS)
+    search = sum(1 << i for i, r in enumerate(rows) if r['name'] == 'Ann')
+    sorter = dict(column={}, field='key', order='descend')
+    expected = [i for i in baseline(rows, {'gender': ['male']}, sorter) if rows[i]['name'] == 'Ann']
+    assert list(table.view({'gender': ['male']}, sorter, search)[:]) == expected
+    assert list(table.view(None, None, 0)[:10]) == []
+
+
+def test_unknown_fields_build_no_index():
+    table = IndexedTable.from_columns(make_rows(random.Random(2), 50), COLUMNS)
+    table.view({'address': ['x'], 'missing': [1]}, dict(column={}, field='missing', order='ascend'))
+    assert table.sortable == ['key', 'name']
+    assert table.filterable == ['gender', 'age']
+
+
+def test_sessions_share_the_rows_and_keep_small_views():
+    rows = make_rows(random.Random(3), 100)
+    table = IndexedTable.from_columns(rows, COLUMNS)
+    assert isinstance(table.rows, tuple)
+    # the unfiltered natural order has no ids, a sorted one is the shared permutation
+    assert table.view().ids is None
+    sorter = dict(column={}, field='name', order='ascend')
+    assert table.view(None, sorter).ids is table.view({}, sorter).ids
+    # copies out: a session editing its page does not touch the shared rows
+    page = table.materialize(table.view({'gender': ['male']}, sorter)[:5])
+    page[0]['name'] = 'changed'
+    assert 'changed' not in {r['name'] for r in table.rows}
+    # session state is pickled, views go with it
+    view = table.view({'gender': ['male']}, sorter)
+    assert len(view[:3]) == 3
+    copy = pickle.loads(pickle.dumps(view))
+    assert list(copy[:]) == list(view[:]) and copy.params == view.params
+
+
+def test_empty_filter_values_do_not_filter():
+    table = IndexedTable.from_columns(make_rows(random.Random(4), 40), COLUMNS)
+    assert view_params({'gender': [], 'age': None}, None) == view_params({}, None) == view_params(None, None)
+    assert table.mask({'gender': []}) is None
+    assert list(table.query({'gender': [], 'age': None})) == list(range(40))
@@ -0,0 +1,41 @@
+"""antd pagination clamping and the in-memory provider's pages: python -m pytest demo/table_data"""
+import pytest
+
+from .indexed import IndexedTable
+from .paging import DEFAULT_PAGE_SIZE, normalize_pagination, page_slice
+from .provider import IndexedProvider
+
+ROWS = [dict(key=str(i), gender=('male', 'female')[i % 2]) for i in range(23)]
+COLUMNS = [dict(dataIndex='key', sorter='true'), dict(dataIndex='gender', filters=[])]
+
+
+@pytest.mark.parametrize('pagination, total, expected', [
+    (None, 23, dict(current=1, pageSize=DEFAULT_PAGE_SIZE, total=23)),
+    (dict(current=3, pageSize=10), 23, dict(current=3, pageSize=10, total=23)),
+    # past the last page, after a filter shrank the result
+    (dict(current=9, pageSize=10), 23, dict(current=3, pageSize=10, total=23)),
+    # antd's unset values
+    (dict(current=0, pageSize=0), 23, dict(current=1, pageSize=DEFAULT_PAGE_SIZE, total=23)),
+    (dict(current='2', pageSize='5'), 23, dict(current=2, pageSize=5, total=23)),
+    (dict(current=4, pageSize=10), 0, dict(current=1, pageSize=10, total=0)),
+])
+def test_normalize_pagination(pagination, total, expected):
+    assert normalize_pagination(pagination, total) == expected
+
+
+def test_page_slice():
+    assert page_slice(ROWS, dict(current=3, pageSize=10)) == ROWS[20:]
+    assert page_slice(ROWS, dict(current=1, pageSize=5)) == ROWS[:5]
+    assert page_slice([], dict(current=1, pageSize=5)) == []
+
+
+def test_pages_of_a_view_share_it():
+    provider = IndexedProvider(IndexedTable.from_columns(ROWS, COLUMNS))
+    sorter = dict(column={}, field='key', order='descend')
+    filters = {'gender': ['male']}
+    pages = [provider.fetch_page(dict(current=p, pageSize=5), filters, sorter) for p in (1, 2, 3)]
+    assert [r['key'] for _, rows in pages for r in rows] == sorted((r['key'] for r in ROWS[::2]), reverse=True)
+    assert pages[2][0] == dict(current=3, pageSize=5, total=12)
+    # one view for the filters/sorter, paging only slices it
+    assert provider.view(filters, sorter) is provider.view(dict(filters), dict(sorter))
+    assert len(provider._views) == 2
@@ -0,0 +1,80 @@
+"""Randomized checks of SearchIndex against a row by row scan: python -m pytest demo/table_data"""
+import random
+
+import pytest
+
+from .search import SEARCH_FILTER, SearchIndex, bitmap_ids, row_matches, split_search, with_search
+
+FIELDS = ('name', 'age', 'address')
+QUERIES = ['', 'b', 'bl', 'black', 'ack', 'street', '1', '12 street', 'ann lee', 'e 4', 'xyz', 'LEE']
+
+
+def make_rows(rnd: random.Random, n: int) -> list[dict]:
+    return [
+        dict(name=rnd.choice(['Black', 'Ann Lee', 'Bob', 'Zed', None]), age=rnd.randint(1, 99),
+             address=f'{rnd.randint(1, 150)} {rnd.choice(["Street", "Road", "Lane"])}')
+        for _ in range(n)
+    ]
+
+
+def scan(rows: list[dict], text: str) -> list[int]:
+    return [i for i, r in enumerate(rows) if row_matches(r, text, FIELDS)]
+
+
+def postings(index: SearchIndex) -> dict[str, list[int]]:
+    # dense/sparse may differ from a rebuild (a posting only turns sparse again well below the ratio)
+    return {t: list(bitmap_ids(p, len(index)) if isinstance(p, int) else p) for t, p in index._postings.items()}
+
+
+def assert_matches_scan(index: SearchIndex, rows: list[dict]):
+    for text in QUERIES:
+        expected = scan(rows, text) if text else list(range(len(rows)))
+        assert list(index.ids(text)) == expected, text
+        start = len(rows) // 3
+        assert list(index.ids(text, start)) == [i for i in expected if i >= start], text
+        assert index.count(text, start) == sum(i < start for i in expected), text
+
+
+@pytest.mark.parametrize('dense_ratio', [2, 128])
+def test_ids_match_a_scan(dense_ratio):
+    rows = make_rows(random.Random(0), 500)
+    assert_matches_scan(SearchIndex(rows, FIELDS, dense_ratio=dense_ratio), rows)
+
+
+def test_replace_and_append_rows_match_a_scan_and_a_rebuild():
+    rnd = random.Random(1)
+    rows = make_rows(rnd, 400)
+    index = SearchIndex(rows, FIELDS, dense_ratio=8, max_terms=4)
+    for step in range(60):
+        rows, appended = list(rows), False
+        op = rnd.random()
+        if op < 0.4 and rows:
+            for _ in range(rnd.randint(1, 50)):
+                i = rnd.randrange(len(rows))
+                rows[i] = dict(rows[i], name=rnd.choice(['Black', 'Lee', None]), age=rnd.randint(1, 99))
+        elif op < 0.6:
+            rows = rows[:rnd.randint(0, len(rows))]
+        elif op < 0.7:
+            rows += make_rows(rnd, rnd.randint(1, 200))
+        elif op < 0.85:
+            added = make_rows(rnd, rnd.randint(0, 50))
+            assert index.append_rows(added) == len(rows)
+            rows += added
+            appended = True
+        elif rows:
+            del rows[rnd.randrange(len(rows))]
+        changed = index.replace_rows(rows)
+        assert not (appended and changed)
+        assert_matches_scan(index, rows)
+        rebuilt = SearchIndex(rows, FIELDS, dense_ratio=8)
+        assert postings(index) == postings(rebuilt)
+        assert index._grams == rebuilt._grams
+    assert index.replace_rows(list(rows)) == 0
+
+
+def test_search_rides_in_the_filters():
+    filters = with_search({'gender': ['male'], SEARCH_FILTER: ['old']}, 'ann')
+    assert filters == {'gender': ['male'], SEARCH_FILTER: ['ann']}
+    assert split_search(filters) == ({'gender': ['male']}, 'ann')
+    assert with_search({'gender': ['male']}, ' ,') == {'gender': ['male']}
+    assert split_search({'gender': None}) == ({'gender': None}, None)
@@ -0,0 +1,80 @@
+"""SqliteProvider's pushed down filters/sort/paging against IndexedProvider: python -m pytest demo/table_data"""
+import random
+
+import pytest
+
+from .indexed import IndexedTable
+from .provider import IndexedProvider
+from .search import SEARCH_FILTER
+from .sqlite import SqliteProvider
+
+COLUMNS = [dict(dataIndex='key', sorter='true'), dict(dataIndex='name', sorter='true'),
+           dict(dataIndex='gender', filters=[]), dict(dataIndex='age', filters=[])]
+FILTERS = [None, {}, {'gender': ['female']}, {'gender': ['male'], 'age': [3, 4, 5]}, {'gender': [], 'age': None},
+           {'gender': ['nobody']}, {SEARCH_FILTER: ['an']}, {'gender': ['male'], SEARCH_FILTER: ['street 1']}]
+SORTERS = [None, dict(column={}, field='name', order='ascend'), dict(column={}, field='name', order='descend'),
+           dict(column=None, field='name', order='ascend'), dict(column={}, field='key', order='descend')]
+PAGES = [None, dict(current=2, pageSize=7), dict(current=99, pageSize=10), dict(current=0, pageSize=0)]
+
+
+def make_rows(n: int) -> list[dict]:
+    rnd = random.Random(n)
+    return [dict(key=f'{i:04}', name=rnd.choice(['Ann', 'Bob', 'Cid', None]), gender=rnd.choice(['male', 'female']),
+                 age=rnd.randint(1, 9), address=f'{rnd.randint(1, 20)} Street') for i in range(n)]
+
+
+@pytest.fixture
+def providers(tmp_path):
+    rows = make_rows(300)
+    table = IndexedTable.from_columns(rows, COLUMNS)
+    sqlite = SqliteProvider.from_rows(str(tmp_path / 'rows.db'), 'rows', rows, sortable=table.sortable,
+                                      filterable=table.filterable, search_fields=['name', 'address'])
+    yield IndexedProvider(table, search_fields=['name', 'address']), sqlite
+    sqlite.close()
+
+
+def test_pages_match_the_indexed_provider(providers):
+    indexed, sqlite = providers
+    for filters in FILTERS:
+        for sorter in SORTERS:
+            assert sqlite.count(filters) == indexed.count(filters)
+            for pagination in PAGES:
+                assert sqlite.fetch_page(pagination, filters, sorter) == indexed.fetch_page(pagination, filters, sorter)
+            expected = indexed.rows(filters, sorter, 0, 1000)
+            assert sqlite.rows(filters, sorter, 5, 20) == expected[5:25]
+            assert [r for batch in sqlite.iter_rows(filters, sorter, batch=16) for r in batch] == expected
+
+
+def test_where_binds_values_and_whitelists_columns(providers):
+    _, sqlite = providers
+    assert sqlite._where(None) == ('', [])
+    assert sqlite._where({'gender': [], 'age': None}) == ('', [])
+    assert sqlite._where({'gender': ['male', "x') OR 1=1 --"]}) == (' WHERE "gender" IN (?, ?)', ['male', "x') OR 1=1 --"])
+    where, params = sqlite._where({'age': [1], SEARCH_FILTER: ['ann']})
+    assert where == ' WHERE table_search("name", "address", ?) AND "age" IN (?)' and params == ['ann', 1]
+    with pytest.raises(ValueError):
+        sqlite._where({'gender" = gender; --': ['x']})
+    with pytest.raises(ValueError):
+        sqlite.rows(None, dict(column={}, field='missing', order='ascend'), 0, 10)
+
+
+def test_from_rows_replaces_the_previous_rows(tmp_path):
+    path = str(tmp_path / 'rows.db')
+    SqliteProvider.from_rows(path, 'rows', make_rows(50), sortable=['name']).close()
+    provider = SqliteProvider.from_rows(path, 'rows', make_rows(10), sortable=['name'])
+    assert provider.count(None) == 10
+    provider.replace_rows(make_rows(3))
+    assert provider.rows(None, None, 0, 10) == make_rows(3)
+    provider.close()
+
+
+def test_from_rows_without_rows_takes_the_columns(tmp_path):
+    path = str(tmp_path / 'rows.db')
+    with pytest.raises(ValueError):
+        SqliteProvider.from_rows(path, 'rows', [])
+    provider = SqliteProvider.from_rows(path, 'rows', [], columns=['key', 'name'], sortable=['name'])
+    assert provider.fetch_page(None, {'name': ['Ann']}, dict(column={}, field='name', order='ascend')) == (
+        dict(current=1, pageSize=10, total=0), [])
+    provider.replace_rows([dict(key='1', name='Ann', extra=1)])
+    assert provider.rows(None, None, 0, 10) == [dict(key='1', name='Ann')]
+    provider.close()
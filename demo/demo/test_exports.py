@@ -0,0 +1,85 @@
+"""Checks of the export grants and of what a local mode table exports: python -m pytest demo"""
+from urllib.parse import parse_qsl
+import asyncio
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from .antd_demo import state
+from .antd_demo.state import AntdState, export_query, export_view
+from .components.export_links import export_links_code
+from .components.local_sort import local_sort_code
+from .exports import EXPORT_GRANT_TTL, TableExports
+from .table_data import IndexedProvider, IndexedTable, LRUCache
+
+# the rows a local mode table shows for a view and the export query of its links: antd's onFilter and
+# stable sort with the generated column functions, and localExportQuery
+LOCAL_VIEW_JS = """
+const [rows, columns, serverQuery, view] = JSON.parse(process.argv[1]);
+const local = localSortFilter(columns);
+let shown = rows.filter((r) => local.every((c) => {
+    const values = view.filters[c.dataIndex];
+    return !values || !values.length || values.some((v) => c.onFilter(v, r));
+}));
+const column = local.find((c) => c.dataIndex === view.sorter.field);
+const sign = view.sorter.order === 'descend' ? -1 : 1;
+shown = shown.slice().sort((a, b) => sign * column.sorter(a, b));
+console.log(JSON.stringify([shown.map((r) => r.key), localExportQuery(serverQuery, view)]));
+"""
+
+
+def test_grants_are_single_use_and_per_table():
+    exports = TableExports()
+    export_id = exports.grant('players', ['snapshot'])
+    with pytest.raises(LookupError):
+        exports.granted('other', {'id': export_id})
+    assert exports.granted('players', {'id': export_id}) == ['snapshot']
+    with pytest.raises(LookupError):
+        exports.granted('players', {'id': export_id})
+    with pytest.raises(LookupError):
+        exports.granted('players', {})
+
+
+def test_grants_expire():
+    exports = TableExports()
+    now = [0.0]
+    exports.grants = LRUCache(maxsize=4, ttl=EXPORT_GRANT_TTL, timer=lambda: now[0])
+    export_id = exports.grant('players', 1)
+    now[0] += EXPORT_GRANT_TTL + 1
+    with pytest.raises(LookupError):
+        exports.granted('players', {'id': export_id})
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+@pytest.mark.parametrize('view', [
+    # the Id column's defaultSortOrder
+    dict(filters={'gender': ['male']}, sorter=dict(field='key', order='descend')),
+    dict(filters={}, sorter=dict(field='name', order='ascend')),
+    dict(filters={'gender': ['female']}, sorter=dict(field='name', order='descend')),
+])
+def test_local_mode_export_has_the_displayed_order(view, monkeypatch):
+    rows = [dict(key=str(i), name=('Ann', 'Bob', 'Cid')[i % 3], age=20 + i, gender=('male', 'female')[i % 2],
+                 address=f'{i} Street') for i in range(1, 24)]
+    columns = AntdState.get_columns()
+    table = IndexedTable.from_columns(rows, columns)
+    monkeypatch.setattr(state, '_table', table)
+    monkeypatch.setattr(state, '_provider', IndexedProvider(table))
+    # what localSortFilter looks at, the filter options are a state var
+    data_columns = [dict(dataIndex=c['dataIndex'], sorter=c.get('sorter'), **({'filters': []} if 'filters' in c else {}))
+                    for c in columns]
+    view = dict(view, sorter=dict(view['sorter'], column={}))
+    code = local_sort_code + export_links_code[:export_links_code.index('const useExportLinks')] + LOCAL_VIEW_JS
+    shown, query = json.loads(subprocess.run(
+        ['node', '-e', code, json.dumps([rows, data_columns, export_query(None, None), view])],
+        check=True, capture_output=True, text=True,
+    ).stdout)
+    if view['sorter']['field'] == 'key':
+        # numeric string keys: '9' comes before '23' descending, a numeric sort would differ
+        assert shown != sorted(shown, key=int, reverse=True)
+
+    header, exported, total = asyncio.run(export_view(None, dict(parse_qsl(query))))
+    ids = [r[header.index('Id')] for r in exported]
+    assert ids == shown
+    assert total == len(shown)